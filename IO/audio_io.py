@@ -0,0 +1,250 @@
+# IO/audio_io.py
+"""Audio input sources and output sinks for the voice loop.
+
+Sources feed ``stt.listen_and_transcribe``. ``open(samplerate)`` returns a
+context manager whose ``read(n)`` mirrors ``sounddevice.InputStream.read``:
+it returns ``(float32 array shaped (n, 1), overflowed)``.
+
+Sinks receive everything ``tts.speak`` would play. ``play(audio, sr)``
+takes an in-memory waveform and ``play_file(path)`` a WAV on disk; both
+block until playback is finished.
+
+Swapping the live microphone/speaker for ``WavFileSource`` and
+``NullSink``/``RecordingSink`` lets the whole loop run from recorded clips
+on a machine without audio hardware.
+"""
+from __future__ import annotations
+import logging
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class EndOfAudio(EOFError):
+    """Raised by replay sources once every clip has been delivered."""
+
+
+# ---------------- Sources ----------------
+class MicrophoneSource:
+    """Live microphone capture through sounddevice."""
+
+    def __init__(self, channels: int = 1) -> None:
+        self.channels = channels
+
+    def open(self, samplerate: int):
+        import sounddevice as sd
+        return sd.InputStream(samplerate=samplerate, channels=self.channels, dtype="float32")
+
+
+def read_wav(path, samplerate: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """Load a clip as mono float32, optionally resampled to ``samplerate``."""
+    import soundfile as sf
+
+    audio, sr = sf.read(str(path), dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if samplerate is not None and sr != samplerate:
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        g = gcd(sr, samplerate)
+        audio = resample_poly(audio, samplerate // g, sr // g).astype(np.float32)
+        sr = samplerate
+    return audio, sr
+
+
+class WavFileSource:
+    """Replay recorded utterances as if they were spoken into the microphone.
+
+    Clips are played back to back, each followed by ``gap_seconds`` of
+    silence so the VAD can close the utterance. The read position persists
+    across ``open()`` calls, so audio only advances while the assistant is
+    listening (like a user who waits for the reply before speaking again).
+    With ``realtime=True`` reads are paced to the wall clock, which keeps
+    endpointing delays realistic. Once all clips and the final gap have been
+    read, ``read`` raises :class:`EndOfAudio`.
+
+    ``clip_end_times`` records the ``time.perf_counter()`` moment the last
+    sample of each clip was delivered, i.e. the true end of speech.
+    """
+
+    def __init__(
+        self,
+        clips: Iterable,
+        samplerate: int = 16000,
+        gap_seconds: float = 2.5,
+        lead_in_seconds: float = 0.5,
+        realtime: bool = True,
+        on_clip_end: Optional[Callable[[int, float], None]] = None,
+    ) -> None:
+        self.samplerate = samplerate
+        self.realtime = realtime
+        self.on_clip_end = on_clip_end
+        self.clip_paths: List[str] = []
+        gap = np.zeros(int(gap_seconds * samplerate), dtype=np.float32)
+        parts = [np.zeros(int(lead_in_seconds * samplerate), dtype=np.float32)]
+        self._clip_ends: List[int] = []
+        position = parts[0].size
+        for clip in clips:
+            if isinstance(clip, np.ndarray):
+                audio = clip.astype(np.float32, copy=False)
+                self.clip_paths.append("<array>")
+            else:
+                audio, _ = read_wav(clip, samplerate)
+                self.clip_paths.append(str(clip))
+            parts.extend([audio, gap])
+            position += audio.size
+            self._clip_ends.append(position)
+            position += gap.size
+        self._audio = np.concatenate(parts)
+        self._pos = 0
+        self._next_clip = 0
+        self.clip_end_times: List[float] = []
+
+    @property
+    def exhausted(self) -> bool:
+        return self._pos >= self._audio.size
+
+    @property
+    def duration(self) -> float:
+        return self._audio.size / self.samplerate
+
+    def open(self, samplerate: int):
+        if samplerate != self.samplerate:
+            raise ValueError(f"WavFileSource prepared for {self.samplerate} Hz, stream asked for {samplerate} Hz")
+        return _ReplayStream(self)
+
+    def _read(self, n: int, started: float, delivered: int):
+        if self.exhausted:
+            raise EndOfAudio("replay source exhausted")
+        chunk = self._audio[self._pos:self._pos + n]
+        if chunk.size < n:
+            chunk = np.concatenate([chunk, np.zeros(n - chunk.size, dtype=np.float32)])
+        end = self._pos + n
+
+        if self.realtime:
+            wait = started + (delivered + n) / self.samplerate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+        while self._next_clip < len(self._clip_ends) and self._clip_ends[self._next_clip] <= end:
+            # Timestamp of the clip's last sample within this read
+            overshoot = (end - self._clip_ends[self._next_clip]) / self.samplerate
+            t_end = time.perf_counter() - (overshoot if self.realtime else 0.0)
+            self.clip_end_times.append(t_end)
+            if self.on_clip_end is not None:
+                self.on_clip_end(self._next_clip, t_end)
+            self._next_clip += 1
+
+        self._pos = end
+        return chunk.reshape(-1, 1), False
+
+
+class _ReplayStream:
+    def __init__(self, source: WavFileSource) -> None:
+        self._source = source
+        self._started = 0.0
+        self._delivered = 0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._delivered = 0
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def read(self, n: int):
+        out = self._source._read(n, self._started, self._delivered)
+        self._delivered += n
+        return out
+
+
+# ---------------- Sinks ----------------
+def _wav_duration(path) -> Optional[float]:
+    try:
+        with wave.open(str(path), 'rb') as wav_file:
+            return wav_file.getnframes() / float(wav_file.getframerate())
+    except Exception:
+        return None
+
+
+class WinsoundSink:
+    """Speaker output through winsound (Windows only)."""
+
+    def play_file(self, path, wait_seconds: Optional[float] = None) -> None:
+        import winsound
+        if wait_seconds is None:
+            winsound.PlaySound(str(path), winsound.SND_FILENAME)
+        else:
+            # Play asynchronously and wait explicitly (used for Coqui output)
+            winsound.PlaySound(str(path), winsound.SND_FILENAME | winsound.SND_ASYNC)
+            time.sleep(wait_seconds)
+
+    def play(self, audio: np.ndarray, sr: int) -> None:
+        import tempfile
+        import soundfile as sf
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
+            path = Path(tmp.name)
+        try:
+            sf.write(str(path), audio, sr)
+            self.play_file(path)
+        finally:
+            path.unlink(missing_ok=True)
+
+
+class NullSink:
+    """Discard output. With ``simulate_playback`` it sleeps for the audio duration."""
+
+    def __init__(self, simulate_playback: bool = False) -> None:
+        self.simulate_playback = simulate_playback
+        self.played = 0
+
+    def play_file(self, path, wait_seconds: Optional[float] = None) -> None:
+        self.played += 1
+        if self.simulate_playback:
+            time.sleep(_wav_duration(path) or 0.0)
+
+    def play(self, audio: np.ndarray, sr: int) -> None:
+        self.played += 1
+        if self.simulate_playback:
+            time.sleep(len(audio) / sr)
+
+
+class RecordingSink(NullSink):
+    """Keep every played waveform (with its start time) for later inspection."""
+
+    def __init__(self, output_dir=None, simulate_playback: bool = False) -> None:
+        super().__init__(simulate_playback)
+        self.output_dir = Path(output_dir) if output_dir else None
+        if self.output_dir:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.recordings: List[Tuple[float, np.ndarray, int]] = []
+
+    def play_file(self, path, wait_seconds: Optional[float] = None) -> None:
+        started = time.perf_counter()
+        try:
+            audio, sr = read_wav(path)
+        except Exception as e:
+            logging.warning(f"[audio_io] Could not read {path} for recording: {e}")
+            audio, sr = np.zeros(0, dtype=np.float32), 0
+        self._record(started, audio, sr)
+        super().play_file(path, wait_seconds)
+
+    def play(self, audio: np.ndarray, sr: int) -> None:
+        self._record(time.perf_counter(), np.asarray(audio, dtype=np.float32).reshape(-1), sr)
+        super().play(audio, sr)
+
+    def _record(self, started: float, audio: np.ndarray, sr: int) -> None:
+        self.recordings.append((started, audio, sr))
+        if self.output_dir and sr:
+            import soundfile as sf
+            sf.write(str(self.output_dir / f"out_{len(self.recordings):04d}.wav"), audio, sr)
+
+
+__all__ = [
+    "EndOfAudio", "MicrophoneSource", "WavFileSource", "read_wav",
+    "WinsoundSink", "NullSink", "RecordingSink",
+]
@@ -4,7 +4,11 @@ import logging
 import time
 from pathlib import Path
 
-_tts_model = None
+from utils import model_registry
+
+COQUI_MODEL_ID = "tts_models/en/ljspeech/tacotron2-DDC"
+
+_tts_model = None  # utils.model_registry handle (reloaded on demand after an idle unload)
 _ready = False
 
 def initialize_coqui():
@@ -23,7 +27,10 @@ def initialize_coqui():
         
         # Initialize TTS model
         logging.info("[Coqui] Loading Tacotron2 model...")
-        _tts_model = TTS("tts_models/en/ljspeech/tacotron2-DDC", progress_bar=False).to(device)
+        _tts_model = model_registry.acquire(
+            "tts", COQUI_MODEL_ID, lambda: TTS(COQUI_MODEL_ID, progress_bar=False).to(device), device=device
+        )
+        _tts_model.get()
         
         _ready = True
         logging.info("[Coqui] TTS initialized successfully")
@@ -48,7 +55,8 @@ def synthesize(text: str) -> Path | None:
         
         # Synthesize audio
         logging.debug(f"[Coqui] Synthesizing: '{text[:50]}{'...' if len(text) > 50 else ''}'")
-        _tts_model.tts_to_file(text=text, file_path=str(output_file))
+        with _tts_model.use() as model:
+            model.tts_to_file(text=text, file_path=str(output_file))
         
         if output_file.exists():
             logging.debug(f"[Coqui] Audio generated: {output_file.name}")
@@ -61,6 +69,21 @@ def synthesize(text: str) -> Path | None:
         logging.error(f"[Coqui] Synthesis failed: {e}")
         return None
 
+def synthesize_audio(text: str):
+    """Synthesize text in memory. Returns (float32 array, sample rate) or None."""
+    if not _ready or _tts_model is None:
+        logging.error("[Coqui] TTS not initialized")
+        return None
+
+    try:
+        import numpy as np
+        with _tts_model.use() as model:
+            wav = model.tts(text=text)
+            return np.asarray(wav, dtype=np.float32), model.synthesizer.output_sample_rate
+    except Exception as e:
+        logging.error(f"[Coqui] Synthesis failed: {e}")
+        return None
+
 def is_ready() -> bool:
     """Check if Coqui TTS is ready."""
     return _ready
\ No newline at end of file
@@ -0,0 +1,223 @@
+# IO/reference_library.py
+"""Reference-clip library: a persistent metadata index for a folder of clips.
+
+Picking reference clips (``--ref-dir`` in ``testing/test_tts_clean.py``)
+needs per-clip facts - duration, sample rate, channels, loudness, emotion
+tags - but not the audio itself. :class:`ReferenceLibrary` keeps those facts
+in a small JSON index next to the clips (``.reference_index.json``):
+
+* duration, rate, channels, format and subtype come from the file header
+  (``soundfile.info``), no samples are decoded;
+* loudness (RMS and peak, dBFS) is measured once per clip in a streamed,
+  block-wise pass on a thread pool and stored, so it is not recomputed;
+* emotion tags come from the file name (``IO.voice_bundle.clip_tags``);
+* :meth:`ReferenceLibrary.refresh` only re-reads clips whose size or mtime
+  changed and drops entries for deleted files.
+
+Queries (:meth:`ReferenceLibrary.query`) then run on the index alone::
+
+    library = ReferenceLibrary("IO/AudioRef")
+    library.refresh()
+    clips = library.query(max_duration=11, exclude=["neutral"], any_tags=["angry", "happy"])
+"""
+from __future__ import annotations
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from IO.voice_bundle import clip_tags
+
+INDEX_NAME = ".reference_index.json"
+INDEX_VERSION = 1
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac")
+BLOCK_FRAMES = 65536
+SILENCE_DB = -120.0
+DEFAULT_WORKERS = 4
+
+
+@dataclass
+class ClipEntry:
+    """Index record for one reference clip."""
+    name: str  # file name inside the library folder
+    size: int
+    mtime_ns: int
+    duration: float
+    sample_rate: int
+    channels: int
+    frames: int
+    format: str
+    subtype: str
+    rms_db: float
+    peak_db: float
+    tags: List[str] = field(default_factory=list)
+
+
+def _db(value: float) -> float:
+    return round(max(20.0 * np.log10(value), SILENCE_DB), 2) if value > 0 else SILENCE_DB
+
+
+def measure_loudness(path, block_frames: int = BLOCK_FRAMES) -> tuple:
+    """``(rms_db, peak_db)`` of a clip (all channels), streamed in blocks."""
+    import soundfile as sf
+
+    total, peak, count = 0.0, 0.0, 0
+    for block in sf.blocks(str(path), blocksize=block_frames, dtype="float32", always_2d=True):
+        if block.size:
+            total += float(np.square(block, dtype=np.float64).sum())
+            peak = max(peak, float(np.abs(block).max()))
+            count += block.size
+    return _db(np.sqrt(total / count) if count else 0.0), _db(peak)
+
+
+def scan_clip(path) -> ClipEntry:
+    """Header facts plus loudness for one clip."""
+    import soundfile as sf
+
+    path = Path(path)
+    stat = path.stat()
+    info = sf.info(str(path))
+    rms_db, peak_db = measure_loudness(path)
+    return ClipEntry(name=path.name, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                     duration=round(info.frames / info.samplerate, 4), sample_rate=info.samplerate,
+                     channels=info.channels, frames=info.frames, format=info.format,
+                     subtype=info.subtype, rms_db=rms_db, peak_db=peak_db, tags=clip_tags(path))
+
+
+def _scan(path):
+    try:
+        return scan_clip(path)
+    except Exception as e:
+        return e
+
+
+class ReferenceLibrary:
+    """A folder of reference clips with a persistent, incrementally updated index."""
+
+    def __init__(self, root, index_path=None) -> None:
+        self.root = Path(root)
+        self.index_path = Path(index_path) if index_path else self.root / INDEX_NAME
+        self.clips: Dict[str, ClipEntry] = {}
+        self.errors: Dict[str, str] = {}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        known = {f.name for f in fields(ClipEntry)}
+        for name, entry in data.get("clips", {}).items():
+            if known.issuperset(entry) and len(entry) == len(known):
+                self.clips[name] = ClipEntry(**entry)
+
+    def save(self) -> bool:
+        """Write the index atomically; False if the folder is read-only."""
+        data = {"version": INDEX_VERSION,
+                "clips": {name: asdict(entry) for name, entry in sorted(self.clips.items())}}
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            return False
+        return True
+
+    def refresh(self, workers: int = DEFAULT_WORKERS, save: bool = True) -> Dict[str, int]:
+        """
+        Bring the index in line with the folder: new or changed clips (size or
+        mtime) are scanned, deleted ones dropped. Unreadable clips are left
+        out and reported in ``errors``. Returns counts per outcome.
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "failed": 0}
+        present, todo = {}, []
+        if self.root.is_dir():
+            for entry in os.scandir(self.root):
+                if entry.is_file() and entry.name.lower().endswith(AUDIO_EXTENSIONS):
+                    present[entry.name] = entry.stat()
+        for name in [n for n in self.clips if n not in present]:
+            del self.clips[name]
+            stats["removed"] += 1
+        for name, stat in sorted(present.items()):
+            known = self.clips.get(name)
+            if known and known.size == stat.st_size and known.mtime_ns == stat.st_mtime_ns:
+                stats["unchanged"] += 1
+            else:
+                todo.append(name)
+
+        paths = [self.root / name for name in todo]
+        if len(paths) <= 1 or workers <= 1:
+            results = [_scan(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(paths)),
+                                    thread_name_prefix="reference-scan") as pool:
+                results = list(pool.map(_scan, paths))
+
+        self.errors = {}
+        for name, result in zip(todo, results):
+            if isinstance(result, Exception):
+                self.clips.pop(name, None)
+                self.errors[name] = f"{type(result).__name__}: {result}"
+                stats["failed"] += 1
+                continue
+            stats["updated" if name in self.clips else "added"] += 1
+            self.clips[name] = result
+        if save and (todo or stats["removed"] or not self.index_path.exists()):
+            self.save()
+        return stats
+
+    def path(self, entry: ClipEntry) -> Path:
+        return self.root / entry.name
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted({tag for entry in self.clips.values() for tag in entry.tags})
+
+    def query(self, max_duration: Optional[float] = None, min_duration: Optional[float] = None,
+              any_tags: Iterable[str] = (), all_tags: Iterable[str] = (), exclude: Iterable[str] = (),
+              sample_rate: Optional[int] = None, min_rms_db: Optional[float] = None) -> List[ClipEntry]:
+        """
+        Clips matching every given condition, sorted by name. ``any_tags``
+        keeps clips with at least one of the tags, ``all_tags`` those with
+        all of them, ``exclude`` drops clips with any of them.
+        """
+        any_tags, all_tags, exclude = ({t.lower() for t in tags} for tags in (any_tags, all_tags, exclude))
+        matches = []
+        for name in sorted(self.clips):
+            entry = self.clips[name]
+            tags = set(entry.tags)
+            if max_duration is not None and entry.duration > max_duration:
+                continue
+            if min_duration is not None and entry.duration < min_duration:
+                continue
+            if sample_rate is not None and entry.sample_rate != sample_rate:
+                continue
+            if min_rms_db is not None and entry.rms_db < min_rms_db:
+                continue
+            if (any_tags and not tags & any_tags) or not all_tags <= tags or tags & exclude:
+                continue
+            matches.append(entry)
+        return matches
+
+
+def pick_primary(entries: Sequence[ClipEntry], prefer: Iterable[str] = ("serious",)) -> Optional[ClipEntry]:
+    """The first clip carrying a preferred tag (in preference order), else the first clip."""
+    for tag in prefer:
+        for entry in entries:
+            if tag.lower() in entry.tags:
+                return entry
+    return entries[0] if entries else None
+
+
+__all__ = [
+    "AUDIO_EXTENSIONS", "ClipEntry", "INDEX_NAME", "ReferenceLibrary", "measure_loudness",
+    "pick_primary", "scan_clip",
+]
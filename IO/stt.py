@@ -1,15 +1,38 @@
 import logging
 from config import STT_MODEL_SIZE, STT_COMPUTE_TYPE
+from utils import model_registry
+from utils.profiler import trace
+
+try:
+    from config import STT_VAD_BACKEND
+except ImportError:
+    STT_VAD_BACKEND = "webrtc"  # "webrtc" or "numpy" (vectorized energy/spectral VAD)
+
+try:
+    from config import WAKE_WORD_ENABLED, WAKE_WORD_PHRASES, WAKE_WORD_FOLLOW_UP_SECONDS, WAKE_WORD_MODEL_SIZE
+except ImportError:
+    WAKE_WORD_ENABLED = False  # Default to transcribing every utterance
+    WAKE_WORD_PHRASES = ["hey zeyta"]
+    WAKE_WORD_FOLLOW_UP_SECONDS = 10.0
+    WAKE_WORD_MODEL_SIZE = "tiny.en"
 
 # Globals
-stt_model = None
+stt_model = None  # utils.model_registry handle for the Whisper model (reloaded on demand)
 _torch = None
-_sd = None
 _WhisperModel = None
+_wake_gate = None
+_audio_source = None  # None -> live microphone (IO.audio_io.MicrophoneSource)
+
+# Counters so the cost of the STT path can be measured
+_stats = {"utterances": 0, "gated": 0, "whisper_calls": 0}
 
 
-def initialize_stt():
-    """Blocking load of faster-whisper model (no background threads, no silero)."""
+def initialize_stt(model_size: str | None = None, compute_type: str | None = None):
+    """Blocking load of faster-whisper model (no background threads, no silero).
+
+    `model_size` / `compute_type` override the config values (e.g. a small
+    model for benchmarking on CPU).
+    """
     global stt_model, _torch, _WhisperModel
     if stt_model is not None:
         return
@@ -29,8 +52,12 @@ def initialize_stt():
             stt_model = None
             return
         _WhisperModel = _WM
+        size, compute = model_size or STT_MODEL_SIZE, compute_type or STT_COMPUTE_TYPE
+        handle = model_registry.acquire("stt", f"whisper-{size}", lambda: _WM(size, device="auto", compute_type=compute),
+                                        device="auto", dtype=compute)
         try:
-            stt_model = _WM(STT_MODEL_SIZE, device="auto", compute_type=STT_COMPUTE_TYPE)
+            handle.get()
+            stt_model = handle
         except Exception as e:
             logging.error(f"Failed to construct WhisperModel: {e}")
             stt_model = None
@@ -39,6 +66,74 @@ def initialize_stt():
         # suppress verbose stack in runtime; concise message only
         logging.error(f"Failed to initialize STT models: {e}")
         stt_model = None
+        return
+    _initialize_wake_gate()
+
+
+def _initialize_wake_gate():
+    """Build the optional wake-word gate from config."""
+    global _wake_gate
+    if not WAKE_WORD_ENABLED or _wake_gate is not None:
+        return
+    try:
+        from IO.wakeword import WakeWordGate, WhisperKeywordSpotter
+        _wake_gate = WakeWordGate(
+            WAKE_WORD_PHRASES,
+            follow_up_seconds=WAKE_WORD_FOLLOW_UP_SECONDS,
+            spotter=WhisperKeywordSpotter(WAKE_WORD_MODEL_SIZE),
+        )
+        logging.info(f"[stt] Wake-word gate enabled: {', '.join(_wake_gate.phrases)}")
+    except Exception as e:
+        logging.error(f"[stt] Failed to initialize wake-word gate, transcribing everything: {e}")
+        _wake_gate = None
+
+
+def set_audio_source(source):
+    """Use `source` (see IO/audio_io.py) instead of the live microphone; None restores it."""
+    global _audio_source
+    _audio_source = source
+
+
+def open_follow_up_window(seconds: float | None = None):
+    """Accept utterances without the wake phrase for a while (e.g. after the assistant replies)."""
+    if _wake_gate is not None:
+        _wake_gate.open_window(seconds)
+
+
+def get_stats() -> dict:
+    """Utterance / Whisper invocation counters, plus wake-gate counters when enabled."""
+    stats = dict(_stats)
+    if _wake_gate is not None:
+        stats["wake_gate"] = dict(_wake_gate.stats)
+    return stats
+
+
+def _transcribe(model, audio) -> str:
+    """Run Whisper on one utterance, counting every invocation."""
+    # First attempt using Whisper's internal VAD filter (fast, removes non-speech)
+    try:
+        _stats["whisper_calls"] += 1
+        segments, _ = model.transcribe(audio, beam_size=3, language="en", vad_filter=True)
+        text = "".join(seg.text for seg in segments).strip()
+    except Exception:
+        text = ""
+
+    # If the VAD-filtered result is empty (e.g. noisy background removed everything),
+    # retry without Whisper's VAD to give the model a chance to transcribe short/quiet speech.
+    if not text:
+        try:
+            _stats["whisper_calls"] += 1
+            segments, _ = model.transcribe(audio, beam_size=3, language="en", vad_filter=False)
+            text = "".join(seg.text for seg in segments).strip()
+        except Exception:
+            text = ""
+    return text
+
+
+def _create_vad(samplerate: int, frame_ms: int):
+    """Build the configured VAD backend (see IO/vad.py)."""
+    from IO.vad import create_vad
+    return create_vad(STT_VAD_BACKEND, sample_rate=samplerate, frame_ms=frame_ms)
 
 
 def listen_and_transcribe(timeout: float | None = None):
@@ -49,12 +144,12 @@ def listen_and_transcribe(timeout: float | None = None):
 
     Optional `timeout` (seconds) will stop listening after that period with no result.
     """
-    global stt_model, _torch, _sd
+    global stt_model, _torch, _audio_source
 
-    # Lazy import sounddevice and numpy to avoid startup hit
-    if _sd is None:
-        import sounddevice as sd
-        _sd = sd
+    # Lazy import audio backend and numpy to avoid startup hit
+    if _audio_source is None:
+        from IO.audio_io import MicrophoneSource
+        _audio_source = MicrophoneSource()
     import numpy as np
     if stt_model is None:
         initialize_stt()  # blocking (we load everything up front in main anyway)
@@ -62,7 +157,7 @@ def listen_and_transcribe(timeout: float | None = None):
             return ("", None)
 
     samplerate = 16000
-    chunk_size = 512
+    chunk_size = 1600  # 100 ms blocks = 5 VAD frames per read
     speaking = False
     # Use lists of frames to avoid repeated np.concatenate in the hot loop
     buffer_frames = []  # will store numpy arrays (float32)
@@ -73,19 +168,13 @@ def listen_and_transcribe(timeout: float | None = None):
     prebuffer_total = 0
 
     try:
-        import webrtcvad
-
-        vad = webrtcvad.Vad(2)  # aggressiveness 0-3; 2 is moderate
-
-        # webrtcvad requires frames of 10/20/30 ms. We'll use 20 ms frames.
+        # 20 ms frames (webrtcvad accepts 10/20/30 ms). Audio is read in
+        # blocks of several frames and the VAD classifies each block in one call.
         frame_ms = 20
         frame_size = int(samplerate * frame_ms / 1000)  # samples per frame
+        vad = _create_vad(samplerate, frame_ms)
 
-        # local bindings for speed
-        local_stt_model = stt_model
-        local_WhisperModel = _WhisperModel
-
-        with _sd.InputStream(samplerate=samplerate, channels=1, dtype="float32") as stream:
+        with _audio_source.open(samplerate) as stream:
             # Stay quiet until speech actually detected
             elapsed = 0.0
             # small state machine counters to avoid flip-flopping
@@ -96,9 +185,8 @@ def listen_and_transcribe(timeout: float | None = None):
             required_silence_seconds = 1.618
             required_silence_frames = int(required_silence_seconds / (frame_ms / 1000.0))
 
-            # accumulator for partial frames (use list for efficient appends)
-            acc_list = []
-            acc_len = 0
+            # samples left over from the previous block (less than one frame)
+            remainder = np.zeros(0, dtype=np.float32)
 
             while True:
                 chunk, _ = stream.read(chunk_size)
@@ -111,35 +199,18 @@ def listen_and_transcribe(timeout: float | None = None):
                     left = prebuffer.popleft()
                     prebuffer_total -= left.size
 
-                # accumulate into acc_list until we have enough samples
-                acc_list.append(chunk)
-                acc_len += chunk.size
-                # process full frames from the accumulated list
-                while acc_len >= frame_size:
-                    # build a frame by possibly slicing the first arrays
-                    needed = frame_size
-                    parts = []
-                    while needed > 0:
-                        part = acc_list.pop(0)
-                        if part.size <= needed:
-                            parts.append(part)
-                            needed -= part.size
-                        else:
-                            parts.append(part[:needed])
-                            # put back the remainder
-                            acc_list.insert(0, part[needed:])
-                            needed = 0
-                    # recalc acc_len
-                    acc_len -= frame_size
-
-                    frame = np.concatenate(parts)
-
-                    # convert float32 -1..1 to 16-bit PCM bytes
-                    ints = (frame * 32767).astype('int16')
-                    frame_bytes = ints.tobytes()
-
-                    is_speech_frame = vad.is_speech(frame_bytes, sample_rate=samplerate)
+                if remainder.size:
+                    chunk = np.concatenate((remainder, chunk))
+                n_frames = chunk.size // frame_size
+                usable = n_frames * frame_size
+                remainder = chunk[usable:].copy()
+                if n_frames == 0:
+                    continue
+
+                frames = chunk[:usable].reshape(n_frames, frame_size)
+                speech_flags = vad.classify(frames)
 
+                for frame, is_speech_frame in zip(frames, speech_flags):
                     if is_speech_frame:
                         speech_frames += 1
                         silence_frames = 0
@@ -169,35 +240,25 @@ def listen_and_transcribe(timeout: float | None = None):
                         # finalize and transcribe
                         total_samples = sum(f.size for f in buffer_frames)
                         if total_samples > int(0.3 * samplerate):
-                            try:
-                                # refresh local model references if needed
-                                if local_stt_model is None and local_WhisperModel is not None:
-                                    globals()['stt_model'] = local_WhisperModel(STT_MODEL_SIZE, device="cuda", compute_type=STT_COMPUTE_TYPE)
-                                    local_stt_model = globals()['stt_model']
-                                if globals().get('stt_model') is None:
-                                    return ("", None)
-                                audio = np.concatenate(buffer_frames)
-
-                                # First attempt using Whisper's internal VAD filter (fast, removes non-speech)
+                            trace("utterance_end", trailing_silence=silence_frames * frame_ms / 1000.0)
+                            audio = np.concatenate(buffer_frames)
+                            _stats["utterances"] += 1
+                            if _wake_gate is not None and not _wake_gate.check(audio, samplerate):
+                                # No wake phrase and outside the follow-up window: skip Whisper
+                                _stats["gated"] += 1
+                            else:
                                 try:
-                                    segments, _ = globals()['stt_model'].transcribe(audio, beam_size=3, language="en", vad_filter=True)
-                                    text = "".join(seg.text for seg in segments).strip()
+                                    # The registry reloads Whisper here if it was unloaded while idle
+                                    with stt_model.use() as model:
+                                        text = _transcribe(model, audio)
+                                    if text and _wake_gate is not None and _wake_gate.last_match:
+                                        text = _wake_gate.strip_wake_phrase(text)
+                                    trace("stt_done", text=text)
+
+                                    audio_out = audio
+                                    return (text.lower() if text else "", audio_out)
                                 except Exception:
-                                    text = ""
-
-                                # If the VAD-filtered result is empty (e.g. noisy background removed everything),
-                                # retry without Whisper's VAD to give the model a chance to transcribe short/quiet speech.
-                                if not text:
-                                    try:
-                                        segments, _ = globals()['stt_model'].transcribe(audio, beam_size=3, language="en", vad_filter=False)
-                                        text = "".join(seg.text for seg in segments).strip()
-                                    except Exception:
-                                        text = ""
-
-                                audio_out = audio
-                                return (text.lower() if text else "", audio_out)
-                            except Exception:
-                                return ("", None)
+                                    return ("", None)
                         # else treat as noise without logging
                         # reset state for next utterance
                         buffer_frames = []
@@ -210,6 +271,9 @@ def listen_and_transcribe(timeout: float | None = None):
                     if elapsed >= timeout:
                         return ("", None)
 
+    except EOFError:
+        # Replay source ran out of audio; let the caller end the loop
+        raise
     except Exception:
         # Silent failure
         return ("", None)
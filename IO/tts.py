@@ -1,6 +1,28 @@
 from pathlib import Path
-import subprocess, sys, winsound, logging, time
+import subprocess, sys, logging, time, os, hashlib
 from config import TTS_BACKEND
+from utils.profiler import trace
+
+try:
+    from config import TTS_CACHE_ENABLED
+except ImportError:
+    TTS_CACHE_ENABLED = True
+try:
+    from config import TTS_CACHE_MAX_CHARS
+except ImportError:
+    TTS_CACHE_MAX_CHARS = 200  # longer (mostly one-off) responses are not cached
+try:
+    from config import TTS_PREWARM_PHRASES
+except ImportError:
+    TTS_PREWARM_PHRASES = None  # None -> FAREWELL_MESSAGE and the brain's error reply
+try:
+    from config import TTS_CHUNK_CHARS
+except ImportError:
+    TTS_CHUNK_CHARS = 250  # longer text is synthesized in chunks and played as each is ready; 0 disables
+try:
+    from config import TTS_CHUNK_WORKERS
+except ImportError:
+    TTS_CHUNK_WORKERS = 2  # Piper chunks synthesized in parallel (separate processes)
 
 ROOT = Path(__file__).resolve().parent.parent
 PIPER_DIR = ROOT / "piper"
@@ -8,12 +30,46 @@ PIPER_DIR = ROOT / "piper"
 PIPER_EXE = PIPER_DIR / "piper.exe"
 MODEL = PIPER_DIR / "en_US-hfc_female-medium.onnx"
 OUTPUT = ROOT / "output.wav"
+CACHED_OUTPUT = ROOT / "output_cached.wav"
+RESULT_CACHE_DIR = ROOT / "cache" / "tts_results"
 
 _coqui_ready = False
+_sink = None  # None -> speakers via winsound (IO.audio_io.WinsoundSink)
+_custom_backend = None  # object with synthesize(text) -> (float32 array, sample_rate)
+_result_cache = None  # IO.tts_cache.TTSResultCache once initialize_tts has run
+_result_cache_set = False  # True once set_result_cache() chose the cache explicitly
+_reference_digest = None  # (path, size, mtime_ns, sha256) of the Coqui reference clip
+
+def set_audio_sink(sink):
+    """Send audio to `sink` (see IO/audio_io.py) instead of the speakers; None restores them."""
+    global _sink
+    _sink = sink
+
+def set_backend(backend):
+    """Replace Piper/Coqui with `backend.synthesize(text) -> (audio, sr)`; None restores them."""
+    global _custom_backend
+    _custom_backend = backend
+
+def set_result_cache(cache):
+    """Use `cache` (IO.tts_cache.TTSResultCache) for synthesized results; None disables caching."""
+    global _result_cache, _result_cache_set
+    _result_cache = cache
+    _result_cache_set = True
 
-def initialize_tts():
-    """Initialize selected TTS backend."""
+def _get_sink():
+    global _sink
+    if _sink is None:
+        from IO.audio_io import WinsoundSink
+        _sink = WinsoundSink()
+    return _sink
+
+def initialize_tts(warm_cache=True):
+    """Initialize selected TTS backend; `warm_cache=False` leaves prewarm() to the caller."""
     global _coqui_ready
+    _initialize_cache()
+    if _custom_backend is not None:
+        logging.info(f"[TTS] Using custom backend: {type(_custom_backend).__name__}")
+        return
     if TTS_BACKEND == "coqui":
         try:
             from IO import coqui_backend as cb
@@ -32,6 +88,134 @@ def initialize_tts():
     if not MODEL.exists():
         raise FileNotFoundError(f"Model not found at: {MODEL}")
     logging.info("[TTS] Piper backend validated")
+    if warm_cache:
+        prewarm()
+
+# ---------------- Result cache ----------------
+def _initialize_cache():
+    global _result_cache
+    if not TTS_CACHE_ENABLED or _result_cache_set or _result_cache is not None:
+        return
+    try:
+        from IO.tts_cache import TTSResultCache
+        _result_cache = TTSResultCache(RESULT_CACHE_DIR)
+        logging.info(f"[TTS] Result cache at {RESULT_CACHE_DIR}")
+    except Exception as e:
+        logging.warning(f"[TTS] Result cache disabled: {e}")
+
+def _voice_tag() -> str:
+    """Identifies whatever decides how the audio sounds for the active backend."""
+    if _custom_backend is not None:
+        return f"custom:{type(_custom_backend).__name__}"
+    if TTS_BACKEND == "coqui" and _coqui_ready:
+        from config import COQUI_MODEL_NAME, COQUI_REFERENCE_WAV, COQUI_LANGUAGE
+        return f"coqui:{COQUI_MODEL_NAME}:{_file_digest(COQUI_REFERENCE_WAV)}:{COQUI_LANGUAGE}"
+    return f"piper:{MODEL.name}"
+
+def _file_digest(path) -> str:
+    """Content hash of the reference clip, so re-recording it in place changes the voice tag.
+    The digest is reused while the file's size and mtime are unchanged."""
+    global _reference_digest
+    try:
+        st = os.stat(path)
+    except OSError:
+        return f"missing:{path}"
+    cached = _reference_digest
+    if cached and cached[:3] == (str(path), st.st_size, st.st_mtime_ns):
+        return cached[3]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    _reference_digest = (str(path), st.st_size, st.st_mtime_ns, digest)
+    return digest
+
+def _cache_key(sanitized: str):
+    if _result_cache is None or len(sanitized) > TTS_CACHE_MAX_CHARS:
+        return None
+    from IO.tts_cache import result_key
+    return result_key(sanitized, voice=_voice_tag())
+
+def _cache_store(key, path=None, data=None):
+    if key is None:
+        return
+    try:
+        _result_cache.put(key, data if data is not None else Path(path).read_bytes())
+    except Exception as e:
+        logging.warning(f"[TTS] Could not cache result: {e}")
+
+def _encode_wav(audio, sr) -> bytes:
+    import io
+    import soundfile as sf
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sr, format="WAV")
+    return buffer.getvalue()
+
+def _play_cached(data: bytes):
+    trace("tts_synth_done", backend="cache")
+    try:
+        CACHED_OUTPUT.write_bytes(data)
+        trace("audio_out")
+        _get_sink().play_file(CACHED_OUTPUT)
+    finally:
+        try:
+            CACHED_OUTPUT.unlink()
+        except Exception:
+            pass
+
+def _synthesize_bytes(sanitized: str):
+    """Synthesize without playing (used for pre-warming). Returns WAV bytes or None."""
+    if _custom_backend is not None:
+        audio, sr = _custom_backend.synthesize(sanitized)
+        return _encode_wav(audio, sr)
+    if TTS_BACKEND == "coqui" and _coqui_ready:
+        from IO import coqui_backend as cb
+        wav_path = cb.synthesize(sanitized)
+        if wav_path and wav_path.exists():
+            try:
+                return wav_path.read_bytes()
+            finally:
+                wav_path.unlink(missing_ok=True)
+        return None
+    target = ROOT / "output_prewarm.wav"
+    cmd = [str(PIPER_EXE), "-m", str(MODEL), "-f", str(target)]
+    cp = subprocess.run(cmd, input=sanitized.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if cp.returncode != 0 or not target.exists():
+        return None
+    try:
+        return target.read_bytes()
+    finally:
+        target.unlink(missing_ok=True)
+
+def prewarm(phrases=None):
+    """Synthesize fixed phrases into the result cache so their first use is instant."""
+    if _result_cache is None:
+        return 0
+    if phrases is None:
+        phrases = TTS_PREWARM_PHRASES
+    if phrases is None:
+        from config import FAREWELL_MESSAGE
+        phrases = [FAREWELL_MESSAGE, "My brain isn't working right now."]
+    warmed = 0
+    start = time.time()
+    for phrase in phrases:
+        sanitized = _sanitize(phrase)
+        key = _cache_key(sanitized) if sanitized else None
+        if key is None or _result_cache.contains(key):
+            continue
+        try:
+            data = _synthesize_bytes(sanitized)
+        except Exception as e:
+            logging.warning(f"[TTS] Pre-warm failed for {phrase!r}: {e}")
+            continue
+        if data:
+            _cache_store(key, data=data)
+            warmed += 1
+    if warmed:
+        logging.info(f"[TTS] Pre-warmed {warmed} phrase(s) in {time.time() - start:.1f}s")
+    return warmed
+
+def get_cache_stats():
+    """Result cache counters (None when the cache is disabled)."""
+    return _result_cache.snapshot() if _result_cache is not None else None
 
 def _sanitize(text: str) -> str:
     import re
@@ -41,15 +225,73 @@ def _sanitize(text: str) -> str:
     sanitized = "\n".join(line.rstrip() for line in sanitized.splitlines())
     return sanitized.strip()
 
-def _speak_piper(sanitized: str):
+# ---------------- Long-form synthesis ----------------
+def _synthesize_piper_audio(text: str):
+    """One Piper run into its own temp file (so several can run at once). Returns (audio, sr)."""
+    import tempfile
+    import soundfile as sf
+    fd, name = tempfile.mkstemp(suffix=".wav", prefix="piper_chunk_")
+    os.close(fd)
+    target = Path(name)
+    try:
+        cmd = [str(PIPER_EXE), "-m", str(MODEL), "-f", str(target)]
+        cp = subprocess.run(cmd, input=text.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if cp.returncode != 0:
+            raise RuntimeError(f"Piper exited with code {cp.returncode}: {cp.stderr.decode(errors='ignore')[:200]}")
+        audio, sr = sf.read(str(target), dtype="float32")
+        return audio, sr
+    finally:
+        target.unlink(missing_ok=True)
+
+def _synthesize_coqui_audio(text: str):
+    from IO import coqui_backend as cb
+    result = cb.synthesize_audio(text)
+    if result is None:
+        raise RuntimeError("Coqui synthesis failed")
+    return result
+
+def _chunk_synthesizer():
+    """(synthesize(text) -> (audio, sr), parallel chunks, name) for the active backend."""
+    if _custom_backend is not None:
+        return _custom_backend.synthesize, 1, type(_custom_backend).__name__
+    if TTS_BACKEND == "coqui" and _coqui_ready:
+        # One in-process model: chunks run one at a time, overlapped with playback
+        return _synthesize_coqui_audio, 1, "coqui"
+    return _synthesize_piper_audio, max(1, TTS_CHUNK_WORKERS), "piper"
+
+def _speak_long(sanitized: str, cache_key=None):
+    """Synthesize in chunks and play each stitched piece while the next ones are synthesized."""
+    from IO.tts_longform import iter_synthesize
+    synthesize, workers, backend = _chunk_synthesizer()
+    played = []
+    sample_rate = 0
+    try:
+        for audio, sr in iter_synthesize(sanitized, synthesize, TTS_CHUNK_CHARS, workers):
+            if not played:
+                trace("tts_synth_done", backend=backend, chunked=True)
+                trace("audio_out")
+            played.append(audio)
+            sample_rate = sr
+            _get_sink().play(audio, sr)
+    except Exception as e:
+        logging.error(f"[TTS] Long-form synthesis failed after {len(played)} piece(s): {e}")
+        return
+    if cache_key is not None and played:
+        import numpy as np
+        _cache_store(cache_key, data=_encode_wav(np.concatenate(played), sample_rate))
+
+def _speak_piper(sanitized: str, cache_key=None):
     cmd = [str(PIPER_EXE), "-m", str(MODEL), "-f", str(OUTPUT)]
     cp = subprocess.run(cmd, input=sanitized.encode("utf-8"), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if cp.returncode != 0:
         logging.error(f"[TTS] Piper exited with code {cp.returncode}: {cp.stderr.decode(errors='ignore')[:200]}")
         return
     if OUTPUT.exists():
+        trace("tts_synth_done", backend="piper")
+        _cache_store(cache_key, OUTPUT)
         try:
-            winsound.PlaySound(str(OUTPUT), winsound.SND_FILENAME)
+            trace("audio_out")
+            _get_sink().play_file(OUTPUT)
         finally:
             try:
                 OUTPUT.unlink()
@@ -58,10 +300,12 @@ def _speak_piper(sanitized: str):
     else:
         logging.warning("[TTS] Piper produced no output file")
 
-def _speak_coqui(sanitized: str):
+def _speak_coqui(sanitized: str, cache_key=None):
     from IO import coqui_backend as cb
     wav_path = cb.synthesize(sanitized)
     if wav_path and wav_path.exists():
+        trace("tts_synth_done", backend="coqui")
+        _cache_store(cache_key, wav_path)
         try:
             # Get audio duration for proper timing
             try:
@@ -80,12 +324,9 @@ def _speak_coqui(sanitized: str):
                 wait_time = max(estimated_duration + 2.0, 4.0)  # Minimum 4 seconds
             
             logging.info(f"[TTS] Playing Coqui TTS audio: {wav_path} (duration: {wait_time:.1f}s)")
-            # Use ASYNC flag to avoid blocking, but still play audio
-            winsound.PlaySound(str(wav_path), winsound.SND_FILENAME | winsound.SND_ASYNC)
-            logging.info("[TTS] Coqui TTS playback initiated")
-            
-            # Wait for calculated duration to allow playback to complete
-            time.sleep(wait_time)
+            # Play asynchronously and wait the calculated duration for playback to complete
+            trace("audio_out")
+            _get_sink().play_file(wav_path, wait_seconds=wait_time)
             logging.debug(f"[TTS] Playback wait completed ({wait_time:.1f}s)")
             
         except Exception as e:
@@ -100,18 +341,35 @@ def _speak_coqui(sanitized: str):
                 pass
     else:
         logging.error(f"[TTS] Coqui TTS synthesis failed (path={wav_path}); falling back to Piper")
-        _speak_piper(sanitized)
+        _speak_piper(sanitized)  # not cached: the key belongs to the Coqui voice
 
 def speak(text: str):
     """Unified speak API for either Piper or Coqui TTS."""
     sanitized = _sanitize(text)
     if not sanitized:
         return
+    cache_key = _cache_key(sanitized)
+    if cache_key is not None:
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            _play_cached(cached)
+            return
+    if TTS_CHUNK_CHARS and len(sanitized) > TTS_CHUNK_CHARS:
+        _speak_long(sanitized, cache_key)
+        return
+    if _custom_backend is not None:
+        audio, sr = _custom_backend.synthesize(sanitized)
+        trace("tts_synth_done", backend=type(_custom_backend).__name__)
+        if cache_key is not None:
+            _cache_store(cache_key, data=_encode_wav(audio, sr))
+        trace("audio_out")
+        _get_sink().play(audio, sr)
+        return
     if TTS_BACKEND == "coqui":
         if _coqui_ready:
-            _speak_coqui(sanitized)
+            _speak_coqui(sanitized, cache_key)
         else:
             logging.info("[TTS] Coqui TTS requested but not ready; using Piper fallback")
-            _speak_piper(sanitized)
+            _speak_piper(sanitized, cache_key)
     else:
-        _speak_piper(sanitized)
\ No newline at end of file
+        _speak_piper(sanitized, cache_key)
\ No newline at end of file
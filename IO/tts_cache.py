@@ -0,0 +1,164 @@
+# IO/tts_cache.py
+"""Cache of synthesized speech for repeated requests.
+
+The assistant says the same things over and over (farewells, error
+messages), so finished audio is kept keyed on the normalized text, the
+voice and every parameter that changes the output (sampling settings and
+seed). Entries are encoded audio bytes, stored under the file extension of
+their format (``{key}.wav``, ``{key}.ogg``, ...): a small in-memory LRU sits
+in front of a larger on-disk tier, each with its own byte budget.
+
+Used by ``IO/tts.py`` and by ``testing/tts_server.py``.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+FORMAT_VERSION = "1"
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace (case and punctuation affect prosody, so they stay)."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def result_key(text: str, voice: str = "default", **params) -> str:
+    """Key for one synthesis result: normalized text + voice + all generation parameters."""
+    payload = json.dumps(
+        {"v": FORMAT_VERSION, "text": normalize_text(text), "voice": voice, "params": params},
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSResultCache:
+    """Two-tier (memory, disk) byte-budgeted LRU of synthesized audio."""
+
+    def __init__(self, root, memory_bytes: int = 32 * 1024 * 1024, disk_bytes: int = 256 * 1024 * 1024) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "store_errors": 0,
+                      "memory_evictions": 0, "disk_evictions": 0}
+        # Running total of bytes on disk, so put() only walks the directory when over budget
+        self._disk_used = sum(size for _, size, _ in self._disk_entries())
+
+    def _path(self, name: str) -> Path:
+        return self.root / name
+
+    def get(self, key: str, ext: str = "wav") -> Optional[bytes]:
+        """Cached bytes for ``key`` stored as ``ext`` (the format's file extension), or None."""
+        name = f"{key}.{ext}"
+        with self._lock:
+            data = self._memory.get(name)
+            if data is not None:
+                self._memory.move_to_end(name)
+                self.stats["memory_hits"] += 1
+                return data
+
+        path = self._path(name)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        os.utime(path)  # mark as recently used
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self._remember(name, data)
+        return data
+
+    def contains(self, key: str, ext: str = "wav") -> bool:
+        name = f"{key}.{ext}"
+        with self._lock:
+            if name in self._memory:
+                return True
+        return self._path(name).exists()
+
+    def put(self, key: str, data: bytes, ext: str = "wav") -> None:
+        name = f"{key}.{ext}"
+        path = self._path(name)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"[tts_cache] Could not write {path.name}: {e}")
+            tmp.unlink(missing_ok=True)
+            with self._lock:
+                self.stats["store_errors"] += 1
+            return
+        with self._lock:
+            self.stats["stores"] += 1
+            self._disk_used += len(data) - replaced
+            self._remember(name, data)
+            over_budget = self._disk_used > self.disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _remember(self, name: str, data: bytes) -> None:
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(name, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        self._memory[name] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+            self.stats["memory_evictions"] += 1
+
+    def _disk_entries(self) -> list:
+        entries = []
+        for p in self.root.iterdir():
+            if p.suffix == ".tmp":
+                continue  # being written
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def _evict_disk(self) -> None:
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.stats["disk_evictions"] += 1
+        with self._lock:
+            # Resync with what is actually on disk (other processes may share the directory)
+            self._disk_used = total
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_mb"] = round(self._memory_used / 1024 / 1024, 2)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 3) if lookups else None
+        return stats
+
+
+__all__ = ["TTSResultCache", "normalize_text", "result_key"]
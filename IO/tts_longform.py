@@ -0,0 +1,218 @@
+# IO/tts_longform.py
+"""Long-form synthesis: split long text into budgeted chunks and stitch the audio.
+
+Autoregressive TTS slows down (and drifts in quality) as the text grows, so
+paragraph-length input is split at sentence boundaries, then clause
+boundaries, then spaces into chunks of at most ``max_chars`` (short
+sentences are packed together up to the budget). Chunks are synthesized
+independently, possibly in parallel, and joined in order: each chunk's
+loudness is pulled towards the first one's (within ``max_gain_db``) and
+neighbours overlap by a short equal-power crossfade.
+
+``split_sentences`` and ``Stitcher`` are also what the sentence-by-sentence
+streaming endpoint uses, so there is one splitter and one stitcher.
+
+Used by ``IO/tts.py``, ``testing/tts_stream.py`` and ``testing/tts_server.py``.
+"""
+from __future__ import annotations
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+SENTENCE_END_RE = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\')\]]))\s+')
+CLAUSE_BREAK_RE = re.compile(r'(?<=[,;:—–])\s+')
+
+DEFAULT_MAX_CHARS = 250
+DEFAULT_CROSSFADE_MS = 30
+DEFAULT_MAX_GAIN_DB = 6.0
+
+
+def _split_to_budget(text: str, max_chars: int) -> List[str]:
+    """Split one over-long sentence at clause breaks, then at spaces."""
+    pieces: List[str] = []
+    current = ""
+    for clause in CLAUSE_BREAK_RE.split(text):
+        while len(clause) > max_chars:
+            cut = clause.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            head, clause = clause[:cut].strip(), clause[cut:].strip()
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(head)
+        if current and len(current) + 1 + len(clause) > max_chars:
+            pieces.append(current)
+            current = clause
+        else:
+            current = f"{current} {clause}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_sentences(text: str, max_chars: int = 300) -> List[str]:
+    """One entry per sentence; sentences over ``max_chars`` are split at clauses, then spaces."""
+    sentences: List[str] = []
+    for sentence in SENTENCE_END_RE.split(" ".join(text.split())):
+        if len(sentence) > max_chars:
+            sentences.extend(_split_to_budget(sentence, max_chars))
+        elif sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def split_text(text: str, max_chars: int = DEFAULT_MAX_CHARS, first_chunk_chars: Optional[int] = None) -> List[str]:
+    """
+    Split text into ordered chunks of at most ``max_chars``, breaking at
+    sentences, then clauses, then spaces. Short sentences share a chunk.
+    ``first_chunk_chars`` caps the first chunk separately (smaller -> earlier first audio).
+    """
+    chunks: List[str] = []
+    current = ""
+    for sentence in SENTENCE_END_RE.split(" ".join(text.split())):
+        if not sentence:
+            continue
+        budget = first_chunk_chars if first_chunk_chars and not chunks else max_chars
+        if current and len(current) + 1 + len(sentence) <= budget:
+            current = f"{current} {sentence}"
+            continue
+        if current:
+            chunks.append(current)
+            current = ""
+            budget = max_chars
+        if len(sentence) <= budget:
+            current = sentence
+        else:
+            pieces = _split_to_budget(sentence, budget)
+            chunks.extend(pieces[:-1])
+            current = pieces[-1]
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def active_rms(audio: np.ndarray, floor: float = 1e-3) -> float:
+    """RMS over samples above ``floor`` (leading/trailing silence doesn't count)."""
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    voiced = audio[np.abs(audio) > floor]
+    if voiced.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(voiced ** 2)))
+
+
+class LoudnessMatcher:
+    """Scales each chunk towards the loudness of the first non-silent one (gain limited to ±max_gain_db)."""
+
+    def __init__(self, max_gain_db: float = DEFAULT_MAX_GAIN_DB) -> None:
+        self.max_gain = 10 ** (max_gain_db / 20)
+        self.target: Optional[float] = None
+
+    def __call__(self, audio: np.ndarray) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        level = active_rms(audio)
+        if level == 0.0:
+            return audio
+        if self.target is None:
+            self.target = level
+            return audio
+        gain = float(np.clip(self.target / level, 1 / self.max_gain, self.max_gain))
+        return np.clip(audio * gain, -1.0, 1.0).astype(np.float32)
+
+
+class Stitcher:
+    """
+    Joins chunks in order with an equal-power crossfade. The last
+    ``crossfade_ms`` of each chunk is held back until the next chunk (or
+    ``flush()``) arrives, so finished audio can be played or sent right away.
+    """
+
+    def __init__(self, sample_rate: int, crossfade_ms: float = DEFAULT_CROSSFADE_MS,
+                 max_gain_db: Optional[float] = DEFAULT_MAX_GAIN_DB) -> None:
+        self.overlap = int(sample_rate * crossfade_ms / 1000)
+        self.match = LoudnessMatcher(max_gain_db) if max_gain_db is not None else None
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def push(self, chunk: np.ndarray) -> np.ndarray:
+        """Add the next chunk; returns the audio that is now final."""
+        chunk = np.asarray(chunk, dtype=np.float32).reshape(-1)
+        if self.match is not None:
+            chunk = self.match(chunk)
+        n = min(len(self._tail), len(chunk), self.overlap)
+        if n:
+            t = np.linspace(0.0, np.pi / 2, n, dtype=np.float32)
+            mixed = self._tail[len(self._tail) - n:] * np.cos(t) + chunk[:n] * np.sin(t)
+            chunk = np.concatenate([self._tail[:len(self._tail) - n], mixed, chunk[n:]])
+        else:
+            chunk = np.concatenate([self._tail, chunk])
+        keep = min(self.overlap, len(chunk))
+        self._tail = chunk[len(chunk) - keep:]
+        return chunk[:len(chunk) - keep]
+
+    def flush(self) -> np.ndarray:
+        tail, self._tail = self._tail, np.zeros(0, dtype=np.float32)
+        return tail
+
+
+def stitch(chunks, sample_rate: int, crossfade_ms: float = DEFAULT_CROSSFADE_MS,
+           max_gain_db: Optional[float] = DEFAULT_MAX_GAIN_DB) -> np.ndarray:
+    """Join a list of waveforms into one (loudness matched, crossfaded)."""
+    stitcher = Stitcher(sample_rate, crossfade_ms, max_gain_db)
+    parts = [stitcher.push(chunk) for chunk in chunks]
+    parts.append(stitcher.flush())
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+
+
+Synthesize = Callable[[str], Tuple[np.ndarray, int]]
+
+
+def iter_synthesize(text: str, synthesize: Synthesize, max_chars: int = DEFAULT_MAX_CHARS,
+                    workers: int = 1, first_chunk_chars: Optional[int] = None,
+                    crossfade_ms: float = DEFAULT_CROSSFADE_MS) -> Iterator[Tuple[np.ndarray, int]]:
+    """
+    Synthesize long text chunk by chunk, yielding stitched ``(audio, sample_rate)``
+    pieces in order as soon as each is final. Up to ``workers`` chunks are
+    synthesized at once, always the earliest ones still pending.
+    """
+    chunks = split_text(text, max_chars, first_chunk_chars)
+    if not chunks:
+        return
+    stitcher: Optional[Stitcher] = None
+    sample_rate = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tts-longform") as pool:
+        pending = [pool.submit(synthesize, chunk) for chunk in chunks[:max(1, workers)]]
+        next_index = len(pending)
+        try:
+            while pending:
+                audio, sr = pending.pop(0).result()
+                if next_index < len(chunks):
+                    pending.append(pool.submit(synthesize, chunks[next_index]))
+                    next_index += 1
+                if stitcher is None:
+                    stitcher, sample_rate = Stitcher(sr, crossfade_ms), sr
+                final = stitcher.push(audio)
+                if final.size:
+                    yield final, sample_rate
+        finally:
+            for future in pending:
+                future.cancel()
+    tail = stitcher.flush()
+    if tail.size:
+        yield tail, sample_rate
+
+
+def synthesize_long(text: str, synthesize: Synthesize, max_chars: int = DEFAULT_MAX_CHARS,
+                    workers: int = 1, crossfade_ms: float = DEFAULT_CROSSFADE_MS) -> Tuple[np.ndarray, int]:
+    """Synthesize long text in chunks and return the whole stitched waveform."""
+    pieces = list(iter_synthesize(text, synthesize, max_chars, workers, crossfade_ms=crossfade_ms))
+    if not pieces:
+        return np.zeros(0, dtype=np.float32), 0
+    return np.concatenate([audio for audio, _ in pieces]), pieces[0][1]
+
+
+__all__ = [
+    "split_sentences", "split_text", "active_rms", "LoudnessMatcher", "Stitcher", "stitch",
+    "iter_synthesize", "synthesize_long",
+]
@@ -0,0 +1,165 @@
+# IO/vad.py
+"""Voice activity detection backends for the capture loop.
+
+Every backend classifies a whole block of fixed-size frames in one call:
+``classify(frames)`` takes a float32 array shaped ``(n_frames, frame_size)``
+with samples in -1..1 and returns a boolean array of length ``n_frames``.
+
+- ``WebRTCVAD`` wraps webrtcvad (still one C call per frame internally).
+- ``EnergyVAD`` is a pure NumPy classifier (log-energy against an adaptive
+  noise floor, zero-crossing rate and spectral flatness, plus hangover
+  smoothing) that handles the whole block in a single vectorized pass.
+"""
+from __future__ import annotations
+import logging
+
+import numpy as np
+
+VAD_BACKENDS = ("webrtc", "numpy")
+
+
+class WebRTCVAD:
+    """webrtcvad backend. Frames must be 10, 20 or 30 ms long."""
+
+    name = "webrtc"
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, aggressiveness: int = 2) -> None:
+        import webrtcvad
+
+        if frame_ms not in (10, 20, 30):
+            raise ValueError(f"webrtcvad only supports 10/20/30 ms frames, got {frame_ms}")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self._vad = webrtcvad.Vad(aggressiveness)
+        # Python-level classifier invocations (one per frame for webrtcvad)
+        self.calls = 0
+        self.frames_seen = 0
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        frames = np.atleast_2d(frames)
+        # Single float -> int16 conversion for the whole block
+        ints = np.clip(frames * 32767, -32768, 32767).astype(np.int16)
+        is_speech = self._vad.is_speech
+        sr = self.sample_rate
+        out = np.fromiter((is_speech(row.tobytes(), sr) for row in ints), dtype=bool, count=len(ints))
+        self.calls += len(ints)
+        self.frames_seen += len(ints)
+        return out
+
+    def reset(self) -> None:
+        pass
+
+
+class EnergyVAD:
+    """Vectorized energy/spectral VAD.
+
+    A frame is raw speech when its log-energy clears both an absolute floor
+    and the tracked noise floor by ``energy_margin_db``, and its spectrum
+    looks voiced (zero-crossing rate and spectral flatness below their
+    limits). Raw decisions are then held for ``hangover_ms`` so short gaps
+    between words do not register as silence. Noise floor and hangover
+    state carry over between blocks.
+    """
+
+    name = "numpy"
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        energy_margin_db: float = 10.0,
+        min_energy_db: float = -55.0,
+        max_zcr: float = 0.3,
+        max_flatness: float = 0.4,
+        hangover_ms: int = 160,
+        noise_adapt: float = 0.05,
+        band_hz: tuple[float, float] = (200.0, 4000.0),
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.energy_margin_db = energy_margin_db
+        self.min_energy_db = min_energy_db
+        self.max_zcr = max_zcr
+        self.max_flatness = max_flatness
+        self.hangover_frames = max(0, int(round(hangover_ms / frame_ms)))
+        self.noise_adapt = noise_adapt
+
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_size, d=1.0 / sample_rate)
+        self._band = (freqs >= band_hz[0]) & (freqs <= band_hz[1])
+
+        self.calls = 0
+        self.frames_seen = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._noise_db: float | None = None
+        self._since_speech = self.hangover_frames + 1
+
+    def features(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (log-energy dB, zero-crossing rate, spectral flatness) per frame."""
+        frames = np.atleast_2d(frames).astype(np.float32, copy=False)
+        energy_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2
+        power = power[:, self._band] + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, zcr, flatness
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        energy_db, zcr, flatness = self.features(frames)
+        n = energy_db.size
+        self.calls += 1
+        self.frames_seen += n
+        if n == 0:
+            return np.zeros(0, dtype=bool)
+
+        if self._noise_db is None:
+            self._noise_db = float(np.min(energy_db))
+
+        raw = (
+            (energy_db > self._noise_db + self.energy_margin_db)
+            & (energy_db > self.min_energy_db)
+            & (zcr < self.max_zcr)
+            & (flatness < self.max_flatness)
+        )
+
+        # Noise floor: drop immediately to quieter non-speech, rise slowly
+        quiet = energy_db[~raw]
+        if quiet.size:
+            target = float(np.mean(quiet))
+            if target < self._noise_db:
+                self._noise_db = target
+            else:
+                alpha = 1.0 - (1.0 - self.noise_adapt) ** quiet.size
+                self._noise_db += alpha * (target - self._noise_db)
+
+        # Hangover: frame is speech if the last raw speech frame (possibly in
+        # a previous block) is at most hangover_frames behind it.
+        idx = np.arange(n)
+        last = np.where(raw, idx, -1 - self._since_speech)
+        last = np.maximum.accumulate(last)
+        since = idx - last
+        self._since_speech = min(int(since[-1]), self.hangover_frames + 1)
+        return since <= self.hangover_frames
+
+
+def create_vad(backend: str = "webrtc", sample_rate: int = 16000, frame_ms: int = 20, **kwargs):
+    """Build a VAD backend by name, falling back to NumPy if webrtcvad is missing."""
+    backend = (backend or "webrtc").lower()
+    if backend not in VAD_BACKENDS:
+        raise ValueError(f"Unknown VAD backend '{backend}' (choose from {', '.join(VAD_BACKENDS)})")
+    if backend == "webrtc":
+        try:
+            return WebRTCVAD(sample_rate=sample_rate, frame_ms=frame_ms, **kwargs)
+        except ImportError:
+            logging.warning("[vad] webrtcvad not installed; using NumPy energy VAD")
+            kwargs.pop("aggressiveness", None)
+    return EnergyVAD(sample_rate=sample_rate, frame_ms=frame_ms, **kwargs)
+
+
+__all__ = ["WebRTCVAD", "EnergyVAD", "create_vad", "VAD_BACKENDS"]
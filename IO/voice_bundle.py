@@ -0,0 +1,270 @@
+# IO/voice_bundle.py
+"""Single-file voice bundles: everything needed to speak with a cloned voice.
+
+A bundle (``*.voice``) holds the normalized, combined reference PCM (see
+``IO/reference_audio.py``), optionally the model's precomputed conditioning
+tensors, per-clip metadata (duration, offset, level, emotion tags taken from
+the file name) and a content hash of the voice.
+
+The file is a standard safetensors file: a little-endian u64 header length,
+a JSON header (tensor dtypes, shapes and offsets, plus this module's
+metadata under ``__metadata__["zeyta_voice"]``) and the raw tensor bytes.
+Tensors are written widest dtype first so every one is naturally aligned,
+and :func:`load_bundle` maps the file copy-on-write and returns numpy views
+into it, so opening a bundle reads only the header; audio and conditioning
+pages are faulted in when first touched. ``VoiceBundle.conditionals()``
+wraps those views as torch tensors without copying.
+
+Accepted by ``testing/test_tts_clean.py`` (``--voice-bundle``),
+``testing/tts_server.py`` (``voice_bundle`` field / ``--voice-bundle``) and
+``app.py``. Bundles are built with ``utils/make_voice_bundle.py``.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+from dataclasses import asdict
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from IO.reference_audio import PreparedReference, prepare_references
+
+BUNDLE_FORMAT = 1
+BUNDLE_SUFFIX = ".voice"
+METADATA_KEY = "zeyta_voice"
+CONDITIONING_GROUPS = ("t3", "gen")  # ChatterboxTTS Conditionals: T3Cond fields and the S3Gen ref dict
+
+_DTYPES = {
+    "F64": np.float64, "F32": np.float32, "F16": np.float16,
+    "I64": np.int64, "I32": np.int32, "I16": np.int16, "I8": np.int8,
+    "U8": np.uint8, "BOOL": np.bool_,
+}
+_CODES = {np.dtype(dtype): code for code, dtype in _DTYPES.items()}
+
+
+class BundleError(ValueError):
+    """The file is not a voice bundle this version can read."""
+
+
+def clip_tags(path) -> List[str]:
+    """Emotion/style tags from a clip's file name: ``angry_5s.wav`` -> ``["angry"]``."""
+    words = re.split(r"[^a-z0-9]+", Path(str(path)).stem.lower())
+    return [w for w in words if w and not re.fullmatch(r"\d+(s|sec|k|khz|hz)?", w)]
+
+
+def voice_hash(audio: np.ndarray, sample_rate: int) -> str:
+    """Content hash of a voice: its combined prompt samples and rate."""
+    h = hashlib.sha256(str(int(sample_rate)).encode())
+    h.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+def _to_array(value) -> np.ndarray:
+    if hasattr(value, "detach"):
+        value = value.detach().cpu()
+        if str(value.dtype) == "torch.bfloat16":
+            value = value.float()
+        value = value.numpy()
+    return np.ascontiguousarray(value)
+
+
+def _flatten_conditionals(conds) -> tuple:
+    """Tensors (``conds.<group>.<field>``) and the JSON description of a Conditionals object."""
+    tensors, spec = {}, {}
+    for group in CONDITIONING_GROUPS:
+        part = getattr(conds, group)
+        fields = part if isinstance(part, dict) else vars(part)
+        spec[group] = {"tensors": [], "values": {}}
+        for name, value in fields.items():
+            if hasattr(value, "detach") or isinstance(value, np.ndarray):
+                tensors[f"conds.{group}.{name}"] = _to_array(value)
+                spec[group]["tensors"].append(name)
+            else:
+                json.dumps(value)  # TypeError for anything a header cannot hold
+                spec[group]["values"][name] = value
+    return tensors, spec
+
+
+def _write_safetensors(path: Path, tensors: Dict[str, np.ndarray], metadata: Dict[str, str]) -> None:
+    # Widest dtype first: each tensor then starts on a multiple of its item size
+    order = sorted(tensors, key=lambda name: (-tensors[name].dtype.itemsize, name))
+    header, offset = {}, 0
+    for name in order:
+        array = tensors[name]
+        if array.dtype not in _CODES:
+            raise TypeError(f"Unsupported dtype {array.dtype} for tensor {name!r}")
+        header[name] = {"dtype": _CODES[array.dtype], "shape": list(array.shape),
+                        "data_offsets": [offset, offset + array.nbytes]}
+        offset += array.nbytes
+    header["__metadata__"] = metadata
+    blob = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    blob += b" " * (-len(blob) % 8)  # keeps the data section 8-byte aligned
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        for name in order:
+            f.write(np.ascontiguousarray(tensors[name]).tobytes())
+    os.replace(tmp, path)
+
+
+def save_bundle(path, prepared: PreparedReference, conds=None, name: Optional[str] = None) -> Path:
+    """Write a bundle from prepared reference audio and (optionally) model conditionals."""
+    path = Path(path)
+    tensors = {"audio": np.ascontiguousarray(prepared.audio, dtype=np.float32)}
+    conds_spec = None
+    if conds is not None:
+        conds_tensors, conds_spec = _flatten_conditionals(conds)
+        tensors.update(conds_tensors)
+    clips = []
+    for clip in prepared.clips:
+        info = asdict(clip)
+        info["name"] = Path(info.pop("path")).name
+        info["tags"] = clip_tags(clip.path)
+        clips.append(info)
+    meta = {
+        "format": BUNDLE_FORMAT,
+        "name": name or path.stem,
+        "content_hash": voice_hash(prepared.audio, prepared.sample_rate),
+        "sample_rate": int(prepared.sample_rate),
+        "duration": round(prepared.duration, 3),
+        "clips": clips,
+        "conditionals": conds_spec,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    _write_safetensors(path, tensors, {METADATA_KEY: json.dumps(meta)})
+    return path
+
+
+def build_bundle(reference_files: Sequence, path, conds=None, name: Optional[str] = None,
+                 **prepare_kwargs) -> Path:
+    """Prepare reference clips (load, resample, normalize, join) and write them as a bundle."""
+    return save_bundle(path, prepare_references(reference_files, **prepare_kwargs), conds, name)
+
+
+class VoiceBundle:
+    """A memory-mapped voice bundle. Arrays are views into the file (copy-on-write)."""
+
+    def __init__(self, path, header: dict, mapped: np.memmap, data_start: int) -> None:
+        self.path = Path(path)
+        self.meta = json.loads(header["__metadata__"][METADATA_KEY])
+        self._header = header
+        self._mapped = mapped
+        self._data_start = data_start
+
+    @property
+    def name(self) -> str:
+        return self.meta["name"]
+
+    @property
+    def content_hash(self) -> str:
+        return self.meta["content_hash"]
+
+    @property
+    def sample_rate(self) -> int:
+        return self.meta["sample_rate"]
+
+    @property
+    def duration(self) -> float:
+        return self.meta["duration"]
+
+    @property
+    def clips(self) -> List[dict]:
+        return self.meta["clips"]
+
+    @property
+    def tags(self) -> List[str]:
+        return sorted({tag for clip in self.clips for tag in clip["tags"]})
+
+    @property
+    def has_conditionals(self) -> bool:
+        return self.meta.get("conditionals") is not None
+
+    def tensor(self, name: str) -> np.ndarray:
+        entry = self._header[name]
+        begin, end = entry["data_offsets"]
+        dtype = np.dtype(_DTYPES[entry["dtype"]])
+        return np.ndarray(tuple(entry["shape"]), dtype=dtype, buffer=self._mapped,
+                          offset=self._data_start + begin)
+
+    @property
+    def audio(self) -> np.ndarray:
+        """The combined, normalized reference prompt (mono float32)."""
+        return self.tensor("audio")
+
+    def wav_bytes(self) -> bytes:
+        """The prompt as an in-memory WAV, for models that take a reference file."""
+        import soundfile as sf
+        buffer = BytesIO()
+        sf.write(buffer, self.audio, self.sample_rate, format="WAV", subtype="FLOAT")
+        return buffer.getvalue()
+
+    def conditioning_arrays(self) -> Dict[str, dict]:
+        """``{"t3": {...}, "gen": {...}}`` with numpy views for tensors and plain values for the rest."""
+        spec = self.meta.get("conditionals")
+        if spec is None:
+            raise BundleError(f"{self.path} has no precomputed conditionals")
+        parts = {}
+        for group in CONDITIONING_GROUPS:
+            values = dict(spec[group]["values"])
+            for field in spec[group]["tensors"]:
+                values[field] = self.tensor(f"conds.{group}.{field}")
+            parts[group] = values
+        return parts
+
+    def conditionals(self, device: str = "cpu"):
+        """ChatterboxTTS ``Conditionals`` backed by the mapped file (copied only when moved off the CPU)."""
+        import torch
+        from chatterbox.tts import Conditionals, T3Cond
+
+        parts = self.conditioning_arrays()
+        for group in parts.values():
+            for field, value in group.items():
+                if isinstance(value, np.ndarray):
+                    group[field] = torch.from_numpy(value)
+        return Conditionals(T3Cond(**parts["t3"]), parts["gen"]).to(device)
+
+    def verify(self) -> bool:
+        """Recompute the content hash from the stored audio (reads every audio page)."""
+        return voice_hash(self.audio, self.sample_rate) == self.content_hash
+
+
+def is_bundle(path) -> bool:
+    return str(path).lower().endswith(BUNDLE_SUFFIX)
+
+
+def load_bundle(path) -> VoiceBundle:
+    """Open a bundle; only the header is read, arrays are mapped lazily."""
+    path = Path(path)
+    with open(path, "rb") as f:
+        prefix = f.read(8)
+        if len(prefix) < 8:
+            raise BundleError(f"{path} is not a voice bundle (truncated)")
+        (header_len,) = struct.unpack("<Q", prefix)
+        if header_len > os.path.getsize(path) - 8:
+            raise BundleError(f"{path} is not a voice bundle (bad header length)")
+        try:
+            header = json.loads(f.read(header_len))
+        except ValueError:
+            raise BundleError(f"{path} is not a voice bundle (unreadable header)")
+    metadata = header.get("__metadata__") or {}
+    if METADATA_KEY not in metadata:
+        raise BundleError(f"{path} is a safetensors file but not a voice bundle")
+    meta = json.loads(metadata[METADATA_KEY])
+    if meta.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"{path} has bundle format {meta.get('format')}, expected {BUNDLE_FORMAT}")
+    mapped = np.memmap(path, dtype=np.uint8, mode="c")
+    return VoiceBundle(path, header, mapped, 8 + header_len)
+
+
+__all__ = [
+    "BUNDLE_FORMAT", "BUNDLE_SUFFIX", "BundleError", "VoiceBundle", "build_bundle", "clip_tags",
+    "is_bundle", "load_bundle", "save_bundle", "voice_hash",
+]
@@ -0,0 +1,145 @@
+# IO/wakeword.py
+"""Wake-word gate in front of the main Whisper model.
+
+Each VAD-positive utterance is first checked by a cheap keyword spotter
+(faster-whisper ``tiny.en`` on the first couple of seconds by default).
+Only utterances that contain a wake phrase, or that arrive within the
+conversation follow-up window, are passed on to the full STT model.
+"""
+from __future__ import annotations
+import difflib
+import logging
+import re
+import time
+from typing import Callable, Iterable, Optional
+
+from utils import model_registry
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+class WhisperKeywordSpotter:
+    """Transcribe the head of an utterance with a small Whisper model."""
+
+    def __init__(self, model_size: str = "tiny.en", device: str = "cpu", compute_type: str = "int8") -> None:
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self._model = None  # utils.model_registry handle
+
+    def _handle(self):
+        if self._model is None:
+            from faster_whisper import WhisperModel
+
+            def load():
+                logging.info(f"[wakeword] Loading keyword spotter: whisper {self.model_size} ({self.device}/{self.compute_type})")
+                return WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+
+            self._model = model_registry.acquire("wakeword", f"whisper-{self.model_size}", load,
+                                                 device=self.device, dtype=self.compute_type)
+        return self._model
+
+    def __call__(self, audio, sample_rate: int) -> str:
+        # Segments decode lazily, so they are collected while the model is held
+        with self._handle().use() as model:
+            segments, _ = model.transcribe(
+                audio, beam_size=1, language="en", without_timestamps=True, condition_on_previous_text=False
+            )
+            return " ".join(seg.text for seg in segments)
+
+
+class WakeWordGate:
+    """Decide whether an utterance should reach the full STT model.
+
+    ``spotter`` is any callable ``(audio, sample_rate) -> text``. A phrase
+    matches when some run of words in the spotted text is at least
+    ``match_threshold`` similar to it, which tolerates small mishearings
+    ("hey zeta" for "hey zeyta").
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[str],
+        follow_up_seconds: float = 10.0,
+        spotter: Optional[Callable] = None,
+        head_seconds: float = 2.0,
+        match_threshold: float = 0.75,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.phrases = [" ".join(_words(p)) for p in phrases if _words(p)]
+        if not self.phrases:
+            raise ValueError("WakeWordGate needs at least one non-empty wake phrase")
+        self.follow_up_seconds = follow_up_seconds
+        self.spotter = spotter or WhisperKeywordSpotter()
+        self.head_seconds = head_seconds
+        self.match_threshold = match_threshold
+        self._clock = clock
+        self._open_until = 0.0
+        self.last_match: Optional[str] = None
+        self.stats = {"checked": 0, "woken": 0, "follow_up": 0, "rejected": 0, "spotter_calls": 0}
+
+    # ---------------- Follow-up window ----------------
+    def open_window(self, seconds: Optional[float] = None) -> None:
+        """Let utterances through without the wake phrase for a while."""
+        seconds = self.follow_up_seconds if seconds is None else seconds
+        self._open_until = max(self._open_until, self._clock() + seconds)
+
+    def close_window(self) -> None:
+        self._open_until = 0.0
+
+    def window_open(self) -> bool:
+        return self._clock() < self._open_until
+
+    # ---------------- Matching ----------------
+    def match(self, text: str) -> Optional[str]:
+        """Return the wake phrase found in ``text``, if any."""
+        words = _words(text)
+        for phrase in self.phrases:
+            n = len(phrase.split())
+            for i in range(max(1, len(words) - n + 1)):
+                candidate = " ".join(words[i:i + n])
+                if difflib.SequenceMatcher(None, candidate, phrase).ratio() >= self.match_threshold:
+                    return phrase
+        return None
+
+    def check(self, audio, sample_rate: int) -> bool:
+        """True if the utterance should be transcribed by the main model."""
+        self.stats["checked"] += 1
+        self.last_match = None
+        if self.window_open():
+            self.stats["follow_up"] += 1
+            return True
+
+        head = audio[:int(self.head_seconds * sample_rate)]
+        self.stats["spotter_calls"] += 1
+        try:
+            spotted = self.spotter(head, sample_rate)
+        except Exception as e:
+            logging.error(f"[wakeword] Keyword spotter failed: {e}")
+            spotted = ""
+
+        phrase = self.match(spotted)
+        if phrase is None:
+            self.stats["rejected"] += 1
+            return False
+        self.last_match = phrase
+        self.stats["woken"] += 1
+        self.open_window()
+        return True
+
+    def strip_wake_phrase(self, text: str) -> str:
+        """Remove a leading wake phrase (and trailing punctuation) from a transcript."""
+        words = text.split()
+        for phrase in self.phrases:
+            n = len(phrase.split())
+            head = " ".join(_words(" ".join(words[:n])))
+            if head and difflib.SequenceMatcher(None, head, phrase).ratio() >= self.match_threshold:
+                return " ".join(words[n:]).lstrip(" ,.!?;:-")
+        return text
+
+
+__all__ = ["WakeWordGate", "WhisperKeywordSpotter"]
@@ -13,24 +13,29 @@ import sys
 from pathlib import Path
 from typing import List, Tuple, Optional
 
+from utils import model_registry
+from utils.profiler import model_load
+
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 logging.getLogger().setLevel(logging.ERROR)
 
-import gradio as gr
-import torch
+# gradio, torch and the model libraries are imported where they are first
+# used, so starting the app (and importing this module) stays fast
 
 # Global state variables
+# Models are utils.model_registry handles: shared with the rest of the process
+# and loaded again on demand if the registry unloaded them
 llm_model = None
 stt_model = None
 tts_model = None
+tts_voice_bundle = ""  # re-applied whenever the TTS model is (re)loaded
 chat_history = []
 
 # Configuration
 APP_DIR = Path(__file__).parent
 OUTPUT_DIR = APP_DIR / "outputs"
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 
 def extract_file_content(file_path: str) -> str:
@@ -77,6 +82,7 @@ def initialize_llm(model_id: str = None):
     """Initialize LLM model"""
     global llm_model
     try:
+        import torch
         from transformers import pipeline
         
         # Check if config exists
@@ -88,13 +94,16 @@ def initialize_llm(model_id: str = None):
         elif model_id is None:
             model_id = "chuanli11/Llama-3.2-3B-Instruct-uncensored"
         
-        llm_model = pipeline(
+        handle = model_registry.acquire("llm", model_id, lambda: pipeline(
             "text-generation",
             model=model_id,
             device_map="auto",
             return_full_text=False,
             torch_dtype=torch.float16
-        )
+        ), device="auto", dtype="float16")
+        with model_load("llm"):
+            handle.get()
+        llm_model = handle
         
         return f"Γ£à LLM Model loaded: {model_id}"
     except Exception as e:
@@ -106,30 +115,80 @@ def initialize_stt(model_size: str = "base"):
     global stt_model
     try:
         from faster_whisper import WhisperModel
-        stt_model = WhisperModel(model_size, device="auto", compute_type="float16")
+        handle = model_registry.acquire("stt", f"whisper-{model_size}", lambda: WhisperModel(
+            model_size, device="auto", compute_type="float16"), device="auto", dtype="float16")
+        with model_load("stt"):
+            handle.get()
+        stt_model = handle
         return f"Γ£à STT Model loaded: Whisper {model_size}"
     except Exception as e:
         return f"Γ¥î Failed to load STT: {str(e)}"
 
 
-def initialize_tts(device: str = "cuda"):
-    """Initialize Text-to-Speech model"""
+def initialize_tts(device: str = "cuda", voice_bundle: str = ""):
+    """Initialize Text-to-Speech model, optionally speaking with a voice bundle"""
     global tts_model
     try:
+        import torch
         from chatterbox.tts import ChatterboxTTS
         
         device = device if device == "cuda" and torch.cuda.is_available() else "cpu"
-        tts_model = ChatterboxTTS(device=device)
         
-        if device == "cuda":
-            tts_model.model.eval()
-            torch.cuda.empty_cache()
-        
-        return f"Γ£à TTS Model loaded on {device.upper()}"
+        def load():
+            model = ChatterboxTTS(device=device)
+            if device == "cuda":
+                model.model.eval()
+                torch.cuda.empty_cache()
+            if tts_voice_bundle:
+                _apply_voice_bundle(model, tts_voice_bundle, device)
+            return model
+        
+        handle = model_registry.acquire("tts", "chatterbox", load, device=device)
+        with model_load("tts"):
+            handle.get()
+        tts_model = handle
+        
+        status = f"Γ£à TTS Model loaded on {device.upper()}"
+        if voice_bundle and voice_bundle.strip():
+            status += f" - {load_voice_bundle(voice_bundle.strip(), device)}"
+        return status
     except Exception as e:
         return f"Γ¥î Failed to load TTS: {str(e)}"
 
 
+def load_voice_bundle(bundle_path: str, device: str = "cpu") -> str:
+    """Use a voice bundle (*.voice, see utils/make_voice_bundle.py) as the TTS voice"""
+    global tts_model, tts_voice_bundle
+    
+    if tts_model is None:
+        return "ΓÜá∩╕Å TTS model not initialized"
+    
+    try:
+        import time
+        
+        start_time = time.time()
+        with tts_model.use() as model:
+            bundle = _apply_voice_bundle(model, bundle_path, device)
+        tts_voice_bundle = bundle_path
+        return f"voice '{bundle.name}' ({len(bundle.clips)} clips) in {time.time() - start_time:.2f}s"
+    except Exception as e:
+        return f"Γ¥î Failed to load voice bundle: {str(e)}"
+
+
+def _apply_voice_bundle(model, bundle_path: str, device: str):
+    """Set a loaded ChatterboxTTS model's voice from a bundle; returns the bundle"""
+    from io import BytesIO
+    from IO.voice_bundle import load_bundle
+    
+    bundle = load_bundle(bundle_path)
+    if bundle.has_conditionals:
+        # Precomputed conditioning, memory-mapped from the bundle
+        model.conds = bundle.conditionals(device)
+    else:
+        model.prepare_conditionals(BytesIO(bundle.wav_bytes()))
+    return bundle
+
+
 def transcribe_audio(audio_file: str) -> str:
     """Transcribe audio using STT"""
     global stt_model
@@ -141,8 +200,9 @@ def transcribe_audio(audio_file: str) -> str:
         return "ΓÜá∩╕Å No audio file provided"
     
     try:
-        segments, info = stt_model.transcribe(audio_file, beam_size=5)
-        text = " ".join([segment.text for segment in segments])
+        with stt_model.use() as model:
+            segments, info = model.transcribe(audio_file, beam_size=5)
+            text = " ".join([segment.text for segment in segments])
         return text
     except Exception as e:
         return f"Γ¥î Transcription failed: {str(e)}"
@@ -156,14 +216,16 @@ def generate_speech(text: str) -> Optional[str]:
         return None
     
     try:
+        import torch
         import torchaudio as ta
         import time
         
-        with torch.no_grad():
-            audio_data = tts_model.generate(text=text, temperature=0.8)
+        with tts_model.use() as model, torch.no_grad():
+            audio_data = model.generate(text=text, temperature=0.8)
+            sample_rate = getattr(model, 'sample_rate', 24000)
         
+        OUTPUT_DIR.mkdir(exist_ok=True)
         output_path = OUTPUT_DIR / f"speech_{int(time.time())}.wav"
-        sample_rate = getattr(tts_model, 'sample_rate', 24000)
         
         if torch.is_tensor(audio_data):
             audio_data = audio_data.cpu()
@@ -243,10 +305,11 @@ def chat_with_pipeline(
             "repetition_penalty": 1.3,
         }
         
-        if hasattr(llm_model, 'tokenizer') and hasattr(llm_model.tokenizer, 'eos_token_id'):
-            gen_args['pad_token_id'] = llm_model.tokenizer.eos_token_id
-        
-        output = llm_model(messages, **gen_args)
+        with llm_model.use() as pipe:
+            if hasattr(pipe, 'tokenizer') and hasattr(pipe.tokenizer, 'eos_token_id'):
+                gen_args['pad_token_id'] = pipe.tokenizer.eos_token_id
+            
+            output = pipe(messages, **gen_args)
         response = output[0]['generated_text']
         
         # Generate speech if needed (TTS)
@@ -263,6 +326,9 @@ def chat_with_pipeline(
 def create_app():
     """Create the Gradio application interface"""
     
+    import gradio as gr
+    import torch
+    
     with gr.Blocks(title="Zeyta AI Assistant", theme=gr.themes.Soft()) as app:
         gr.Markdown(
             """
@@ -315,6 +381,11 @@ def create_app():
                             label="TTS Device",
                             scale=1
                         )
+                        tts_bundle = gr.Textbox(
+                            label="Voice Bundle (optional)",
+                            placeholder="voices/zeyta.voice",
+                            scale=1
+                        )
                         tts_init_btn = gr.Button("≡ƒöè Initialize TTS", size="sm")
                         tts_status = gr.Textbox(label="TTS Status", interactive=False, scale=2)
             
@@ -431,7 +502,7 @@ def create_app():
         
         tts_init_btn.click(
             fn=initialize_tts,
-            inputs=[tts_device],
+            inputs=[tts_device, tts_bundle],
             outputs=[tts_status]
         )
         
@@ -466,32 +537,35 @@ def create_app():
 
 
 if __name__ == "__main__":
+    from utils.profiler import enable_startup_profile, log_startup_report, startup_profile_requested
+    if startup_profile_requested():
+        enable_startup_profile()
+    
     print("=" * 60)
     print("≡ƒÜÇ Starting Zeyta AI Assistant")
     print("=" * 60)
     print()
     
-    # Check dependencies
+    # Check dependencies (located, not imported - they are loaded with their models)
     print("≡ƒôª Checking dependencies...")
+    from importlib.util import find_spec
     
-    try:
-        import faster_whisper
+    if find_spec("faster_whisper"):
         print("Γ£à Faster-Whisper available")
-    except ImportError:
+    else:
         print("ΓÜá∩╕Å  Faster-Whisper not found (needed for voice features)")
     
-    try:
-        from transformers import pipeline
+    if find_spec("transformers"):
         print("Γ£à Transformers available")
-    except ImportError:
+    else:
         print("Γ¥î Transformers not found - LLM features will not work")
     
-    try:
-        from chatterbox.tts import ChatterboxTTS
+    if find_spec("chatterbox"):
         print("Γ£à ChatterboxTTS available")
-    except ImportError:
+    else:
         print("ΓÜá∩╕Å  ChatterboxTTS not found (needed for voice output)")
     
+    import torch
     if torch.cuda.is_available():
         print(f"Γ£à CUDA available - {torch.cuda.get_device_name(0)}")
     else:
@@ -503,6 +577,7 @@ if __name__ == "__main__":
     print("=" * 60)
     
     app = create_app()
+    log_startup_report(log=print)
     
     # Try to launch in a standalone window using webview
     try:
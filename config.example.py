@@ -4,15 +4,31 @@
 # --- Model Configurations ---
 # LLM model for the brain
 LLM_MODEL_ID = "chuanli11/Llama-3.2-3B-Instruct-uncensored"  # Or your preferred model
+PARALLEL_MODEL_INIT = True  # load the LLM, STT and TTS models concurrently at startup
+MODEL_RAM_BUDGET_MB = None  # unload least recently used models to stay under this much RAM; None = no limit
+MODEL_IDLE_UNLOAD_SECONDS = None  # unload models unused for this long (reloaded when next needed); None = never
 
 # STT (Whisper) model settings
 STT_MODEL_SIZE = "large-v3"  # Options: "tiny", "base", "small", "medium", "large-v3"
 STT_COMPUTE_TYPE = "float16"  # "float16", "int8", "float32"
+STT_VAD_BACKEND = "webrtc"  # "webrtc" (per-frame webrtcvad) or "numpy" (vectorized energy/spectral VAD)
+
+# Wake word: only send utterances to Whisper after one of these phrases,
+# or within the follow-up window after the assistant has replied
+WAKE_WORD_ENABLED = False
+WAKE_WORD_PHRASES = ["hey zeyta"]
+WAKE_WORD_FOLLOW_UP_SECONDS = 10.0
+WAKE_WORD_MODEL_SIZE = "tiny.en"  # small Whisper model used as the keyword spotter
 
 # --- TTS Configuration ---
 TTS_RATE = 175
 TTS_VOLUME = 1.0
 TTS_BACKEND = "coqui"  # "piper" or "coqui"
+TTS_CACHE_ENABLED = True  # reuse audio for repeated phrases (cache/tts_results)
+TTS_CACHE_MAX_CHARS = 200  # only cache phrases up to this length
+TTS_PREWARM_PHRASES = None  # phrases synthesized at startup; None -> farewell + error reply
+TTS_CHUNK_CHARS = 250  # longer replies are synthesized in chunks, playback starts after the first; 0 disables
+TTS_CHUNK_WORKERS = 2  # Piper chunks synthesized in parallel
 
 # Coqui TTS settings (used when TTS_BACKEND == "coqui")
 COQUI_MODEL_NAME = "tts_models/multilingual/multi-dataset/xtts_v2"  # XTTS v2 for voice cloning
@@ -0,0 +1,83 @@
+# core/bootstrap.py
+"""Concurrent model start-up.
+
+The LLM, STT and TTS loads are independent and spend most of their time in
+file I/O, deserialization and native code (which release the GIL), so
+:class:`ModelBootstrap` runs each loader on its own thread. Callers wait
+for exactly the component they need next, e.g. the controller generates the
+greeting as soon as the LLM is up, while Whisper and the voice are still
+loading.
+
+Each load is timed with ``utils.profiler.model_load`` (so it shows up in the
+startup report) and emits a ``model_ready``/``model_failed`` trace event.
+"""
+from __future__ import annotations
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from utils.profiler import model_load, trace
+
+
+class ModelBootstrap:
+    """Loads named components concurrently; ``wait(name)`` returns what its loader returned."""
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]], parallel: bool = True) -> None:
+        self.loaders = dict(loaders)
+        self.parallel = parallel
+        self._futures: Dict[str, Future] = {}
+        self._seconds: Dict[str, float] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> "ModelBootstrap":
+        """Submit every loader (in the given order; one at a time unless ``parallel``)."""
+        if self._pool is None:
+            workers = len(self.loaders) if self.parallel else 1
+            self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="model-load")
+            for name, loader in self.loaders.items():
+                self._futures[name] = self._pool.submit(self._load, name, loader)
+            self._pool.shutdown(wait=False)
+        return self
+
+    def _load(self, name: str, loader: Callable[[], Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            with model_load(name):
+                result = loader()
+        except Exception as e:
+            self._seconds[name] = time.perf_counter() - start
+            logging.error(f"[bootstrap] {name} failed after {self._seconds[name]:.1f}s: {e}")
+            trace("model_failed", model=name)
+            raise
+        self._seconds[name] = time.perf_counter() - start
+        logging.info(f"[bootstrap] {name} ready in {self._seconds[name]:.1f}s")
+        trace("model_ready", model=name)
+        return result
+
+    def ready(self, name: str) -> bool:
+        future = self._futures[name]
+        return future.done() and future.exception() is None
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Block until ``name`` is loaded; re-raises its loader's exception."""
+        return self._futures[name].result(timeout)
+
+    def wait_all(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        return {name: self.wait(name, None if deadline is None else max(0.0, deadline - time.monotonic()))
+                for name in self._futures}
+
+    def status(self) -> Dict[str, dict]:
+        """``{name: {"state": "pending"|"loading"|"ready"|"failed", "seconds": ...}}``"""
+        report = {}
+        for name, future in self._futures.items():
+            if not future.done():
+                state = "loading" if future.running() else "pending"
+            else:
+                state = "failed" if future.exception() is not None else "ready"
+            report[name] = {"state": state, "seconds": self._seconds.get(name)}
+        return report
+
+
+__all__ = ["ModelBootstrap"]
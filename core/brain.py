@@ -1,7 +1,6 @@
 # core/brain.py
-import torch
-from transformers import pipeline
 import logging
+from utils import model_registry
 from config import LLM_MODEL_ID, GENERATION_ARGS, INITIAL_GEN_ARGS
 
 try:
@@ -14,13 +13,19 @@ class Brain:
     Handles loading the Language Model and generating text responses.
     """
     def __init__(self, context_manager=None):
-        self.pipe = self._load_model()
+        # Shared through the model registry: loaded once per process, reloaded on demand after an unload
+        self.model = model_registry.acquire("llm", LLM_MODEL_ID, self._load_model, device="auto", dtype="float16")
+        self.model.get()
         self.context_manager = context_manager
 
     def _load_model(self):
         """Loads the text-generation pipeline."""
         logging.info(f"Loading language model: {LLM_MODEL_ID}")
         try:
+            # torch/transformers take seconds to import; only pay for them when a model is loaded
+            import torch
+            from transformers import pipeline
+
             pipe = pipeline(
                 "text-generation",
                 model=LLM_MODEL_ID,
@@ -40,10 +45,6 @@ class Brain:
 
     def generate_response(self, messages, initial=False):
         """Generates a response from the LLM based on the conversation history."""
-        if not self.pipe:
-            logging.error("Model pipeline is not available.")
-            return "My brain isn't working right now."
-
         try:
             # Check if the latest user message is a memory query
             if ENABLE_HISTORY_SEARCH and self.context_manager and not initial and len(messages) > 1:
@@ -70,18 +71,24 @@ class Brain:
             # Use different generation arguments for the initial greeting
             gen_args = INITIAL_GEN_ARGS if initial else GENERATION_ARGS
             
-            # Add the pad_token_id to the arguments if tokenizer is available
-            try:
-                tokenizer = getattr(self.pipe, 'tokenizer', None)
-                if tokenizer is not None and getattr(tokenizer, 'eos_token_id', None) is not None:
-                    gen_args['pad_token_id'] = tokenizer.eos_token_id
-                else:
-                    # fallback: use pad_token_id=0 safely if tokenizer doesn't expose eos_token_id
+            # Held for the whole generation so the registry cannot unload it mid-call
+            with self.model.use() as pipe:
+                if not pipe:
+                    logging.error("Model pipeline is not available.")
+                    return "My brain isn't working right now."
+
+                # Add the pad_token_id to the arguments if tokenizer is available
+                try:
+                    tokenizer = getattr(pipe, 'tokenizer', None)
+                    if tokenizer is not None and getattr(tokenizer, 'eos_token_id', None) is not None:
+                        gen_args['pad_token_id'] = tokenizer.eos_token_id
+                    else:
+                        # fallback: use pad_token_id=0 safely if tokenizer doesn't expose eos_token_id
+                        gen_args.setdefault('pad_token_id', 0)
+                except Exception:
                     gen_args.setdefault('pad_token_id', 0)
-            except Exception:
-                gen_args.setdefault('pad_token_id', 0)
-            
-            outputs = self.pipe(messages, **gen_args)
+                
+                outputs = pipe(messages, **gen_args)
             return outputs[0]['generated_text']
         except Exception as e:
             logging.error(f"An error occurred during AI response generation: {e}")
@@ -6,8 +6,21 @@ from datetime import datetime
 from core.brain import Brain
 from core.context import ContextManager
 from IO import stt, tts
+from core.bootstrap import ModelBootstrap
+from utils import model_registry
+from utils.profiler import log_startup_report, trace
 from config import SYSTEM_PROMPT, INITIAL_GREETING, EXIT_PHRASES, FAREWELL_MESSAGE, CHAT_LOG_DIR, INTEGRATE_PAST_LOGS
 
+try:
+    from config import PARALLEL_MODEL_INIT
+except ImportError:
+    PARALLEL_MODEL_INIT = True  # load LLM, STT and TTS concurrently
+try:
+    from config import MODEL_RAM_BUDGET_MB, MODEL_IDLE_UNLOAD_SECONDS
+except ImportError:
+    MODEL_RAM_BUDGET_MB = None  # no limit
+    MODEL_IDLE_UNLOAD_SECONDS = None  # models stay loaded
+
 
 # Ensure the chat log directory exists
 os.makedirs(CHAT_LOG_DIR, exist_ok=True)
@@ -41,20 +54,28 @@ class ChatLogManager:
         except Exception as e:
             logging.error(f"Failed to save chat log: {e}")
 
-def conversation_loop():
+def conversation_loop(brain=None):
     """
     The main control loop for the assistant.
     Orchestrates listening, thinking, and speaking.
+
+    `brain` may be supplied pre-built (e.g. a stub for benchmarking);
+    otherwise the configured LLM is loaded.
     """
     chat_log_manager = ChatLogManager(CHAT_LOG_DIR)  # Create early
     context = None
 
     try:
         # --- Initialization ---
+        # LLM, STT and TTS load concurrently; each stage below waits only for what it needs
         context = ContextManager(SYSTEM_PROMPT)
-        brain = Brain(context_manager=context)
-        stt.initialize_stt()
-        tts.initialize_tts()
+        model_registry.configure(MODEL_RAM_BUDGET_MB, MODEL_IDLE_UNLOAD_SECONDS)
+        loaders = {
+            "llm": (lambda: brain) if brain is not None else (lambda: Brain(context_manager=context)),
+            "tts": lambda: tts.initialize_tts(warm_cache=False),
+            "stt": stt.initialize_stt,
+        }
+        bootstrap = ModelBootstrap(loaders, parallel=PARALLEL_MODEL_INIT).start()
 
         # --- Load and inform AI of past conversations ---
         past_logs = chat_log_manager.load_logs() if INTEGRATE_PAST_LOGS else []
@@ -71,12 +92,22 @@ def conversation_loop():
             logging.info("[controller] Starting fresh conversation (no past integration)")
 
         # --- Initial AI Response ---
+        # Generated as soon as the LLM is up, spoken as soon as the voice is
+        brain = bootstrap.wait("llm")
         logging.info("Generating initial AI response...")
         context.add_message("user", INITIAL_GREETING)
         initial_response = brain.generate_response(context.get_history(), initial=True)
         context.add_message("assistant", initial_response)
         logging.info(f"AI: {initial_response}")
+        bootstrap.wait("tts")
         tts.speak(initial_response)
+        # Fixed phrases are cached while Whisper finishes loading, not before the greeting
+        tts.prewarm()
+        bootstrap.wait("stt")
+        ready = ", ".join(f"{name} {info['seconds']:.1f}s" for name, info in bootstrap.status().items())
+        logging.info(f"[controller] Models ready ({ready})")
+        log_startup_report()
+        stt.open_follow_up_window()
 
         # --- Main Conversation Loop ---
         while True:
@@ -94,14 +125,24 @@ def conversation_loop():
 
             context.add_message("user", user_text)
             ai_response = brain.generate_response(context.get_history())
+            trace("llm_done", chars=len(ai_response))
             context.add_message("assistant", ai_response)
             logging.info(f"AI: {ai_response}")
             tts.speak(ai_response)
+            # Allow a follow-up without repeating the wake phrase
+            stt.open_follow_up_window()
 
+    except EOFError:
+        logging.info("[controller] Audio input exhausted; ending conversation")
     except Exception as e:
         logging.critical(f"A critical error occurred in the main loop: {e}", exc_info=True)
     finally:
         if context:
             chat_log_manager.save_log(context.get_history())
             context.save_snapshot()
+        logging.info(f"[controller] STT stats: {stt.get_stats()}")
+        logging.info(f"[controller] TTS cache stats: {tts.get_cache_stats()}")
+        for info in model_registry.registry.stats():
+            logging.info(f"[controller] Model {info['kind']} {info['model_id']}: {info['ram_mb']}MB RAM, "
+                         f"{info['device_mb']}MB device, loaded {info['loads']}x, last load {info['load_seconds']}s")
         logging.info("Shutting down Neuro Assistant.")
\ No newline at end of file
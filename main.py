@@ -5,7 +5,12 @@ def main():
     """
     Entry point for the Lumi Assistant.
     Initializes the logger and starts the main conversation loop.
+    `--profile-startup` (or ZEYTA_STARTUP_PROFILE=1) logs where startup time goes.
     """
+    from utils.profiler import enable_startup_profile, startup_profile_requested
+    if startup_profile_requested():
+        # Per-module import and per-model load times, logged once the models are up
+        enable_startup_profile()
     from utils.logger import setup_logger
     from core.controller import conversation_loop
 
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+ChatterboxTTS model snapshots: per-submodule safetensors, memory-mapped on load.
+
+Pickling the whole ChatterboxTTS object (torch.save / torch.load) ties the
+cache to the exact class layout of the installed library and reads every
+weight into freshly allocated memory. A snapshot instead stores
+
+    t3.safetensors, s3gen.safetensors, ve.safetensors   state dicts
+    tokenizer.json, conds.pt                           tokenizer + built-in voice
+    manifest.json                                      versions, files, tied weights
+
+Tensors are loaded with safetensors (mmap) and assigned straight into the
+modules, so on CPU the weights stay backed by the page cache instead of
+being copied. The manifest records the snapshot format, the chatterbox-tts
+and torch versions and each file's size; a snapshot whose manifest does not
+match the installed libraries is reported as stale and rebuilt.
+
+Benchmark cold start of the snapshot against the pickle path:
+
+    python testing/model_snapshot.py --benchmark --device cpu
+"""
+
+import hashlib
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+SNAPSHOT_FORMAT = 1
+SUBMODULES = ("t3", "s3gen", "ve")
+
+
+class StaleSnapshot(Exception):
+    """The snapshot on disk does not match the installed libraries (or is incomplete)."""
+
+
+def library_versions():
+    from importlib import metadata
+    versions = {}
+    for dist in ("chatterbox-tts", "torch", "safetensors"):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = None
+    return versions
+
+
+def _split_tied(state_dict):
+    """Keep one copy of tensors that share storage; returns (tensors, {alias: name})"""
+    tensors, aliases, seen = {}, {}, {}
+    for name, tensor in state_dict.items():
+        key = (tensor.data_ptr(), tensor.dtype, tuple(tensor.shape), tuple(tensor.stride())) if tensor.numel() else None
+        if key is not None and key in seen:
+            aliases[name] = seen[key]
+            continue
+        if key is not None:
+            seen[key] = name
+        tensors[name] = tensor.detach().cpu().contiguous()
+    return tensors, aliases
+
+
+def save_snapshot(model, directory):
+    """Write ``model`` as a snapshot directory (atomically replaces an existing one)"""
+    from safetensors.torch import save_file
+
+    directory = Path(directory)
+    tmp = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    manifest = {"format": SNAPSHOT_FORMAT, "versions": library_versions(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "files": {}, "aliases": {}}
+    for name in SUBMODULES:
+        tensors, aliases = _split_tied(getattr(model, name).state_dict())
+        save_file(tensors, str(tmp / f"{name}.safetensors"))
+        manifest["aliases"][name] = aliases
+    model.tokenizer.tokenizer.save(str(tmp / "tokenizer.json"))
+    if getattr(model, "conds", None) is not None:
+        model.conds.save(tmp / "conds.pt")
+
+    for f in sorted(tmp.iterdir()):
+        manifest["files"][f.name] = f.stat().st_size
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if directory.exists():
+        shutil.rmtree(directory)
+    tmp.rename(directory)
+    return manifest
+
+
+def read_manifest(directory):
+    """Validated manifest of a snapshot; raises StaleSnapshot if it cannot be used"""
+    directory = Path(directory)
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise StaleSnapshot(f"no readable manifest ({e})")
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise StaleSnapshot(f"snapshot format {manifest.get('format')} != {SNAPSHOT_FORMAT}")
+    installed = library_versions()
+    if manifest.get("versions") != installed:
+        raise StaleSnapshot(f"built with {manifest.get('versions')}, installed {installed}")
+    for name, size in manifest.get("files", {}).items():
+        path = directory / name
+        if not path.exists() or path.stat().st_size != size:
+            raise StaleSnapshot(f"{name} is missing or has the wrong size")
+    return manifest
+
+
+def snapshot_digest(directory):
+    """Content hash over all snapshot files (slow; for verification, not the startup path)"""
+    h = hashlib.sha256()
+    for f in sorted(Path(directory).iterdir()):
+        if f.name == "manifest.json":
+            continue
+        h.update(f.name.encode())
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()
+
+
+def _build_module(cls, path, aliases, device):
+    """Construct ``cls`` and assign memory-mapped tensors as its parameters and buffers"""
+    import torch
+    from safetensors.torch import load_file
+
+    state = load_file(str(path))  # memory-mapped on CPU
+    for alias, name in aliases.items():
+        state[alias] = state[name]
+
+    # Skip random init by building on the meta device; fall back if anything stays unset
+    try:
+        with torch.device("meta"):
+            module = cls()
+        module.load_state_dict(state, assign=True)
+        if any(t.is_meta for t in list(module.parameters()) + list(module.buffers())):
+            raise RuntimeError("non-persistent state left on the meta device")
+    except Exception:
+        module = cls()
+        module.load_state_dict(state, assign=True)
+    return module.to(device).eval()
+
+
+def load_snapshot(directory, device="cpu"):
+    """Build a ChatterboxTTS from a snapshot directory (raises StaleSnapshot)"""
+    from chatterbox.tts import ChatterboxTTS, Conditionals
+    from chatterbox.models.t3 import T3
+    from chatterbox.models.s3gen import S3Gen
+    from chatterbox.models.voice_encoder import VoiceEncoder
+    from chatterbox.models.tokenizers import EnTokenizer
+
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    aliases = manifest.get("aliases", {})
+    classes = {"t3": T3, "s3gen": S3Gen, "ve": VoiceEncoder}
+    modules = {name: _build_module(classes[name], directory / f"{name}.safetensors", aliases.get(name, {}), device)
+               for name in SUBMODULES}
+    tokenizer = EnTokenizer(str(directory / "tokenizer.json"))
+    conds = None
+    if (directory / "conds.pt").exists():
+        conds = Conditionals.load(directory / "conds.pt", map_location=device).to(device)
+    return ChatterboxTTS(modules["t3"], modules["s3gen"], modules["ve"], tokenizer, device, conds=conds)
+
+
+# ---------------- Cold start benchmark ----------------
+def _rss_mb():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        return None
+
+
+def _cold_load(kind, path, device):
+    """Run in a fresh interpreter: import + load one model format, print JSON timings"""
+    start = time.perf_counter()
+    import torch
+    imported = time.perf_counter()
+    if kind == "pickle":
+        model = torch.load(path, map_location=device, weights_only=False)
+    else:
+        model = load_snapshot(path, device)
+    loaded = time.perf_counter()
+    print(json.dumps({"kind": kind, "import_s": imported - start, "load_s": loaded - imported,
+                      "total_s": loaded - start, "max_rss_mb": _rss_mb(), "ok": model is not None}))
+
+
+def benchmark(pickle_path, snapshot_dir, device="cpu", runs=3):
+    """Time cold starts of each available format in separate processes"""
+    import subprocess
+    results = {}
+    for kind, path in (("pickle", pickle_path), ("snapshot", snapshot_dir)):
+        if not Path(path).exists():
+            print(f"⏭️  {kind}: {path} not found")
+            continue
+        rows = []
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, __file__, "--cold-load", kind, str(path), "--device", device],
+                                 capture_output=True, text=True)
+            lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+            if out.returncode != 0 or not lines:
+                print(f"❌ {kind} load failed: {out.stderr.strip()[-300:]}")
+                break
+            rows.append(json.loads(lines[-1]))
+        if rows:
+            results[kind] = rows
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create, verify or benchmark ChatterboxTTS model snapshots")
+    parser.add_argument("--snapshot-dir", type=str, default="cache/models/chatterbox_snapshot")
+    parser.add_argument("--pickle-path", type=str, default="cache/models/chatterbox_cached.pth")
+    parser.add_argument("--device", type=str, default="cpu")
+    parser.add_argument("--create", action="store_true", help="Download the model and write a snapshot")
+    parser.add_argument("--verify", action="store_true", help="Check the manifest and print a content hash")
+    parser.add_argument("--benchmark", action="store_true", help="Compare cold start: pickle vs snapshot")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--cold-load", nargs=2, metavar=("KIND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_load:
+        _cold_load(args.cold_load[0], args.cold_load[1], args.device)
+        sys.exit(0)
+
+    if args.create:
+        from chatterbox.tts import ChatterboxTTS
+        start = time.perf_counter()
+        model = ChatterboxTTS.from_pretrained(device=args.device)
+        manifest = save_snapshot(model, args.snapshot_dir)
+        total = sum(manifest["files"].values()) / 1024 / 1024
+        print(f"💾 Snapshot written to {args.snapshot_dir} ({total:.0f} MB) in {time.perf_counter() - start:.1f}s")
+
+    if args.verify:
+        try:
+            manifest = read_manifest(args.snapshot_dir)
+        except StaleSnapshot as e:
+            print(f"❌ Stale snapshot: {e}")
+            sys.exit(1)
+        print(f"✅ Snapshot matches installed libraries: {manifest['versions']}")
+        print(f"🔑 Content hash: {snapshot_digest(args.snapshot_dir)}")
+
+    if args.benchmark:
+        results = benchmark(args.pickle_path, args.snapshot_dir, args.device, args.runs)
+        print("=" * 60)
+        print("⏱️  Cold start (fresh process, import + load)")
+        print("=" * 60)
+        for kind, rows in results.items():
+            best = min(rows, key=lambda r: r["total_s"])
+            mean = sum(r["total_s"] for r in rows) / len(rows)
+            print(f"   {kind:9s} best={best['total_s']:6.2f}s  mean={mean:6.2f}s  "
+                  f"load={best['load_s']:6.2f}s  peak RSS={best['max_rss_mb'] or 0:7.0f} MB")
+        if len(results) == 2:
+            p = min(r["total_s"] for r in results["pickle"])
+            s = min(r["total_s"] for r in results["snapshot"])
+            print(f"\n📊 Snapshot cold start is {p / s:.1f}x the speed of pickle ({p:.2f}s → {s:.2f}s)")
+        print("=" * 60)
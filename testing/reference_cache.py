@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of preprocessed reference audio.
+
+Shared by test_tts_clean.py and tts_server.py. Entries are keyed on the
+SHA-256 of each clip's bytes (in order) plus the preprocessing settings, so
+editing a clip in place invalidates its entries and the same clips at other
+paths hit the cache. File hashes are remembered in ``index.json`` together
+with each file's size and mtime, so unchanged files are not re-read just to
+build a key.
+
+Entries are stored as ``<key>.safetensors`` (waveform tensor, sample rate in
+the metadata). The directory is kept under a byte budget by evicting the
+least recently used entries; a hit refreshes the entry's mtime.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+# Bump when the preprocessing (resample / normalize / concatenate) changes
+PREPROCESS_VERSION = "2"
+DEFAULT_MAX_BYTES = int(os.environ.get("TTS_REFERENCE_CACHE_MB", "512")) * 1024 * 1024
+
+
+def hash_bytes(blob):
+    return hashlib.sha256(blob).hexdigest()
+
+
+class ReferenceCache:
+    """Preprocessed reference waveforms on disk, keyed by clip content"""
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._files = self._load_index()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "files_hashed": 0, "hash_fast_path": 0}
+
+        # Legacy entries were keyed on file paths and cannot be validated
+        for legacy in self.root.glob("*.pt"):
+            legacy.unlink(missing_ok=True)
+
+    # ---------------- File hashes ----------------
+    def _load_index(self):
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        tmp = self._index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._files), encoding="utf-8")
+        os.replace(tmp, self._index_path)
+
+    def file_hash(self, path):
+        """Content hash of a file; reuses the stored hash while size and mtime are unchanged"""
+        path = Path(path).resolve()
+        st = path.stat()
+        with self._lock:
+            entry = self._files.get(str(path))
+            if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+                self.stats["hash_fast_path"] += 1
+                return entry["sha256"]
+
+        digest = hash_bytes(path.read_bytes())
+        with self._lock:
+            self.stats["files_hashed"] += 1
+            self._files[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+            self._save_index()
+        return digest
+
+    def key(self, files, **params):
+        """Cache key for an ordered list of clips and the preprocessing parameters"""
+        h = hashlib.sha256(PREPROCESS_VERSION.encode())
+        h.update(json.dumps(params, sort_keys=True).encode())
+        for f in files:
+            h.update(self.file_hash(f).encode())
+        return h.hexdigest()
+
+    # ---------------- Entries ----------------
+    def _entry(self, key):
+        return self.root / f"{key}.safetensors"
+
+    def get(self, key):
+        """(waveform, sample_rate) for a key, or None"""
+        path = self._entry(key)
+        if not path.exists():
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        from safetensors import safe_open
+        try:
+            with safe_open(str(path), framework="pt") as f:
+                waveform = f.get_tensor("waveform")
+                sample_rate = int(f.metadata()["sample_rate"])
+        except Exception:
+            # Corrupted or partially written entry
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        os.utime(path)  # mark as recently used
+        with self._lock:
+            self.stats["hits"] += 1
+        return waveform, sample_rate
+
+    def put(self, key, waveform, sample_rate):
+        """Store a preprocessed waveform, then evict down to the byte budget"""
+        from safetensors.torch import save_file
+        path = self._entry(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        save_file({"waveform": waveform.detach().cpu().contiguous()}, str(tmp),
+                  metadata={"sample_rate": str(int(sample_rate))})
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for p in self.root.glob("*.safetensors"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+            with self._lock:
+                self.stats["evictions"] += 1
+        return total
+
+    def snapshot(self):
+        sizes = []
+        for p in self.root.glob("*.safetensors"):
+            try:
+                sizes.append(p.stat().st_size)
+            except FileNotFoundError:
+                continue
+        with self._lock:
+            return dict(self.stats, entries=len(sizes), size_mb=round(sum(sizes) / 1024 / 1024, 2),
+                        budget_mb=round(self.max_bytes / 1024 / 1024, 2))
@@ -23,6 +23,9 @@ import torchaudio as ta
 import time
 from datetime import datetime
 
+from IO.reference_audio import prepare_references
+from utils import model_registry
+
 # Import project modules
 try:
     from chatterbox.tts import ChatterboxTTS
@@ -38,6 +41,8 @@ except ImportError:
     ContextManager = None
 
 # Global state variables
+# Models are utils.model_registry handles: shared with the rest of the process
+# and loaded again on demand if the registry unloaded them
 brain = None
 context_manager = None
 tts_model = None
@@ -126,13 +131,18 @@ def initialize_tts_model(device_choice="cuda"):
         
         device = device_choice if device_choice == "cuda" and torch.cuda.is_available() else "cpu"
         
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            tts_model = ChatterboxTTS.from_pretrained(device=device)
+        def load():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                model = ChatterboxTTS.from_pretrained(device=device)
+            # Optimize for inference
+            if device == "cuda" and hasattr(torch.cuda, 'empty_cache'):
+                torch.cuda.empty_cache()
+            return model
         
-        # Optimize for inference
-        if device == "cuda" and hasattr(torch.cuda, 'empty_cache'):
-            torch.cuda.empty_cache()
+        handle = model_registry.acquire("tts", "chatterbox", load, device=device)
+        handle.get()
+        tts_model = handle
         
         print_success(f"ChatterboxTTS loaded on {device.upper()}")
         return True
@@ -174,7 +184,10 @@ def initialize_stt_model(model_size="base", device="auto", compute_type="auto"):
             print_info("Or: pip install -r requirements.txt")
             return False
         
-        stt_model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        handle = model_registry.acquire("stt", f"whisper-{model_size}", lambda: WhisperModel(
+            model_size, device=device, compute_type=compute_type), device=device, dtype=compute_type)
+        handle.get()
+        stt_model = handle
         stt_model_size = model_size
         stt_device = device
         print_success(f"Whisper STT ({model_size}) loaded on {device} with {compute_type}")
@@ -189,40 +202,26 @@ def load_reference_folder(ref_dir):
     if not ref_path.exists() or not ref_path.is_dir():
         return None, None
     
-    audio_files = list(ref_path.glob("*.wav"))
+    audio_files = sorted(ref_path.glob("*.wav"))
     if not audio_files:
         return None, None
     
     print_info(f"Found {len(audio_files)} reference files in {ref_dir}")
     
-    ref_audios = []
-    sr_target = None
-    
-    for audio_file in audio_files:
-        try:
-            audio, sr = ta.load(str(audio_file))
-            if audio.shape[0] > 1:
-                audio = audio.mean(dim=0, keepdim=True)
-            ref_audios.append(audio)
-            if sr_target is None:
-                sr_target = sr
-            elif sr != sr_target:
-                # Resample if needed
-                import torchaudio.transforms as T
-                resampler = T.Resample(sr, sr_target)
-                audio = resampler(audio)
-        except Exception as e:
-            print_warning(f"Failed to load {audio_file.name}: {e}")
-    
-    if not ref_audios:
+    # Load in parallel, resample to the first clip's rate, normalize and combine
+    try:
+        prepared = prepare_references(audio_files, skip_unreadable=True)
+    except ValueError:
         return None, None
     
-    # Combine all references
-    combined = torch.cat(ref_audios, dim=1)
-    duration = combined.shape[1] / (sr_target if sr_target else 24000)
-    print_success(f"Combined {len(ref_audios)} references ({duration:.1f}s total)")
+    for path, error in prepared.skipped:
+        print_warning(f"Failed to load {Path(path).name}: {error}")
+    for clip in prepared.clips:
+        if clip.source_rate != prepared.sample_rate:
+            print_info(f"Resampled {Path(clip.path).name} from {clip.source_rate}Hz to {prepared.sample_rate}Hz")
+    print_success(f"Combined {len(prepared.clips)} references ({prepared.duration:.1f}s total)")
     
-    return combined, sr_target
+    return prepared.as_tensor(), prepared.sample_rate
 
 def generate_tts(text, reference_audio=None, temperature=0.8, exaggeration=0.5, cfg_weight=0.5):
     """Generate speech from text using ChatterboxTTS"""
@@ -250,13 +249,13 @@ def generate_tts(text, reference_audio=None, temperature=0.8, exaggeration=0.5,
                 print_warning(f"Failed to load reference audio: {str(e)}")
         
         # Generate speech
-        with torch.no_grad():
+        with tts_model.use() as model, torch.no_grad():
             if ref_audio is not None:
                 # Save reference to temp file for ChatterboxTTS
                 temp_ref_path = AUDIO_OUTPUT_DIR / f"temp_ref_{int(time.time())}.wav"
                 ref_sr = sr_target if sr_target is not None else 24000
                 ta.save(str(temp_ref_path), ref_audio, ref_sr)
-                audio_data = tts_model.generate(
+                audio_data = model.generate(
                     text=text,
                     audio_prompt_path=str(temp_ref_path),
                     temperature=temperature,
@@ -266,7 +265,7 @@ def generate_tts(text, reference_audio=None, temperature=0.8, exaggeration=0.5,
                 # Clean up temp file
                 temp_ref_path.unlink(missing_ok=True)
             else:
-                audio_data = tts_model.generate(
+                audio_data = model.generate(
                     text=text,
                     temperature=temperature,
                     exaggeration=exaggeration,
@@ -385,8 +384,9 @@ def transcribe_live():
                         total_samples = sum(f.size for f in buffer_frames)
                         if total_samples > int(0.3 * samplerate):
                             audio = np.concatenate(buffer_frames)
-                            segments, info = stt_model.transcribe(audio, beam_size=5, language="en")
-                            text = " ".join([seg.text for seg in segments]).strip()
+                            with stt_model.use() as model:
+                                segments, info = model.transcribe(audio, beam_size=5, language="en")
+                                text = " ".join([seg.text for seg in segments]).strip()
                             
                             print_success(f"Transcription complete")
                             print_info(f"Language: {info.language} ({info.language_probability:.2%})")
@@ -416,11 +416,10 @@ def transcribe_audio(audio_file):
         print_info("Transcribing audio...")
         start_time = time.time()
         
-        # Transcribe
-        segments, info = stt_model.transcribe(audio_file, beam_size=5)
-        
-        # Collect all segments
-        text = " ".join([segment.text for segment in segments])
+        # Transcribe (segments are decoded lazily, so collect them while the model is in use)
+        with stt_model.use() as model:
+            segments, info = model.transcribe(audio_file, beam_size=5)
+            text = " ".join([segment.text for segment in segments])
         
         elapsed = time.time() - start_time
         
@@ -558,6 +557,7 @@ def test_stt_mode():
             transcribe_live()
         
         elif choice == "3":
+            stt_model.unload()  # the new settings are a different registry entry
             stt_model = None
             print("\nModel sizes: tiny, base, small, medium, large-v3")
             print("Device: auto (GPU if available), cuda, cpu")
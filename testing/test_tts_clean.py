@@ -58,7 +58,7 @@ import os
 import sys
 import time
 from contextlib import redirect_stderr, redirect_stdout
-from io import StringIO
+from io import BytesIO, StringIO
 
 # Comprehensive warning suppression for clean output
 warnings.filterwarnings("ignore")
@@ -70,9 +70,15 @@ import torchaudio as ta
 from chatterbox.tts import ChatterboxTTS
 import argparse
 import torch
-import hashlib
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
+
+# Repository root, for the shared IO modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from IO.reference_audio import prepare_references
+from IO.reference_library import ReferenceLibrary, pick_primary
+from IO.voice_bundle import BundleError, load_bundle
+from reference_cache import ReferenceCache
 import gc
 
 # Global model cache to avoid reloading
@@ -91,6 +97,9 @@ REFERENCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 MODEL_CACHE_PATH = MODEL_CACHE_DIR / "chatterbox_cached.pth"
 
+# Preprocessed references keyed by clip content (shared with tts_server.py)
+REFERENCE_CACHE = ReferenceCache(REFERENCE_CACHE_DIR)
+
 def print_header():
     """Print a professional header"""
     print("=" * 60)
@@ -101,52 +110,6 @@ def print_step(step, description):
     """Print a step with consistent formatting"""
     print(f"\n📌 Step {step}: {description}")
 
-def get_reference_cache_key(ref_files, target_sr):
-    """
-    Generate a unique cache key for a set of reference files.
-    This allows us to skip reprocessing if we've seen these files before.
-    """
-    # Sort files for consistent hashing
-    sorted_files = sorted(ref_files)
-    
-    # Create hash from file paths and target sample rate
-    hash_input = f"{','.join(sorted_files)}_{target_sr}"
-    cache_key = hashlib.md5(hash_input.encode()).hexdigest()
-    
-    return cache_key
-
-def load_cached_reference(cache_key):
-    """
-    Load pre-processed reference from cache if it exists.
-    Returns (waveform, sample_rate) or None if not cached.
-    """
-    cache_file = REFERENCE_CACHE_DIR / f"{cache_key}.pt"
-    
-    if cache_file.exists():
-        try:
-            cached_data = torch.load(cache_file)
-            return cached_data['waveform'], cached_data['sample_rate']
-        except Exception:
-            # Cache corrupted, remove it
-            cache_file.unlink(missing_ok=True)
-            return None
-    
-    return None
-
-def save_cached_reference(cache_key, waveform, sample_rate):
-    """
-    Save pre-processed reference to cache for future use.
-    """
-    cache_file = REFERENCE_CACHE_DIR / f"{cache_key}.pt"
-    
-    try:
-        torch.save({
-            'waveform': waveform,
-            'sample_rate': sample_rate
-        }, cache_file)
-    except Exception as e:
-        print(f"⚠️  Warning: Failed to cache reference: {e}")
-
 def optimize_model_for_inference(model, device="cuda"):
     """
     Optimize model for maximum inference speed:
@@ -187,72 +150,18 @@ def precompute_speaker_embeddings(audio_path, model, device="cuda"):
     
     # Compute embeddings (this happens during model.generate internally)
     # For now, we'll cache the processed audio on GPU
-    import torchaudio as ta_embed
-    waveform, sr = ta_embed.load(audio_path)
+    prepared = prepare_references([audio_path])
+    waveform, sr = prepared.as_tensor(), prepared.sample_rate
     
-    # Move to GPU and normalize
+    # Move to GPU
     if device == "cuda":
         waveform = waveform.cuda()
     
-    waveform = normalize_audio_volume(waveform, filename=os.path.basename(audio_path))
-    
     # Cache on GPU
     _SPEAKER_EMBEDDINGS_CACHE[cache_key] = (waveform, sr)
     
     return waveform, sr
 
-def normalize_audio_volume(waveform, target_db=-20.0, filename=None):
-    """
-    Normalize audio volume to target dB level.
-    Reduces loud references (like angry clips) to prevent pitch issues.
-    """
-    # Calculate RMS (root mean square) for volume measurement
-    rms = torch.sqrt(torch.mean(waveform**2))
-    
-    # Convert to dB
-    current_db = 20 * torch.log10(rms + 1e-8)
-    
-    # Calculate gain needed
-    gain_db = target_db - current_db
-    gain_linear = 10 ** (gain_db / 20)
-    
-    # Apply gain
-    normalized = waveform * gain_linear
-    
-    # Extra reduction for angry/loud clips (15% reduction)
-    if filename and 'angry' in filename.lower():
-        normalized = normalized * 0.85
-        
-    # Prevent clipping
-    max_val = torch.max(torch.abs(normalized))
-    if max_val > 0.95:
-        normalized = normalized * (0.95 / max_val)
-    
-    return normalized
-
-def load_and_normalize_reference(ref_file, target_sr, device="cpu"):
-    """
-    Load and normalize a single reference file (for multi-threading).
-    Returns (normalized_waveform, duration).
-    Optimized: Minimal CPU overhead, direct GPU transfer if needed.
-    """
-    import torchaudio as ta_load
-    
-    # Load efficiently (CPU initially to avoid GPU context overhead in threads)
-    ref_audio, sr = ta_load.load(ref_file)
-    
-    # Resample if needed (CPU is faster for small files)
-    if sr != target_sr:
-        resampler = ta_load.transforms.Resample(sr, target_sr)
-        ref_audio = resampler(ref_audio)
-    
-    # Normalize volume (CPU operation, move to GPU later if needed)
-    ref_audio = normalize_audio_volume(ref_audio, target_db=-20.0, filename=os.path.basename(ref_file))
-    
-    duration = ref_audio.shape[1] / target_sr
-    
-    return ref_audio, duration
-
 def check_audio_quality(audio_path):
     """
     Check reference audio quality and provide recommendations.
@@ -290,6 +199,34 @@ def check_audio_quality(audio_path):
     except Exception:
         return None
 
+def generate_multi_ref(model, text, args, captured, start_time, **generation_kwargs):
+    """Generate text with the voice set on the model and save test-multi-ref.wav.
+    Returns (seconds since start_time, file size in KB)"""
+    if args.expressive:
+        generation_kwargs.update({
+            'temperature': args.temperature,
+            'exaggeration': args.exaggeration,
+            'cfg_weight': args.cfg_weight,
+            'repetition_penalty': args.repetition_penalty,
+            'min_p': args.min_p,
+            'top_p': args.top_p
+        })
+    
+    if args.device == "cuda" and _CUDA_STREAM is not None:
+        # Generate with CUDA stream for async execution
+        with torch.cuda.stream(_CUDA_STREAM):
+            with redirect_stderr(captured):
+                wav = model.generate(text, **generation_kwargs)
+        # Synchronize to ensure generation is complete
+        torch.cuda.synchronize()
+    else:
+        with redirect_stderr(captured):
+            wav = model.generate(text, **generation_kwargs)
+    
+    elapsed = time.time() - start_time
+    ta.save("test-multi-ref.wav", wav, model.sr)
+    return elapsed, os.path.getsize("test-multi-ref.wav") / 1024
+
 def check_dependencies():
     """Check if all required dependencies are available"""
     missing_deps = []
@@ -332,6 +269,12 @@ def parse_arguments():
                        help="Additional reference audio files (can be used multiple times: --ref file1.wav --ref file2.wav --ref file3.wav)")
     parser.add_argument("--ref-dir", type=str, default=None,
                        help="Directory containing reference audio files (will use all .wav/.mp3/.flac files)")
+    parser.add_argument("--ref-max-duration", type=float, default=11.0, dest="ref_max_duration",
+                       help="With --ref-dir: skip clips longer than this many seconds (default: 11)")
+    parser.add_argument("--ref-exclude", type=str, default="neutral", dest="ref_exclude",
+                       help="With --ref-dir: comma-separated emotion tags to leave out (default: neutral)")
+    parser.add_argument("--ref-tags", type=str, default=None, dest="ref_tags",
+                       help="With --ref-dir: only use clips with at least one of these comma-separated tags")
     parser.add_argument("--blend-voices", action="store_true",
                        help="Concatenate all reference audios for higher quality multi-reference output")
     
@@ -356,6 +299,10 @@ def parse_arguments():
                        help="Add emotional emphasis markers to text for better prosody")
     parser.add_argument("--split-sentences", action="store_true",
                        help="Generate each sentence separately with varied temperature for natural emotion")
+    parser.add_argument("--voice-id", type=str, default=None, dest="voice_id",
+                       help="Use a voice registered with tts_server.py (POST /voices) - skips reference processing")
+    parser.add_argument("--voice-bundle", type=str, default=None, dest="voice_bundle",
+                       help="Use a voice bundle (*.voice, see utils/make_voice_bundle.py) - memory-mapped, no reference processing")
     parser.add_argument("--skip-default", action="store_true",
                        help="Skip default voice generation (save resources)")
     parser.add_argument("--skip-cloning", action="store_true",
@@ -465,6 +412,38 @@ def main():
         print_step(2, "Voice cloning test (skipped)")
         print("⏭️  Skipping voice cloning as requested")
         clone2_time = 0
+    elif args.voice_id:
+        print_step(2, f"Registered voice '{args.voice_id}'")
+        from voice_registry import VoiceRegistry
+        registry = VoiceRegistry(Path("cache") / "voices", device=args.device)
+        try:
+            start_time = time.time()
+            model.conds = registry.get(args.voice_id)
+            print(f"⚡ Loaded precomputed conditioning in {time.time() - start_time:.2f}s (no reference processing)")
+            clone2_time, file_size_multi = generate_multi_ref(model, text, args, captured, start_time)
+            print(f"✅ Generated test-multi-ref.wav with voice '{args.voice_id}' in {clone2_time:.1f}s ({file_size_multi:.1f} KB)")
+        except KeyError:
+            print(f"❌ Voice '{args.voice_id}' is not registered in cache/voices")
+            print("💡 Register it first: POST /voices on tts_server.py")
+            return False
+    elif args.voice_bundle:
+        print_step(2, f"Voice bundle {os.path.basename(args.voice_bundle)}")
+        try:
+            start_time = time.time()
+            bundle = load_bundle(args.voice_bundle)
+            if bundle.has_conditionals:
+                model.conds = bundle.conditionals(args.device)
+                print(f"⚡ Loaded precomputed conditioning in {time.time() - start_time:.3f}s (memory-mapped)")
+            else:
+                # Prompt is already resampled, normalized and combined; only conditioning is computed
+                model.prepare_conditionals(BytesIO(bundle.wav_bytes()), exaggeration=args.exaggeration)
+                print(f"⚡ Conditioned on bundled prompt ({bundle.duration:.1f}s) in {time.time() - start_time:.1f}s")
+            print(f"🎭 {len(bundle.clips)} clips, tags: {', '.join(bundle.tags) or 'none'}")
+            clone2_time, file_size_multi = generate_multi_ref(model, text, args, captured, start_time)
+            print(f"✅ Generated test-multi-ref.wav with voice bundle '{bundle.name}' in {clone2_time:.1f}s ({file_size_multi:.1f} KB)")
+        except (OSError, BundleError) as e:
+            print(f"❌ Could not load voice bundle: {e}")
+            return False
     else:
         print_step(2, "Multi-Reference Voice Cloning")
         audio_prompt = args.reference
@@ -486,72 +465,40 @@ def main():
         
         # Load from directory if specified
         if args.ref_dir:
-            import glob
             ref_dir = args.ref_dir
             if not os.path.exists(ref_dir):
                 print(f"⚠️  Warning: Directory {ref_dir} not found")
             else:
-                # Find all audio files in directory
-                audio_extensions = ['*.wav', '*.mp3', '*.flac']
-                dir_files = []
-                for ext in audio_extensions:
-                    dir_files.extend(glob.glob(os.path.join(ref_dir, ext)))
+                # Clip facts come from the library index (only new/changed files are read)
+                library = ReferenceLibrary(ref_dir)
+                changes = library.refresh()
+                print(f"\n🔍 Reference index: {len(library.clips)} clip(s) "
+                      f"({changes['added'] + changes['updated']} scanned, {changes['unchanged']} unchanged)")
+                for name, error in library.errors.items():
+                    print(f"   ⚠️  Could not read {name}: {error}")
                 
-                if dir_files:
-                    # Filter out neutral files and files over 11 seconds
-                    print(f"\n🔍 Filtering reference files...")
-                    filtered_files = []
-                    
-                    # Import torchaudio backend for efficient metadata reading
-                    import torchaudio.backend.soundfile_backend as soundfile_backend
-                    
-                    for f in dir_files:
-                        # Skip neutral files
-                        if 'neutral' in os.path.basename(f).lower():
-                            continue
-                        
-                        # Check duration (optimize CPU: only load metadata, not full audio)
-                        try:
-                            info = soundfile_backend.info(f)
-                            duration = info.num_frames / info.sample_rate
-                            
-                            if duration > 11.0:
-                                print(f"   ⏭️  Skipping {os.path.basename(f)} ({duration:.1f}s > 11s limit)")
-                                continue
-                            
-                            filtered_files.append(f)
-                        except Exception as e:
-                            print(f"   ⚠️  Could not read {os.path.basename(f)}: {e}")
-                            continue
-                    
-                    dir_files = filtered_files
-                    
-                    # Sort for consistent ordering
-                    dir_files.sort()
-                    print(f"\n📁 Found {len(dir_files)} valid emotional audio file(s) (≤11s):")
-                    for f in dir_files:
-                        # Show duration info
-                        try:
-                            info = soundfile_backend.info(f)
-                            duration = info.num_frames / info.sample_rate
-                            print(f"   • {os.path.basename(f)} ({duration:.1f}s)")
-                        except Exception:
-                            print(f"   • {os.path.basename(f)}")
+                if library.clips:
+                    exclude = [t for t in args.ref_exclude.split(",") if t]
+                    wanted = [t for t in (args.ref_tags or "").split(",") if t]
+                    entries = library.query(max_duration=args.ref_max_duration, exclude=exclude, any_tags=wanted)
+                    for entry in library.clips.values():
+                        if entry.duration > args.ref_max_duration:
+                            print(f"   ⏭️  Skipping {entry.name} ({entry.duration:.1f}s > {args.ref_max_duration:g}s limit)")
                     
-                    # When using --ref-dir, find and use serious_9s.wav as primary if available
-                    serious_file = next((f for f in dir_files if 'serious' in os.path.basename(f).lower()), None)
+                    print(f"\n📁 Found {len(entries)} valid emotional audio file(s) (≤{args.ref_max_duration:g}s):")
+                    for entry in entries:
+                        tags = ", ".join(entry.tags) or "untagged"
+                        print(f"   • {entry.name} ({entry.duration:.1f}s, {entry.rms_db:.1f} dBFS, {tags})")
                     
-                    if serious_file:
-                        # Use serious_9s.wav as primary
-                        audio_prompt = serious_file
+                    # Primary reference: the first 'serious' clip if there is one, else the first clip
+                    primary = pick_primary(entries, prefer=("serious",))
+                    if primary:
+                        audio_prompt = str(library.path(primary))
                         # Add all OTHER files as extra references (excluding the primary)
-                        all_extra_refs.extend([f for f in dir_files if f != serious_file])
-                        print(f"\n🎭 Using {os.path.basename(audio_prompt)} as primary reference")
+                        all_extra_refs.extend(str(library.path(e)) for e in entries if e is not primary)
+                        print(f"\n🎭 Using {primary.name} as primary reference")
                     else:
-                        # Fallback: use first file as primary
-                        audio_prompt = dir_files[0]
-                        all_extra_refs.extend(dir_files[1:])
-                        print(f"\n🎭 Using {os.path.basename(audio_prompt)} as primary reference")
+                        print(f"⚠️  No reference clips in {ref_dir} match the filters")
                 else:
                     print(f"⚠️  No audio files found in {ref_dir}")
         
@@ -593,8 +540,8 @@ def main():
                         total_duration = 0.0
                         
                         # Check if we have a cached version of these references
-                        cache_key = get_reference_cache_key(all_ref_files, target_sr=48000)
-                        cached_result = load_cached_reference(cache_key)
+                        cache_key = REFERENCE_CACHE.key(all_ref_files)
+                        cached_result = REFERENCE_CACHE.get(cache_key)
                         
                         if cached_result is not None:
                             combined_audio, sr_target = cached_result
@@ -613,50 +560,31 @@ def main():
                             durations = [total_duration / ref_count] * ref_count
                             ref_audios = [None] * ref_count  # Dummy for num count
                         else:
-                            print(f"🚀 Loading {len(all_ref_files)} references in parallel (GPU-optimized)...")
+                            print(f"🚀 Loading {len(all_ref_files)} references in parallel...")
                             
-                            # Load primary reference to get target sample rate
-                            ref_audios = []
-                            ref1, sr_target = ta_load.load(audio_prompt)
-                            
-                            # Move to GPU immediately to reduce CPU overhead
-                            if args.device == "cuda":
-                                ref1 = ref1.cuda()
-                            
-                            # Normalize volume (prevents pitch issues from loud clips)
-                            ref1 = normalize_audio_volume(ref1, target_db=-20.0, filename=os.path.basename(audio_prompt))
-                            
-                            ref_audios.append(ref1)
-                            durations = [ref1.shape[1]/sr_target]
+                            # Load, resample to the primary clip's rate, normalize volume
+                            # (prevents pitch issues from loud clips) and concatenate
+                            prepared = prepare_references(all_ref_files)
+                            sr_target = prepared.sample_rate
+                            durations = [clip.duration for clip in prepared.clips]
+                            ref_audios = prepared.clips
                             
                             print(f"📊 Reference sample rate: {sr_target}Hz")
-                            print(f"🔊 Volume normalization: ENABLED (GPU-accelerated)")
-                            
-                            # Use ThreadPoolExecutor to load references in parallel (1-2s speedup)
-                            with ThreadPoolExecutor(max_workers=4) as executor:
-                                # Submit all reference loading tasks
-                                futures = [executor.submit(load_and_normalize_reference, ref_file, sr_target) 
-                                          for ref_file in all_extra_refs]
-                                
-                                # Collect results as they complete
-                                for future in futures:
-                                    ref_audio, duration = future.result()
-                                    
-                                    # Pin to GPU immediately
-                                    if args.device == "cuda":
-                                        ref_audio = ref_audio.cuda()
-                                    
-                                    ref_audios.append(ref_audio)
-                                    durations.append(duration)
-                            
+                            print(f"🔊 Volume normalization: ENABLED")
+                            for clip in prepared.clips:
+                                resampled = f" ({clip.source_rate}Hz → {sr_target}Hz)" if clip.source_rate != sr_target else ""
+                                print(f"   {os.path.basename(clip.path)}: {clip.duration:.1f}s, {clip.rms_db:.1f}dB → gain {clip.gain_db:+.1f}dB{resampled}")
                             print(f"✅ Loaded {len(ref_audios)} references in parallel")
-                            print(f"🎮 All references pinned to GPU memory")
                             
-                            # Concatenate all audio files on GPU
-                            combined_audio = torch.cat(ref_audios, dim=1)
+                            combined_audio = prepared.as_tensor()
+                            
+                            # Pin to GPU immediately
+                            if args.device == "cuda":
+                                combined_audio = combined_audio.cuda()
+                                print(f"🎮 References pinned to GPU memory")
                             
                             # Cache the processed reference for future use (save to CPU)
-                            save_cached_reference(cache_key, combined_audio.cpu(), sr_target)
+                            REFERENCE_CACHE.put(cache_key, combined_audio.cpu(), sr_target)
                             print(f"💾 Cached processed references for future use")
                         
                         # Save temporary combined reference at original sample rate
@@ -690,40 +618,14 @@ def main():
                         elif total_duration > 60:
                             print(f"   ⚠️  Long reference ({total_duration:.1f}s) may slow processing")
                         
-                        # Configure generation parameters for expressiveness
-                        generation_kwargs = {'audio_prompt_path': temp_ref_path}
-                        if args.expressive:
-                            generation_kwargs.update({
-                                'temperature': args.temperature,
-                                'exaggeration': args.exaggeration,
-                                'cfg_weight': args.cfg_weight,
-                                'repetition_penalty': args.repetition_penalty,
-                                'min_p': args.min_p,
-                                'top_p': args.top_p
-                            })
-                        
-                        # Generate with CUDA stream for async execution
                         print(f"🚀 Generating speech (GPU-optimized, no gradients)...")
-                        
-                        if args.device == "cuda" and _CUDA_STREAM is not None:
-                            with torch.cuda.stream(_CUDA_STREAM):
-                                with redirect_stderr(captured):
-                                    wav = model.generate(text, **generation_kwargs)
-                            # Synchronize to ensure generation is complete
-                            torch.cuda.synchronize()
-                        else:
-                            with redirect_stderr(captured):
-                                wav = model.generate(text, **generation_kwargs)
+                        clone2_time, file_size_multi = generate_multi_ref(model, text, args, captured, start_time,
+                                                                          audio_prompt_path=temp_ref_path)
                         
                         # Clean up temporary file
                         if os.path.exists(temp_ref_path):
                             os.remove(temp_ref_path)
                         
-                        clone2_time = time.time() - start_time
-                        ta.save("test-multi-ref.wav", wav, model.sr)
-                        
-                        # Get file size for reporting
-                        file_size_multi = os.path.getsize("test-multi-ref.wav") / 1024  # KB
                         num_refs = len(ref_audios)
                         print(f"✅ Generated test-multi-ref.wav with {num_refs} references in {clone2_time:.1f}s ({file_size_multi:.1f} KB)")
                         
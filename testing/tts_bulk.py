@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Bulk TTS - synthesize a list of texts offline with one model load
+
+Reads a JSONL or CSV file of items and writes one audio file per item plus
+an append-only manifest (manifest.jsonl) with per-item timings. Rerunning
+the same command resumes: items whose output exists and whose manifest entry
+matches the item's content (including the content of its reference clips,
+voice bundle or registered voice) are skipped, failed items are retried.
+
+Each item has a "text" and optionally "id", "voice_id", "voice_bundle", "reference_files"
+(a list, or "|"-separated in CSV), "output_format" and any /generate
+sampling parameter (temperature, exaggeration, cfg_weight, seed, ...).
+
+The model is loaded once (tts_server.load_model) and every generation goes
+through the server's inference worker, while the --workers item threads
+prepare voices and encode outputs around it; long texts are split and stitched.
+
+    python testing/tts_bulk.py prompts.jsonl --out-dir outputs/prompts --workers 4
+    python testing/tts_bulk.py prompts.csv --out-dir outputs/prompts --stub    # no model
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+MANIFEST_NAME = "manifest.jsonl"
+NUMERIC_FIELDS = {"temperature": float, "exaggeration": float, "cfg_weight": float,
+                  "repetition_penalty": float, "min_p": float, "top_p": float, "seed": int}
+
+
+def read_items(path):
+    """Items from a JSONL or CSV file (CSV values are converted to the /generate types)"""
+    path = Path(path)
+    items = []
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                item = {k: v for k, v in row.items() if k and v not in (None, "")}
+                for field, kind in NUMERIC_FIELDS.items():
+                    if field in item:
+                        item[field] = kind(item[field])
+                if "reference_files" in item:
+                    item["reference_files"] = [p for p in item["reference_files"].split("|") if p]
+                items.append(item)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        items.append(json.loads(line))
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{line_no}: {e}")
+    for index, item in enumerate(items):
+        if not str(item.get("text", "")).strip():
+            raise ValueError(f"Item {index + 1} has no text")
+    return items
+
+
+def voice_content_hash(server, item):
+    """
+    Content hash of the item's voice, so editing a clip, bundle or registered
+    voice in place invalidates the item. None for the default voice; raises if
+    the voice cannot be read (the item then fails when it is synthesized).
+    """
+    if item.get("voice_id"):
+        meta = server.VOICES.meta(item["voice_id"])
+        if meta is None:
+            raise KeyError(f"Unknown voice_id {item['voice_id']!r}")
+        return meta.get("content_key") or meta.get("created_at") or item["voice_id"]
+    if item.get("voice_bundle"):
+        from IO.voice_bundle import load_bundle
+        return load_bundle(item["voice_bundle"]).content_hash
+    if item.get("reference_files"):
+        return server.REFERENCE_CACHE.key(item["reference_files"])
+    return None
+
+
+def item_digest(item, voice_hash=None):
+    """Hash of everything that changes an item's audio (the voice by content, see voice_content_hash)"""
+    content = {k: v for k, v in item.items() if k not in ("id", "output")}
+    if voice_hash is not None:
+        content["voice_content"] = voice_hash
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def item_id(item):
+    """The item's "id", else a hash of its content (see assign_ids for repeated items)"""
+    return str(item.get("id") or item_digest(item)[:16])
+
+
+def assign_ids(items):
+    """
+    Ids for every item, in order. Items without an "id" that share content get
+    "-2", "-3", ... suffixes (stable across reruns of the same input); repeated
+    explicit ids are an error, since they would share one output and manifest entry.
+    """
+    ids, seen = [], set()
+    for index, item in enumerate(items):
+        base = item_id(item)
+        if item.get("id"):
+            if base in seen:
+                raise ValueError(f"Item {index + 1}: duplicate id {base!r}")
+            ids.append(base)
+        else:
+            candidate, n = base, 1
+            while candidate in seen:
+                n += 1
+                candidate = f"{base}-{n}"
+            ids.append(candidate)
+        seen.add(ids[-1])
+    return ids
+
+
+def output_path(out_dir, output):
+    """``out_dir / output`` for an item's "output", refusing anything that leaves out_dir"""
+    relative = Path(output)
+    if relative.is_absolute() or relative.drive or ".." in relative.parts or not relative.parts:
+        raise ValueError(f"Output {output!r} must be a relative path inside --out-dir")
+    return Path(out_dir) / relative
+
+
+class Manifest:
+    """Append-only JSONL of finished items; the last entry for an id wins"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interruption
+                    self.entries[entry["id"]] = entry
+        self._lock = threading.Lock()
+
+    def done(self, item_id, digest, out_dir):
+        entry = self.entries.get(item_id)
+        return (entry is not None and entry.get("status") == "ok" and entry.get("digest") == digest
+                and (Path(out_dir) / entry["output"]).exists())
+
+    def record(self, entry):
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[entry["id"]] = entry
+
+
+def synthesize_item(server, item, default_format, retry_interval=0.05):
+    """Generate one item through the server's inference worker. Returns (audio bytes, fmt, timings)"""
+    from IO.tts_longform import stitch
+    from tts_worker import QueueFull
+
+    fmt = server.tts_encode.negotiate(item.get("output_format") or default_format)
+    if fmt is None:
+        # Checked before any synthesis, so the item fails fast instead of falling back to the default format
+        raise ValueError(f"Unknown output_format {item['output_format']!r} "
+                         f"(expected one of: {', '.join(server.tts_encode.FORMATS)})")
+
+    timings = {}
+    start = time.perf_counter()
+    voice, reference = None, None
+    if item.get("voice_id"):
+        voice = server.VOICES.get(item["voice_id"])
+    elif item.get("voice_bundle"):
+        voice, reference, _ = server.open_voice_bundle(item["voice_bundle"])
+    elif item.get("reference_files"):
+        reference = server.build_reference_prompt(item["reference_files"])
+    timings["voice_s"] = time.perf_counter() - start
+
+    data = {k: v for k, v in item.items() if k in NUMERIC_FIELDS}
+    chunks = server.split_text(item["text"], server.LONGFORM_CHARS)
+    jobs = []
+    for chunk in chunks:
+        while True:
+            try:
+                jobs.append(server.WORKER.submit({'data': dict(data, text=chunk), 'reference': reference,
+                                                  'voice': voice}))
+                break
+            except QueueFull:
+                time.sleep(retry_interval)  # the queue drains as other items finish
+    submitted = time.perf_counter()
+    wavs = [job.future.result()[0] for job in jobs]
+    timings["queue_wait_s"] = max(job.queue_wait or 0.0 for job in jobs)
+    timings["synthesis_s"] = time.perf_counter() - submitted
+
+    encode_start = time.perf_counter()
+    wav = stitch(wavs, server.MODEL.sr) if len(wavs) > 1 else wavs[0]
+    audio_bytes = server.tts_encode.encode(wav, server.MODEL.sr, fmt)
+    timings["encode_s"] = time.perf_counter() - encode_start
+    timings["chunks"] = len(chunks)
+    timings["audio_seconds"] = len(wav) / server.MODEL.sr
+    return audio_bytes, fmt, timings
+
+
+def write_atomic(path, data):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def run_bulk(server, items, out_dir, workers=2, default_format="wav"):
+    """Synthesize every item not already in the manifest. Returns (manifest, summary)"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = Manifest(out_dir / MANIFEST_NAME)
+
+    ids = assign_ids(items)
+    outputs = {}
+    for index, item in enumerate(items):
+        if item.get("output"):
+            output_path(out_dir, item["output"])
+            if item["output"] in outputs:
+                raise ValueError(f"Item {index + 1}: output {item['output']!r} is also used by item {outputs[item['output']]}")
+            outputs[item["output"]] = index + 1
+
+    todo, skipped = [], 0
+    for id_, item in zip(ids, items):
+        try:
+            digest = item_digest(item, voice_content_hash(server, item))
+        except Exception:
+            digest = None  # unreadable voice: never counts as done, synthesis reports the error
+        if digest is not None and manifest.done(id_, digest, out_dir):
+            skipped += 1
+        else:
+            todo.append((id_, item, digest))
+    print(f"📋 {len(items)} items: {skipped} already done, {len(todo)} to synthesize")
+
+    def process(id_, item, digest):
+        started = time.perf_counter()
+        entry = {"id": id_, "digest": digest, "chars": len(item["text"])}
+        try:
+            audio_bytes, fmt, timings = synthesize_item(server, item, default_format)
+            output = item.get("output") or f"{entry['id']}.{server.tts_encode.extension(fmt)}"
+            path = output_path(out_dir, output)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, audio_bytes)
+            entry.update(timings, status="ok", output=output, bytes=len(audio_bytes))
+        except Exception as e:
+            entry.update(status="error", error=f"{type(e).__name__}: {e}")
+        entry["total_s"] = round(time.perf_counter() - started, 3)
+        entry["finished_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        manifest.record(entry)
+        return entry
+
+    start = time.perf_counter()
+    results = []
+    pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="tts-bulk")
+    try:
+        futures = [pool.submit(process, id_, item, digest) for id_, item, digest in todo]
+        for n, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            results.append(entry)
+            mark = "✅" if entry["status"] == "ok" else "❌"
+            detail = f"{entry.get('audio_seconds', 0):.1f}s audio" if entry["status"] == "ok" else entry["error"]
+            print(f"{mark} [{n}/{len(todo)}] {entry['id']} in {entry['total_s']:.1f}s ({detail})")
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted - finished items are in the manifest, rerun to resume")
+        for future in futures:
+            future.cancel()
+        raise
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    wall = time.perf_counter() - start
+    return manifest, summarize(results, skipped, wall)
+
+
+def summarize(results, skipped, wall):
+    ok = [r for r in results if r["status"] == "ok"]
+    totals = np.array([r["total_s"] for r in ok]) if ok else np.zeros(0)
+    audio = sum(r["audio_seconds"] for r in ok)
+    return {
+        "synthesized": len(ok),
+        "failed": len(results) - len(ok),
+        "skipped": skipped,
+        "wall_s": round(wall, 2),
+        "audio_seconds": round(audio, 2),
+        "throughput_audio_s_per_s": round(audio / wall, 3) if wall else 0.0,
+        "chars_per_s": round(sum(r["chars"] for r in ok) / wall, 1) if wall else 0.0,
+        "items_per_min": round(len(ok) / wall * 60, 1) if wall else 0.0,
+        "p50_item_s": round(float(np.percentile(totals, 50)), 3) if totals.size else None,
+        "p95_item_s": round(float(np.percentile(totals, 95)), 3) if totals.size else None,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthesize many texts with one model load (resumable)")
+    parser.add_argument("input", type=str, help="JSONL or CSV file of items")
+    parser.add_argument("--out-dir", type=str, default="outputs/bulk")
+    parser.add_argument("--workers", type=int, default=4, help="Items prepared / encoded concurrently")
+    parser.add_argument("--format", type=str, default="wav", help="Default output format (wav, flac, opus, mp3)")
+    parser.add_argument("--stub", action="store_true", help="Use the stub synthesizer (no model)")
+    parser.add_argument("--stub-rtf", type=float, default=0.1)
+    args = parser.parse_args()
+
+    items = read_items(args.input)
+
+    import tts_server as server
+
+    if server.tts_encode.negotiate(args.format) is None:
+        parser.error(f"--format must be one of: {', '.join(server.tts_encode.FORMATS)}")
+    server.WORKER = server.create_worker(max_queue=max(16, args.workers * 8))
+    if args.stub:
+        server.enable_stub(args.stub_rtf)
+    else:
+        server.load_model()
+    server.WORKER.start()
+
+    print("=" * 60)
+    print(f"📚 Bulk TTS: {args.input} → {args.out_dir}")
+    print("=" * 60)
+    try:
+        _, summary = run_bulk(server, items, args.out_dir, args.workers, server.tts_encode.negotiate(args.format))
+    except KeyboardInterrupt:
+        sys.exit(130)
+    finally:
+        server.WORKER.stop()
+
+    print("=" * 60)
+    print(f"📊 {summary['synthesized']} synthesized, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped in {summary['wall_s']:.1f}s")
+    print(f"🚀 Throughput: {summary['throughput_audio_s_per_s']:.2f} audio-s/s, "
+          f"{summary['chars_per_s']:.0f} chars/s, {summary['items_per_min']:.1f} items/min")
+    if summary["p50_item_s"] is not None:
+        print(f"⏱️  Per item: p50={summary['p50_item_s']:.2f}s  p95={summary['p95_item_s']:.2f}s")
+    print(f"💾 Manifest: {Path(args.out_dir) / MANIFEST_NAME}")
+    print("=" * 60)
+    sys.exit(1 if summary["failed"] else 0)
@@ -49,7 +49,25 @@ def get_stats():
         return False
 
 
-def generate_speech(text, reference_files=None, output_file="output.wav", **kwargs):
+def register_voice(reference_files, voice_id=None):
+    """Register reference clips as a voice once; returns the voice_id (or None on failure)"""
+    payload = {"reference_files": reference_files}
+    if voice_id:
+        payload["voice_id"] = voice_id
+    try:
+        response = requests.post(f"{SERVER_URL}/voices", json=payload, timeout=120)
+        if response.status_code in (200, 201):
+            data = response.json()
+            state = "registered" if data.get("created") else "already registered"
+            print(f"✅ Voice '{data['voice_id']}' {state}")
+            return data["voice_id"]
+        print(f"❌ Error: {response.text}")
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+    return None
+
+
+def generate_speech(text, reference_files=None, output_file="output.wav", voice_id=None, **kwargs):
     """
     Generate speech from text
     
@@ -57,6 +75,7 @@ def generate_speech(text, reference_files=None, output_file="output.wav", **kwar
         text: Text to synthesize
         reference_files: List of reference audio file paths (optional)
         output_file: Output filename
+        voice_id: Registered voice to use instead of reference files (optional)
         **kwargs: Additional parameters (temperature, exaggeration, etc.)
     """
     print(f"\n🎙️  Generating speech...")
@@ -70,7 +89,10 @@ def generate_speech(text, reference_files=None, output_file="output.wav", **kwar
         **kwargs
     }
     
-    if reference_files:
+    if voice_id:
+        print(f"🎤 Using registered voice '{voice_id}'")
+        payload["voice_id"] = voice_id
+    elif reference_files:
         payload["reference_files"] = reference_files
     
     try:
@@ -98,6 +120,78 @@ def generate_speech(text, reference_files=None, output_file="output.wav", **kwar
         return False
 
 
+def stream_speech(text, output_file="stream.wav", play=False, voice_id=None, **kwargs):
+    """
+    Stream speech sentence by sentence, writing (and optionally playing) audio as it arrives
+    
+    Args:
+        text: Text to synthesize
+        output_file: WAV file written incrementally (None to only play)
+        play: Play frames through the default output device as they arrive
+        voice_id: Registered voice to use (optional)
+        **kwargs: Additional parameters (temperature, exaggeration, etc.)
+    """
+    import time
+    import numpy as np
+
+    print(f"\n🌊 Streaming speech...")
+    print(f"📝 Text: {text[:50]}{'...' if len(text) > 50 else ''}")
+
+    payload = {"text": text, "format": "pcm", **kwargs}
+    if voice_id:
+        payload["voice_id"] = voice_id
+
+    start = time.perf_counter()
+    first_audio = None
+    total_bytes = 0
+    try:
+        with requests.post(f"{SERVER_URL}/generate/stream", json=payload, stream=True, timeout=120) as response:
+            if response.status_code != 200:
+                print(f"❌ Error: {response.text}")
+                return False
+            sample_rate = int(response.headers.get("X-Sample-Rate", "24000"))
+            print(f"🔊 {response.headers.get('X-Sentences', '?')} sentence(s) at {sample_rate}Hz")
+
+            writer = player = None
+            if output_file:
+                import soundfile as sf
+                writer = sf.SoundFile(output_file, "w", samplerate=sample_rate, channels=1, subtype="PCM_16")
+            if play:
+                import sounddevice as sd
+                player = sd.RawOutputStream(samplerate=sample_rate, channels=1, dtype="int16")
+                player.start()
+            try:
+                pending = b""
+                for chunk in response.iter_content(chunk_size=4096):
+                    pending += chunk
+                    usable = len(pending) - len(pending) % 2  # whole 16-bit samples only
+                    if not usable:
+                        continue
+                    frames, pending = pending[:usable], pending[usable:]
+                    if first_audio is None:
+                        first_audio = time.perf_counter() - start
+                        print(f"⚡ First audio after {first_audio:.2f}s")
+                    total_bytes += len(frames)
+                    if writer is not None:
+                        writer.write(np.frombuffer(frames, dtype="<i2"))
+                    if player is not None:
+                        player.write(frames)
+            finally:
+                if writer is not None:
+                    writer.close()
+                if player is not None:
+                    player.stop()
+                    player.close()
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Request failed: {e}")
+        return False
+
+    duration = total_bytes / 2 / sample_rate
+    print(f"✅ Streamed {duration:.1f}s of audio in {time.perf_counter() - start:.1f}s"
+          + (f" → {output_file}" if output_file else ""))
+    return True
+
+
 def main():
     """Example usage"""
     print("=" * 60)
@@ -145,6 +239,21 @@ def main():
                 exaggeration=0.65,
                 cfg_weight=0.5
             )
+            
+            # Example 3: Same voice, registered once and reused by id
+            print("\n" + "=" * 60)
+            print("Example 3: Registered Voice")
+            print("=" * 60)
+            voice_id = register_voice(ref_paths, voice_id="example")
+            if voice_id:
+                generate_speech(
+                    text="Registered voices skip all reference processing on every request.",
+                    voice_id=voice_id,
+                    output_file="server_test_voice.wav",
+                    temperature=0.75,
+                    exaggeration=0.65,
+                    cfg_weight=0.5
+                )
         else:
             print("⚠️  No reference files found in IO/AudioRef_48kHz")
     else:
@@ -157,8 +266,20 @@ def main():
     get_stats()
     
     print("\n✅ All tests complete!")
-    print(f"💡 Generated files: server_test_default.wav, server_test_cloned.wav")
+    print(f"💡 Generated files: server_test_default.wav, server_test_cloned.wav, server_test_voice.wav")
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ChatterboxTTS server client")
+    parser.add_argument("--stream", type=str, default=None, metavar="TEXT",
+                        help="Stream this text instead of running the examples")
+    parser.add_argument("--output", type=str, default="stream.wav", help="File for streamed audio")
+    parser.add_argument("--play", action="store_true", help="Play streamed audio as it arrives")
+    parser.add_argument("--voice-id", type=str, default=None, help="Registered voice for streaming")
+    args = parser.parse_args()
+
+    if args.stream:
+        sys.exit(0 if stream_speech(args.stream, args.output, args.play, args.voice_id) else 1)
     main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+In-memory audio encoding for TTS server responses.
+
+Waveforms are encoded straight into bytes with libsndfile (soundfile), so
+responses never touch the disk. Formats:
+
+    wav   16-bit PCM, for legacy clients
+    flac  lossless, roughly half the size of WAV (archive)
+    opus  Ogg/Opus, a small fraction of WAV (streaming, remote clients)
+    mp3   for players without Opus support (needs libsndfile >= 1.1)
+"""
+
+import io
+from math import gcd
+
+import numpy as np
+
+# name -> (libsndfile format, subtype, media type, file extension)
+FORMATS = {
+    "wav": ("WAV", "PCM_16", "audio/wav", "wav"),
+    "flac": ("FLAC", "PCM_16", "audio/flac", "flac"),
+    "opus": ("OGG", "OPUS", "audio/ogg", "ogg"),
+    "mp3": ("MP3", "MPEG_LAYER_III", "audio/mpeg", "mp3"),
+}
+DEFAULT_FORMAT = "wav"
+
+# Opus only runs at these rates; anything else is resampled to 48 kHz
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+_ACCEPT_TYPES = {
+    "audio/wav": "wav", "audio/x-wav": "wav", "audio/wave": "wav",
+    "audio/flac": "flac", "audio/x-flac": "flac",
+    "audio/ogg": "opus", "audio/opus": "opus",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+}
+
+
+def negotiate(requested=None, accept=None):
+    """
+    Pick an output format from an explicit request field, else the Accept header.
+    Returns a FORMATS key, or None if an explicit request names an unknown format.
+    """
+    if requested:
+        requested = requested.lower()
+        if requested == "ogg":
+            requested = "opus"
+        return requested if requested in FORMATS else None
+    for part in (accept or "").split(","):
+        media = part.split(";")[0].strip().lower()
+        if media in _ACCEPT_TYPES:
+            return _ACCEPT_TYPES[media]
+    return DEFAULT_FORMAT
+
+
+def media_type(fmt):
+    return FORMATS[fmt][2]
+
+
+def extension(fmt):
+    return FORMATS[fmt][3]
+
+
+def _prepare(audio, sample_rate, fmt):
+    audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+    if fmt == "opus" and sample_rate not in OPUS_RATES:
+        from scipy.signal import resample_poly
+        g = gcd(sample_rate, 48000)
+        audio = resample_poly(audio, 48000 // g, sample_rate // g).astype(np.float32)
+        sample_rate = 48000
+    return np.clip(audio, -1.0, 1.0), sample_rate
+
+
+def encode(audio, sample_rate, fmt=DEFAULT_FORMAT):
+    """Encode a mono float waveform to bytes in ``fmt``"""
+    import soundfile as sf
+    container, subtype, _, _ = FORMATS[fmt]
+    audio, sample_rate = _prepare(audio, sample_rate, fmt)
+    buffer = io.BytesIO()
+    sf.write(buffer, audio, sample_rate, format=container, subtype=subtype)
+    return buffer.getvalue()
+
+
+class StreamEncoder:
+    """
+    Incremental encoder for compressed streams: feed waveform chunks, get the
+    newly finished container bytes back. libsndfile only appends to the
+    buffer while writing, so every byte returned is final.
+    """
+
+    def __init__(self, sample_rate, fmt="opus"):
+        import soundfile as sf
+        container, subtype, _, _ = FORMATS[fmt]
+        self.fmt = fmt
+        self.input_rate = sample_rate
+        _, self.sample_rate = _prepare(np.zeros(0, dtype=np.float32), sample_rate, fmt)
+        self._buffer = io.BytesIO()
+        self._file = sf.SoundFile(self._buffer, "w", self.sample_rate, 1, format=container, subtype=subtype)
+        self._sent = 0
+
+    def _take(self):
+        data = self._buffer.getvalue()
+        new, self._sent = data[self._sent:], len(data)
+        return new
+
+    def write(self, audio):
+        audio, _ = _prepare(audio, self.input_rate, self.fmt)
+        if len(audio):
+            self._file.write(audio)
+        return self._take()
+
+    def close(self):
+        self._file.close()
+        return self._take()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+TTS Load Test - drive tts_server.py with a configurable workload
+
+Closed loop: --concurrency clients each send the next request as soon as the
+last one returns. Open loop: requests arrive at --rate per second (Poisson)
+regardless of how fast the server answers, and latency is measured from each
+request's scheduled arrival, so a stalled server is not hidden by clients
+that stopped sending. All requests share one keep-alive connection pool.
+
+Text lengths and voices are drawn from weighted mixes:
+
+    python testing/tts_server.py --stub              # no model needed
+    python testing/tts_load_test.py --mode closed --concurrency 8 --requests 200
+    python testing/tts_load_test.py --mode open --rate 5 --duration 60 \\
+        --lengths short=0.6,medium=0.3,long=0.1 --voices default=0.8,narrator=0.2
+
+Voices other than "default" are sent as voice_id (register them with POST /voices).
+The result cache is bypassed unless --cache is given.
+"""
+
+import sys
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import requests
+import soundfile as sf
+from requests.adapters import HTTPAdapter
+
+SERVER_URL = "http://localhost:5000"
+
+SENTENCES = [
+    "Hello! How can I help you today?",
+    "The weather looks clear for the rest of the afternoon.",
+    "I have added that to your list of reminders.",
+    "Sorry, I didn't quite catch that. Could you say it again?",
+    "Your meeting with the design team starts in fifteen minutes.",
+    "The kitchen lights are now off.",
+    "Traffic on the usual route is heavier than normal, so leave a little early.",
+    "Here is a quick summary of what we talked about earlier.",
+]
+
+# Target text length in characters for each length class
+LENGTHS = {"short": 40, "medium": 150, "long": 400}
+
+
+def parse_mix(spec):
+    """'a=0.7,b=0.3' -> ([names], [weights]); a bare name gets weight 1"""
+    names, weights = [], []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition("=")
+        names.append(name.strip())
+        weights.append(float(weight) if weight else 1.0)
+    if not names or min(weights) < 0 or sum(weights) <= 0:
+        raise ValueError(f"Invalid mix: {spec!r}")
+    return names, weights
+
+
+def make_text(rng, target_chars):
+    """Join random sentences until the text reaches about target_chars"""
+    parts, length = [], -1
+    while length < target_chars:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence) + 1  # plus the joining space
+    return " ".join(parts)
+
+
+def build_requests(count, lengths, voices, seed=0, cache=False, output_format="wav"):
+    """The request bodies for a run (reproducible for a given seed)"""
+    rng = random.Random(seed)
+    length_names, length_weights = parse_mix(lengths)
+    voice_names, voice_weights = parse_mix(voices)
+    for name in length_names:
+        if name not in LENGTHS:
+            raise ValueError(f"Unknown length class {name!r} (choose from {', '.join(LENGTHS)})")
+    bodies = []
+    for _ in range(count):
+        length = rng.choices(length_names, length_weights)[0]
+        voice = rng.choices(voice_names, voice_weights)[0]
+        body = {"text": make_text(rng, LENGTHS[length]), "output_format": output_format}
+        if voice != "default":
+            body["voice_id"] = voice
+        if not cache:
+            body["cache"] = False
+        bodies.append((length, voice, body))
+    return bodies
+
+
+def make_session(pool_size):
+    """One keep-alive session whose pool holds a connection per concurrent request"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send(session, url, endpoint, length, voice, body, scheduled_at, timeout):
+    """Send one request; latency counts from scheduled_at (the arrival time in open loop)"""
+    row = {"length": length, "voice": voice, "chars": len(body["text"])}
+    try:
+        if endpoint == "stream":
+            stream_body = dict(body, format="pcm")
+            stream_body.pop("output_format", None)
+            response = session.post(f"{url}/generate/stream", json=stream_body, timeout=timeout, stream=True)
+            size, first = 0, None
+            for chunk in response.iter_content(chunk_size=None):
+                if chunk and first is None:
+                    first = time.perf_counter() - scheduled_at
+                size += len(chunk)
+            row["ttfb"] = first
+            if response.status_code == 200:
+                row["audio_seconds"] = size / 2 / int(response.headers.get("X-Sample-Rate", "24000"))
+        else:
+            response = session.post(f"{url}/generate", json=body, timeout=timeout)
+            if response.status_code == 200:
+                info = sf.info(BytesIO(response.content))
+                row["audio_seconds"] = info.frames / info.samplerate
+        row["status"] = response.status_code
+    except requests.exceptions.RequestException as e:
+        row["status"] = None
+        row["error"] = type(e).__name__
+    row["latency"] = time.perf_counter() - scheduled_at
+    row["ok"] = row["status"] == 200
+    return row
+
+
+def run_closed(url, bodies, concurrency, endpoint="generate", timeout=300):
+    """concurrency clients, each sending its next request when the previous one returns"""
+    session = make_session(concurrency)
+    rows, lock, index = [], threading.Lock(), {"next": 0}
+
+    def client():
+        while True:
+            with lock:
+                i = index["next"]
+                index["next"] += 1
+            if i >= len(bodies):
+                return
+            row = send(session, url, endpoint, *bodies[i], time.perf_counter(), timeout)
+            with lock:
+                rows.append(row)
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rows
+
+
+def run_open(url, bodies, rate, max_in_flight=256, endpoint="generate", timeout=300, seed=0):
+    """Poisson arrivals at ``rate`` per second, independent of response times"""
+    rng = random.Random(seed + 1)
+    session = make_session(max_in_flight)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        next_at = time.perf_counter()
+        for item in bodies:
+            next_at += rng.expovariate(rate)
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(send, session, url, endpoint, *item, next_at, timeout))
+    return [f.result() for f in futures]
+
+
+def summarize(rows, wall):
+    """Throughput, latency percentiles and status counts for a run"""
+    ok = [r for r in rows if r["ok"]]
+    latencies = np.array([r["latency"] for r in ok])
+    audio = sum(r.get("audio_seconds", 0.0) for r in ok)
+    statuses = {}
+    for r in rows:
+        key = str(r["status"] or r.get("error"))
+        statuses[key] = statuses.get(key, 0) + 1
+
+    def pct(values, q):
+        return round(float(np.percentile(values, q)), 3) if len(values) else None
+
+    summary = {
+        "requests": len(rows),
+        "succeeded": len(ok),
+        "statuses": statuses,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(ok) / wall, 3) if wall else 0.0,
+        "audio_seconds": round(audio, 2),
+        "throughput_audio_s_per_s": round(audio / wall, 3) if wall else 0.0,
+        "chars_per_s": round(sum(r["chars"] for r in ok) / wall, 1) if wall else 0.0,
+        "p50_s": pct(latencies, 50),
+        "p95_s": pct(latencies, 95),
+        "p99_s": pct(latencies, 99),
+    }
+    ttfb = [r["ttfb"] for r in ok if r.get("ttfb") is not None]
+    if ttfb:
+        summary["ttfb_p50_s"] = pct(ttfb, 50)
+        summary["ttfb_p95_s"] = pct(ttfb, 95)
+    by_length = {}
+    for r in ok:
+        by_length.setdefault(r["length"], []).append(r["latency"])
+    summary["p95_by_length_s"] = {name: pct(values, 95) for name, values in sorted(by_length.items())}
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test a running tts_server.py")
+    parser.add_argument("--url", type=str, default=SERVER_URL)
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=4, help="Closed loop: concurrent clients")
+    parser.add_argument("--rate", type=float, default=2.0, help="Open loop: arrivals per second")
+    parser.add_argument("--requests", type=int, default=None, help="Total requests (default: 50)")
+    parser.add_argument("--duration", type=float, default=None, help="Open loop: seconds of arrivals")
+    parser.add_argument("--lengths", type=str, default="short=0.6,medium=0.3,long=0.1",
+                        help=f"Text length mix over {', '.join(LENGTHS)}")
+    parser.add_argument("--voices", type=str, default="default", help="Voice mix, e.g. default=0.8,narrator=0.2")
+    parser.add_argument("--endpoint", choices=["generate", "stream"], default="generate")
+    parser.add_argument("--format", type=str, default="wav", help="output_format for /generate")
+    parser.add_argument("--cache", action="store_true", help="Allow result cache hits")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=str, default=None, help="Write per-request rows and the summary as JSON")
+    args = parser.parse_args()
+
+    count = args.requests
+    if count is None:
+        count = int(args.rate * args.duration) if args.mode == "open" and args.duration else 50
+    bodies = build_requests(count, args.lengths, args.voices, args.seed, args.cache, args.format)
+
+    print("=" * 60)
+    print(f"🔨 TTS Load Test ({args.mode} loop, {count} requests to /{args.endpoint})")
+    print("=" * 60)
+    start = time.perf_counter()
+    if args.mode == "closed":
+        rows = run_closed(args.url, bodies, args.concurrency, args.endpoint, args.timeout)
+    else:
+        rows = run_open(args.url, bodies, args.rate, endpoint=args.endpoint, timeout=args.timeout, seed=args.seed)
+    summary = summarize(rows, time.perf_counter() - start)
+
+    print(f"📊 {summary['succeeded']}/{summary['requests']} succeeded in {summary['wall_s']:.1f}s "
+          f"(statuses: {summary['statuses']})")
+    print(f"🚀 Throughput: {summary['throughput_rps']:.2f} req/s, "
+          f"{summary['throughput_audio_s_per_s']:.2f} audio-s/s, {summary['chars_per_s']:.0f} chars/s")
+    if summary["p50_s"] is not None:
+        print(f"⏱️  Latency: p50={summary['p50_s']:.2f}s  p95={summary['p95_s']:.2f}s  p99={summary['p99_s']:.2f}s")
+    if "ttfb_p50_s" in summary:
+        print(f"🌊 First byte: p50={summary['ttfb_p50_s']:.2f}s  p95={summary['ttfb_p95_s']:.2f}s")
+    for name, p95 in summary["p95_by_length_s"].items():
+        print(f"   {name:7s} p95={p95:.2f}s")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "summary": summary, "requests": rows}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    sys.exit(0 if summary["succeeded"] else 1)
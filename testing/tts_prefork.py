@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Pre-fork process supervisor for the TTS server.
+
+On CPU-only machines one inference thread leaves most cores idle, and
+starting N independent servers loads N copies of the model. In pre-fork
+mode the parent loads the model once, binds the listening socket, then
+forks ``workers`` children that each serve requests from that shared
+socket. The weights are never written after loading, so the children share
+them copy-on-write (and the safetensors snapshot is file-backed mmap, so
+those pages are shared through the page cache either way). The kernel hands
+each new connection to whichever worker accepts it first.
+
+The parent only supervises: it forwards SIGTERM/SIGINT to the workers and
+respawns a worker that crashes, unless it crashed straight after starting
+(a crash loop), in which case its slot is left empty.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+
+
+def bind_socket(host, port, backlog=2048):
+    """Listening socket created before forking, shared by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def default_threads(workers, cpus=None):
+    """Split the available cores evenly between workers (at least one thread each)"""
+    if cpus is None:
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    return max(1, (cpus or 1) // max(1, workers))
+
+
+class PreforkSupervisor:
+    """Forks ``workers`` processes running ``serve(index)`` and keeps them alive."""
+
+    def __init__(self, serve, workers=2, min_uptime=5.0, name="tts-prefork"):
+        self.serve = serve
+        self.workers = workers
+        self.min_uptime = min_uptime  # a worker dying sooner than this is not respawned
+        self.name = name
+        self.children = {}  # pid -> (index, started_at)
+        self.restarts = 0
+        self._stopping = False
+
+    def _spawn(self, index):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                self.serve(index)
+                code = 0
+            except BaseException as e:
+                logging.error(f"[{self.name}] worker {index} failed: {e}")
+            finally:
+                os._exit(code)
+        self.children[pid] = (index, time.monotonic())
+        return pid
+
+    def start(self):
+        # Keep objects created while loading out of the collector, so the
+        # children's garbage collection doesn't touch (and copy) their pages
+        gc.collect()
+        gc.freeze()
+        for index in range(self.workers):
+            self._spawn(index)
+
+    def stop(self, sig=signal.SIGTERM):
+        self._stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def _on_signal(self, signum, frame):
+        self.stop(signal.SIGTERM if signum == signal.SIGTERM else signal.SIGINT)
+
+    def run(self):
+        """Fork the workers and supervise them until they have all exited"""
+        previous = {sig: signal.signal(sig, self._on_signal) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self.start()
+            while self.children:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                if pid not in self.children:
+                    continue
+                index, started_at = self.children.pop(pid)
+                code = os.waitstatus_to_exitcode(status)
+                if self._stopping or code == 0:
+                    continue
+                if time.monotonic() - started_at < self.min_uptime:
+                    logging.error(f"[{self.name}] worker {index} exited with {code} right after starting; "
+                                  f"not respawning")
+                    continue
+                logging.warning(f"[{self.name}] worker {index} (pid {pid}) exited with {code}; respawning")
+                self.restarts += 1
+                self._spawn(index)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            gc.unfreeze()
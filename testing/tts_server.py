@@ -2,6 +2,22 @@
 """
 ChatterboxTTS HTTP Server - Keep model loaded for instant generation
 Implements server mode for zero-reload overhead across multiple requests
+
+Requests are served by an ASGI app (Starlette + uvicorn) and handed to a
+single inference thread through a bounded queue (see tts_worker.py), so the
+model is never called concurrently, overload returns 503 + Retry-After, and
+requests carry deadlines and are dropped if the client disconnects first.
+Requests run one at a time: ChatterboxTTS has no batched decode, so grouping
+concurrent requests would not raise throughput.
+The model is cached as a memory-mapped safetensors snapshot (model_snapshot.py);
+set TTS_MODEL_FORMAT=pickle to use the old whole-object torch.save cache.
+With --workers N (CPU only) the model is loaded once and N forked worker
+processes share its weights copy-on-write (see tts_prefork.py).
+GET /metrics exposes latency histograms and counters in Prometheus format.
+--stub serves a stand-in synthesizer (tts_stub.py) without torch or a model,
+for load testing with tts_load_test.py.
+Voices can come from single-file voice bundles (IO/voice_bundle.py): the
+"voice_bundle" request field or --voice-bundle for the default voice.
 """
 
 import warnings
@@ -10,92 +26,236 @@ import os
 import sys
 import time
 import json
+import asyncio
+import contextlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file
 from contextlib import redirect_stderr, redirect_stdout
 from io import StringIO, BytesIO
 
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse, Response
+from starlette.routing import Route
+from starlette.middleware import Middleware
+from starlette.concurrency import run_in_threadpool
+
+# Repository root, for the shared IO modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from IO.tts_cache import TTSResultCache, result_key
+from IO.reference_audio import prepare_references
+from IO.tts_longform import Stitcher, split_sentences, split_text
+from IO.voice_bundle import BundleError, load_bundle
+from model_snapshot import StaleSnapshot, load_snapshot, save_snapshot
+from tts_metrics import (RATE_BUCKETS, RATIO_BUCKETS, Registry, RequestMetricsMiddleware,
+                         process_samples)
+from tts_prefork import PreforkSupervisor, bind_socket, default_threads
+from tts_worker import Coalescer, InferenceWorker, QueueFull, DeadlineExceeded
+from voice_registry import VoiceRegistry, valid_voice_id
+from reference_cache import ReferenceCache
+from tts_stream import DEFAULT_CROSSFADE_MS as STREAM_CROSSFADE_MS, to_pcm16, wav_stream_header
+import tts_encode
+
 # Comprehensive warning suppression
 warnings.filterwarnings("ignore")
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 logging.getLogger().setLevel(logging.ERROR)
 
-import torch
-import torchaudio as ta
-from chatterbox.tts import ChatterboxTTS
+import numpy as np
 
-# Flask app
-app = Flask(__name__)
+# Model stack (optional: --stub serves StubTTS without torch or a model download)
+try:
+    import torch
+    import torchaudio as ta
+    from chatterbox.tts import ChatterboxTTS
+except ImportError:
+    torch = ta = ChatterboxTTS = None
+
+from tts_stub import StubConditionals, StubTTS
 
 # Global model instance (loaded once, reused forever)
 MODEL = None
-DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+DEFAULT_CONDS = None  # built-in voice conditionals, restored for requests without references
+DEFAULT_VOICE_TAG = "default"  # identifies the default voice in result cache keys
+VOICE_BUNDLE_PATH = os.environ.get("TTS_VOICE_BUNDLE")  # optional default voice (IO/voice_bundle.py)
+DEVICE = "cuda" if torch is not None and torch.cuda.is_available() else "cpu"
+STUB = False  # serving StubTTS (see enable_stub)
+
+# This serving process (worker index and torch threads are set in pre-fork mode)
+PROCESS = {"pid": os.getpid(), "worker_index": None, "workers": 1, "threads": None}
+
+# Request queue settings (overridable from the command line)
+MAX_QUEUE = int(os.environ.get("TTS_MAX_QUEUE", "16"))
+DEFAULT_TIMEOUT = float(os.environ.get("TTS_REQUEST_TIMEOUT", "120"))  # seconds per request
+DISCONNECT_POLL_INTERVAL = 0.25  # seconds between client-disconnect checks
+
+# Responses are encoded in memory on this pool (off the event loop and the inference thread)
+ENCODE_POOL = ThreadPoolExecutor(max_workers=int(os.environ.get("TTS_ENCODE_WORKERS", "2")),
+                                 thread_name_prefix="tts-encode")
+
+# Streaming: sentences queued ahead of the one being sent, and the stream formats
+STREAM_LOOKAHEAD = 2
+STREAM_FORMATS = {"wav": "audio/wav", "pcm": "audio/L16", "opus": "audio/ogg"}
+
+# /generate splits texts longer than this into chunks of at most this many characters,
+# generated as queued jobs and stitched in order ("split": false turns it off)
+LONGFORM_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", "250"))
+LONGFORM_LOOKAHEAD = 2
 
 # Cache directories
 CACHE_DIR = Path("cache")
 MODEL_CACHE_DIR = CACHE_DIR / "models"
 REFERENCE_CACHE_DIR = CACHE_DIR / "references"
-OUTPUT_DIR = Path("outputs")
+VOICE_DIR = CACHE_DIR / "voices"
 
 # Create directories
 MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 REFERENCE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Model cache: "snapshot" (safetensors, mmap) or the legacy whole-object "pickle"
+MODEL_FORMAT = os.environ.get("TTS_MODEL_FORMAT", "snapshot")
 MODEL_CACHE_PATH = MODEL_CACHE_DIR / "chatterbox_cached.pth"
+MODEL_SNAPSHOT_DIR = MODEL_CACHE_DIR / "chatterbox_snapshot"
+MODEL_LOAD_STATS = {}
+
+# Preprocessed reference audio on disk (shared with test_tts_clean.py)
+REFERENCE_CACHE = ReferenceCache(REFERENCE_CACHE_DIR)
+
+# Finished audio for repeated requests (same text, voice, parameters and seed; unseeded
+# requests are cached as well, so they replay the first sample unless they send "cache": false)
+RESULT_CACHE = TTSResultCache(
+    CACHE_DIR / "results",
+    memory_bytes=int(os.environ.get("TTS_RESULT_CACHE_MEMORY_MB", "64")) * 1024 * 1024,
+    disk_bytes=int(os.environ.get("TTS_RESULT_CACHE_DISK_MB", "1024")) * 1024 * 1024,
+)
+
+# Fixed phrases synthesized into RESULT_CACHE at startup ("|"-separated in TTS_PREWARM)
+PREWARM_PHRASES = [p for p in os.environ.get(
+    "TTS_PREWARM", "Goodbye! Have a great day!|My brain isn't working right now.").split("|") if p.strip()]
+
+# Registered voices (conditionals on disk, hot voices kept in memory)
+VOICES = VoiceRegistry(VOICE_DIR, max_hot=int(os.environ.get("TTS_HOT_VOICES", "8")), device=DEVICE)
+
+# Prometheus metrics (GET /metrics); cache, queue and process figures are read at scrape time
+METRICS = Registry()
+QUEUE_WAIT = METRICS.histogram("tts_queue_wait_seconds", "Time jobs waited for the inference thread.",
+                               labelnames=("kind",))
+REFERENCE_PREP = METRICS.histogram("tts_reference_prep_seconds", "Reference audio preparation time.",
+                                   labelnames=("source",))
+GENERATION = METRICS.histogram("tts_generation_seconds", "Model generation time per call.", labelnames=("kind",))
+ENCODING = METRICS.histogram("tts_encode_seconds", "In-memory audio encoding time.", labelnames=("format",))
+REAL_TIME_FACTOR = METRICS.histogram("tts_real_time_factor", "Generation time divided by audio duration.",
+                                     RATIO_BUCKETS)
+CHARS_PER_SECOND = METRICS.histogram("tts_characters_per_second", "Characters synthesized per generation second.",
+                                     RATE_BUCKETS)
+CHARACTERS = METRICS.counter("tts_characters_total", "Characters synthesized.")
+AUDIO_SECONDS = METRICS.counter("tts_audio_seconds_total", "Seconds of audio synthesized.")
+IN_FLIGHT = METRICS.gauge("tts_requests_in_flight", "Synthesis requests being handled.", ("path",))
+REQUEST_LATENCY = METRICS.histogram("tts_request_seconds", "Synthesis request time until the last byte is sent.",
+                                    labelnames=("path", "status"))
+
+
+def enable_stub(rtf=0.1):
+    """
+    Serve StubTTS instead of ChatterboxTTS. Results, voices and reference keys
+    are kept under cache/stub so stub audio never reaches the real caches.
+    """
+    global MODEL, DEFAULT_CONDS, STUB, RESULT_CACHE, VOICES, REFERENCE_CACHE
+    STUB = True
+    MODEL = StubTTS(rtf=rtf)
+    DEFAULT_CONDS = MODEL.conds
+    RESULT_CACHE = TTSResultCache(CACHE_DIR / "stub" / "results", memory_bytes=RESULT_CACHE.memory_bytes,
+                                  disk_bytes=RESULT_CACHE.disk_bytes)
+    VOICES = VoiceRegistry(CACHE_DIR / "stub" / "voices", max_hot=VOICES.max_hot, loader=StubConditionals.load)
+    REFERENCE_CACHE = ReferenceCache(CACHE_DIR / "stub" / "references", max_bytes=REFERENCE_CACHE.max_bytes)
+    with _reference_lock:
+        _reference_prompts.clear()
+    MODEL_LOAD_STATS.update({"source": "stub", "format": None, "load_seconds": 0.0, "rtf": rtf})
+    print(f"🧪 Stub synthesizer (rtf={rtf}) - no model loaded")
+
+
+def set_seed(seed):
+    if torch is not None:
+        torch.manual_seed(int(seed))
 
 
 def load_model():
     """Load model once at server startup"""
-    global MODEL
+    global MODEL, DEFAULT_CONDS
     
     print("=" * 60)
     print("🚀 ChatterboxTTS Server - Starting Up")
     print("=" * 60)
     
+    if ChatterboxTTS is None:
+        print("❌ torch / torchaudio / chatterbox-tts are not installed (use --stub to run without a model)")
+        sys.exit(1)
+    
     # Enable torch optimizations
     torch.backends.cudnn.benchmark = True
     torch.set_float32_matmul_precision('high')
     
     captured = StringIO()
+    source = None
+    start_time = time.time()
     
     # Try to load from disk cache
-    if MODEL_CACHE_PATH.exists():
+    if MODEL_FORMAT == "snapshot" and MODEL_SNAPSHOT_DIR.exists():
+        print(f"📦 Loading model snapshot (memory-mapped)...")
+        try:
+            with redirect_stderr(captured), redirect_stdout(captured):
+                MODEL = load_snapshot(MODEL_SNAPSHOT_DIR, DEVICE)
+            source = "snapshot"
+        except StaleSnapshot as e:
+            print(f"⚠️  Snapshot is stale ({e}), rebuilding...")
+        except Exception as e:
+            print(f"⚠️  Snapshot unreadable ({e}), rebuilding...")
+            MODEL = None
+    elif MODEL_FORMAT == "pickle" and MODEL_CACHE_PATH.exists():
         print(f"📦 Loading model from disk cache...")
-        start_time = time.time()
-        
         try:
             with redirect_stderr(captured), redirect_stdout(captured):
-                MODEL = torch.load(MODEL_CACHE_PATH, map_location=DEVICE)
-            
-            load_time = time.time() - start_time
-            print(f"✅ Model loaded from cache in {load_time:.1f}s")
-            
+                MODEL = torch.load(MODEL_CACHE_PATH, map_location=DEVICE, weights_only=False)
+            source = "pickle"
         except Exception as e:
             print(f"⚠️  Cache corrupted ({e}), rebuilding...")
             MODEL_CACHE_PATH.unlink(missing_ok=True)
             MODEL = None
     
+    if MODEL is not None:
+        print(f"✅ Model loaded from {source} in {time.time() - start_time:.1f}s")
+    
     # Load from scratch if needed
     if MODEL is None:
         print(f"📥 Loading model from scratch...")
         start_time = time.time()
+        source = "pretrained"
         
         try:
             with redirect_stderr(captured), redirect_stdout(captured):
                 MODEL = ChatterboxTTS.from_pretrained(device=DEVICE)
-            
-            # Save to disk
-            print(f"💾 Saving model to disk cache...")
-            torch.save(MODEL, MODEL_CACHE_PATH)
-            
-            load_time = time.time() - start_time
-            print(f"✅ Model loaded in {load_time:.1f}s")
-            print(f"💾 Cached ({MODEL_CACHE_PATH.stat().st_size / 1024 / 1024:.1f} MB)")
-            
+            print(f"✅ Model loaded in {time.time() - start_time:.1f}s")
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
             sys.exit(1)
+        
+        # Save to disk
+        try:
+            if MODEL_FORMAT == "pickle":
+                print(f"💾 Saving model to disk cache...")
+                torch.save(MODEL, MODEL_CACHE_PATH)
+                print(f"💾 Cached ({MODEL_CACHE_PATH.stat().st_size / 1024 / 1024:.1f} MB)")
+            else:
+                print(f"💾 Writing model snapshot...")
+                manifest = save_snapshot(MODEL, MODEL_SNAPSHOT_DIR)
+                print(f"💾 Snapshot written ({sum(manifest['files'].values()) / 1024 / 1024:.1f} MB)")
+        except Exception as e:
+            print(f"⚠️  Could not cache model ({e}), next start will load from scratch")
+    
+    MODEL_LOAD_STATS.update({"source": source, "format": MODEL_FORMAT,
+                             "load_seconds": round(time.time() - start_time, 2)})
     
     # Apply torch.compile if available
     try:
@@ -109,53 +269,407 @@ def load_model():
     except Exception as e:
         print(f"⚠️  torch.compile() failed ({e}), continuing without it")
     
+    DEFAULT_CONDS = getattr(MODEL, 'conds', None)
+    
     print(f"\n✅ Server ready on http://localhost:5000")
     print(f"🔧 Device: {DEVICE.upper()}")
     print(f"⚡ Model loaded and cached - zero reload overhead!")
     print("=" * 60)
 
 
-def normalize_audio_volume(waveform, target_db=-20.0, filename=None):
-    """Normalize audio volume to prevent pitch issues"""
-    # Calculate RMS
-    rms = torch.sqrt(torch.mean(waveform**2))
-    current_db = 20 * torch.log10(rms + 1e-8)
-    
-    # Apply gain
-    gain_db = target_db - current_db
-    gain_linear = 10 ** (gain_db / 20)
-    normalized = waveform * gain_linear
-    
-    # Extra reduction for angry clips
-    if filename and 'angry' in filename.lower():
-        normalized = normalized * 0.85
-    
-    # Prevent clipping
-    max_val = torch.max(torch.abs(normalized))
-    if max_val > 0.95:
-        normalized = normalized * (0.95 / max_val)
-    
-    return normalized
+class ReferencePrompt:
+    """Combined, normalized reference audio held in memory as WAV bytes"""
+
+    def __init__(self, key, wav_bytes, sample_rate, duration, clip_count):
+        self.key = key
+        self.wav_bytes = wav_bytes
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.clip_count = clip_count
+
+
+# Processed reference prompts keyed by content hash (in-memory LRU in front of REFERENCE_CACHE)
+REFERENCE_PROMPT_CACHE_SIZE = 32
+_reference_prompts = OrderedDict()
+_reference_lock = threading.Lock()
+
+
+def build_reference_prompt(reference_files):
+    """
+    Load, resample, normalize and concatenate reference clips, then hold the
+    result in memory as WAV bytes. Clips are identified by content hash, so
+    edited clips are reprocessed and the same clips at other paths are reused
+    (from memory, else from the shared on-disk reference cache).
+    """
+    start_time = time.perf_counter()
+    key = REFERENCE_CACHE.key(reference_files)
+
+    with _reference_lock:
+        prompt = _reference_prompts.get(key)
+        if prompt is not None:
+            _reference_prompts.move_to_end(key)
+            REFERENCE_PREP.observe(time.perf_counter() - start_time, source="memory")
+            return prompt
+
+    if STUB:
+        # StubTTS only needs to tell voices apart, so the clips are hashed but not decoded
+        source = "stub"
+        prompt = ReferencePrompt(key, key.encode(), MODEL.sr, 0.0, len(reference_files))
+    else:
+        cached = REFERENCE_CACHE.get(key)
+        if cached is not None:
+            combined_audio, sr_target = cached
+            source = "disk"
+        else:
+            source = "fresh"
+            # Load, resample, level and join the clips (IO/reference_audio.py)
+            prepared = prepare_references(reference_files)
+            combined_audio, sr_target = prepared.as_tensor(), prepared.sample_rate
+            REFERENCE_CACHE.put(key, combined_audio, sr_target)
+
+        buffer = BytesIO()
+        ta.save(buffer, combined_audio, sr_target, format="wav")
+        prompt = ReferencePrompt(key, buffer.getvalue(), sr_target, combined_audio.shape[1] / sr_target,
+                                 len(reference_files))
+
+    with _reference_lock:
+        _reference_prompts[key] = prompt
+        while len(_reference_prompts) > REFERENCE_PROMPT_CACHE_SIZE:
+            _reference_prompts.popitem(last=False)
+    REFERENCE_PREP.observe(time.perf_counter() - start_time, source=source)
+    return prompt
+
+
+# Opened voice bundles by path, reused until the file changes
+_voice_bundles = OrderedDict()
+
+
+def open_voice_bundle(path):
+    """
+    Resolve a voice bundle (IO/voice_bundle.py) to (voice, reference, voice_tag).
+    Bundles with precomputed conditionals become a voice straight from the mapped
+    file; others provide their already normalized prompt as the reference.
+    """
+    start_time = time.perf_counter()
+    path = Path(path).resolve()
+    st = path.stat()
+    signature = (st.st_size, st.st_mtime_ns)
+    with _reference_lock:
+        entry = _voice_bundles.get(str(path))
+        if entry is not None and entry[0] == signature:
+            _voice_bundles.move_to_end(str(path))
+            REFERENCE_PREP.observe(time.perf_counter() - start_time, source="memory")
+            return entry[1]
+
+    bundle = load_bundle(path)
+    voice, reference = None, None
+    if STUB:
+        voice = StubConditionals(bundle.content_hash[:16])
+    elif bundle.has_conditionals:
+        voice = bundle.conditionals(DEVICE)
+    else:
+        reference = ReferencePrompt(bundle.content_hash, bundle.wav_bytes(), bundle.sample_rate,
+                                    bundle.duration, len(bundle.clips))
+    resolved = (voice, reference, f"bundle:{bundle.content_hash}")
+
+    with _reference_lock:
+        _voice_bundles[str(path)] = (signature, resolved)
+        while len(_voice_bundles) > REFERENCE_PROMPT_CACHE_SIZE:
+            _voice_bundles.popitem(last=False)
+    REFERENCE_PREP.observe(time.perf_counter() - start_time, source="bundle")
+    print(f"🎙️  Voice bundle '{bundle.name}' ({len(bundle.clips)} clips, {bundle.duration:.1f}s) "
+          f"opened in {(time.perf_counter() - start_time) * 1000:.1f}ms")
+    return resolved
+
+
+def set_default_voice(bundle_path):
+    """Serve a voice bundle as the default voice (call once the model is loaded)"""
+    global DEFAULT_CONDS, DEFAULT_VOICE_TAG
+    voice, reference, voice_tag = open_voice_bundle(bundle_path)
+    if voice is None:
+        MODEL.prepare_conditionals(BytesIO(reference.wav_bytes), exaggeration=0.5)
+        voice = MODEL.conds
+    DEFAULT_CONDS = voice
+    DEFAULT_VOICE_TAG = f"default:{voice_tag}"
+
+
+def embed_voice(job):
+    """Compute and register conditionals for a reference prompt (runs on the inference thread)"""
+    voice_id = job.payload['voice_id']
+    reference = job.payload['reference']
+    QUEUE_WAIT.observe(job.queue_wait, kind="embed_voice")
+    start_time = time.time()
+    MODEL.prepare_conditionals(BytesIO(reference.wav_bytes), exaggeration=0.5)
+    conds = MODEL.conds
+    if DEFAULT_CONDS is not None:
+        MODEL.conds = DEFAULT_CONDS
+    meta = VOICES.add(voice_id, conds, {
+        "content_key": reference.key,
+        "reference_files": job.payload['reference_files'],
+        "clip_count": reference.clip_count,
+        "duration": round(reference.duration, 2),
+        "sample_rate": reference.sample_rate,
+    })
+    print(f"🎙️  Registered voice '{voice_id}' in {time.time() - start_time:.1f}s")
+    return meta
+
+
+def handle_job(job):
+    """Dispatch a queued job to the matching model operation"""
+    kind = job.payload.get('kind')
+    if kind == 'embed_voice':
+        return embed_voice(job)
+    if kind == 'stream_chunk':
+        return synthesize_chunk(job)
+    return synthesize(job)
+
+
+def generation_kwargs(data):
+    """Sampling parameters for a request (defaults match test_tts_clean.py)"""
+    return {
+        'temperature': data.get('temperature', 0.8),
+        'exaggeration': data.get('exaggeration', 0.5),
+        'cfg_weight': data.get('cfg_weight', 0.5),
+        'repetition_penalty': data.get('repetition_penalty', 1.2),
+        'min_p': data.get('min_p', 0.05),
+        'top_p': data.get('top_p', 1.0),
+    }
+
+
+def run_generation(payload, text):
+    """Set the payload's voice and generate the text. Returns (waveform, seconds)."""
+    kwargs = generation_kwargs(payload['data'])
+    seed = payload['data'].get('seed')
+    start_time = time.time()
+
+    # Voice conditioning is model state; only this thread touches it, so setting
+    # it right before generate keeps every request isolated.
+    if payload.get('voice') is not None:
+        MODEL.conds = payload['voice']
+    elif payload['reference'] is not None:
+        reference = payload['reference']
+        print(f"🎤 Using {reference.clip_count} reference clip(s) ({reference.duration:.1f}s, in memory)")
+        MODEL.prepare_conditionals(BytesIO(reference.wav_bytes), exaggeration=kwargs['exaggeration'])
+    elif DEFAULT_CONDS is not None:
+        MODEL.conds = DEFAULT_CONDS
+
+    if seed is not None:
+        # Same seed, same text -> same audio, whatever ran before
+        set_seed(seed)
+
+    # Generate speech
+    captured = StringIO()
+    with redirect_stderr(captured):
+        wav = MODEL.generate(text, **kwargs)
+    return wav, time.time() - start_time
+
+
+def record_generation(kind, texts, wavs, seconds):
+    """Generation latency, real-time factor and throughput for one model call"""
+    chars = sum(len(text) for text in texts)
+    audio = sum(len(wav) for wav in wavs) / MODEL.sr
+    GENERATION.observe(seconds, kind=kind)
+    CHARACTERS.inc(chars)
+    AUDIO_SECONDS.inc(audio)
+    if audio > 0:
+        REAL_TIME_FACTOR.observe(seconds / audio)
+    if seconds > 0:
+        CHARS_PER_SECOND.observe(chars / seconds)
+
+
+def to_numpy(wav):
+    """Model output (tensor or array) as a mono float32 numpy waveform"""
+    if hasattr(wav, 'detach'):
+        wav = wav.detach().cpu().numpy()
+    return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+
+def synthesize_chunk(job):
+    """Generate one sentence of a streaming request. Returns a mono float32 numpy waveform."""
+    QUEUE_WAIT.observe(job.queue_wait, kind="stream_chunk")
+    wav, generation_time = run_generation(job.payload, job.payload['text'])
+    wav = to_numpy(wav)
+    record_generation("stream_chunk", [job.payload['text']], [wav], generation_time)
+    return wav
+
+
+def synthesize(job):
+    """
+    Run one generation request on the inference thread.
+    Returns (waveform, generation_time); encoding happens off this thread.
+    """
+    text = job.payload['data']['text']
+    print(f"\n📝 Request: {text[:50]}{'...' if len(text) > 50 else ''}")
+    QUEUE_WAIT.observe(job.queue_wait, kind="generate")
+
+    wav, generation_time = run_generation(job.payload, text)
+    wav = to_numpy(wav)
+    record_generation("generate", [text], [wav], generation_time)
+    return wav, generation_time
+
+
+def create_worker(max_queue=MAX_QUEUE):
+    return InferenceWorker(handle_job, max_queue=max_queue)
+
+
+WORKER = create_worker()
+
+# Identical concurrent requests share one generation
+COALESCER = Coalescer()
+
+
+async def wait_for_job(request, job, coalesce_key=None):
+    """
+    Await a queued job, cancelling it if the client disconnects or its deadline passes.
+    Pass request=None inside a streaming body, where the response itself watches for disconnects.
+    A coalesced job is only cancelled once no other request is waiting on it.
+    """
+    future = asyncio.wrap_future(job.future)
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return future.result()
+        if request is not None and await request.is_disconnected():
+            abandon_job(job, coalesce_key)  # no-op if already running; the result is then discarded
+            raise ConnectionAbortedError("client disconnected")
+        if job.expired():
+            abandon_job(job, coalesce_key)
+            raise DeadlineExceeded("deadline exceeded")
+
+
+def abandon_job(job, coalesce_key=None):
+    if coalesce_key is None or COALESCER.leave(coalesce_key, job):
+        job.cancel()
+
+
+async def resolve_voice(data):
+    """
+    Look up the request's voice. Returns (voice, reference, voice_tag, error_response);
+    voice_tag identifies the voice in result cache keys.
+    """
+    voice_id = data.get('voice_id')
+    voice_bundle = data.get('voice_bundle')
+    reference_files = data.get('reference_files', [])
+    if voice_id:
+        # Registered voice: no reference audio work at all on the hot path
+        try:
+            voice = await run_in_threadpool(VOICES.get, voice_id)
+        except (KeyError, ValueError):
+            return None, None, None, JSONResponse({"error": f"Unknown voice_id '{voice_id}'"}, status_code=404)
+        meta = VOICES.meta(voice_id) or {}
+        return voice, None, f"voice:{voice_id}:{meta.get('content_key')}", None
+    if voice_bundle:
+        try:
+            voice, reference, voice_tag = await run_in_threadpool(open_voice_bundle, voice_bundle)
+        except FileNotFoundError:
+            return None, None, None, JSONResponse({"error": f"Voice bundle not found: {voice_bundle}"},
+                                                  status_code=404)
+        except (BundleError, OSError) as e:
+            return None, None, None, JSONResponse({"error": f"Could not load voice bundle: {e}"}, status_code=400)
+        return voice, reference, voice_tag, None
+    if reference_files:
+        try:
+            # Reference preprocessing runs off the event loop and off the inference thread
+            reference = await run_in_threadpool(build_reference_prompt, reference_files)
+        except Exception as e:
+            print(f"❌ Reference error: {e}")
+            return None, None, None, JSONResponse({"error": f"Could not load reference files: {e}"}, status_code=400)
+        return None, reference, f"reference:{reference.key}", None
+    return None, None, DEFAULT_VOICE_TAG, None
+
+
+def request_cache_key(data, voice_tag, fmt=tts_encode.DEFAULT_FORMAT):
+    """
+    Result cache key (the cache holds encoded responses), or None when the request opts out with "cache": false.
+
+    Unseeded requests are cached too: the first sampled take of a text is replayed to every later
+    identical request (this is what lets prewarmed phrases hit). Clients that want a fresh sample
+    each time send "cache": false; a seed makes the take reproducible and part of the key.
+    """
+    if data.get('cache', True) is False:
+        return None
+    return result_key(data['text'], voice=voice_tag, seed=data.get('seed'), format=fmt, **generation_kwargs(data))
 
 
-@app.route('/health', methods=['GET'])
-def health():
+def timed_encode(fmt, encode, *args):
+    """Run an encoder call (on the encoder pool) and record how long it took"""
+    start_time = time.perf_counter()
+    result = encode(*args)
+    ENCODING.observe(time.perf_counter() - start_time, format=fmt)
+    return result
+
+
+async def encode_audio(wav, fmt):
+    """Encode a waveform in memory on the encoder pool"""
+    return await asyncio.get_running_loop().run_in_executor(
+        ENCODE_POOL, timed_encode, fmt, tts_encode.encode, wav, MODEL.sr, fmt)
+
+
+def audio_response(audio_bytes, fmt, cache_state):
+    return Response(audio_bytes, media_type=tts_encode.media_type(fmt), headers={
+        "X-Cache": cache_state,
+        "Content-Disposition": f'attachment; filename="output.{tts_encode.extension(fmt)}"',
+    })
+
+
+async def generate_long(request, data, reference, voice, voice_tag):
+    """
+    Synthesize a long text as budgeted chunks. LONGFORM_LOOKAHEAD chunks are kept
+    queued, so the worker moves straight on to the next one; each chunk coalesces
+    with identical chunks in flight. Returns (stitched waveform, seconds, chunk count).
+    """
+    chunks = split_text(data['text'], LONGFORM_CHARS)
+    timeout = float(data.get('timeout', DEFAULT_TIMEOUT))
+    stitcher = Stitcher(MODEL.sr, float(data.get('crossfade_ms', 30)))
+    start_time = time.time()
+
+    def submit(text):
+        key = result_key(text, voice=voice_tag, seed=data.get('seed'), part=True, **generation_kwargs(data))
+        job, _ = COALESCER.join(key, lambda: WORKER.submit(
+            {'data': dict(data, text=text), 'reference': reference, 'voice': voice}, timeout=timeout))
+        return job, key
+
+    parts, pending, next_index = [], [], 0
+    try:
+        while next_index < len(chunks) or pending:
+            while next_index < len(chunks) and len(pending) < LONGFORM_LOOKAHEAD:
+                try:
+                    pending.append(submit(chunks[next_index]))
+                except QueueFull:
+                    if not pending:
+                        raise
+                    break
+                next_index += 1
+            job, key = pending.pop(0)
+            wav, _ = await wait_for_job(request, job, key)
+            parts.append(stitcher.push(wav))
+    finally:
+        for job, key in pending:
+            abandon_job(job, key)
+    parts.append(stitcher.flush())
+    return np.concatenate(parts), time.time() - start_time, len(chunks)
+
+
+async def health(request):
     """Health check endpoint"""
-    return jsonify({
+    return JSONResponse({
         "status": "healthy",
         "model_loaded": MODEL is not None,
-        "device": DEVICE
+        "device": DEVICE,
+        "queue_depth": WORKER.depth(),
+        "pid": os.getpid(),
     })
 
 
-@app.route('/generate', methods=['POST'])
-def generate():
+async def generate(request):
     """
     Generate speech from text
     
     POST /generate
     {
         "text": "Hello world",
+        "voice_id": "narrator",  // optional: registered voice (see POST /voices)
+        "voice_bundle": "voices/narrator.voice",  // optional: single-file voice (IO/voice_bundle.py)
         "reference_files": ["path/to/ref1.wav", "path/to/ref2.wav"],  // optional
         "temperature": 0.8,  // optional
         "exaggeration": 0.5,  // optional
@@ -163,138 +677,441 @@ def generate():
         "repetition_penalty": 1.2,  // optional
         "min_p": 0.05,  // optional
         "top_p": 1.0,  // optional
-        "output_format": "wav"  // optional: wav, mp3
+        "seed": 1234,  // optional: fixed sampling seed (same seed + text + voice -> same audio)
+        "cache": true,  // optional: false skips the result cache (unseeded requests are cached too and replay the first sample)
+        "split": true,  // optional: false generates texts over TTS_CHUNK_CHARS in one pass
+        "timeout": 120,  // optional: seconds before the request is abandoned (504)
+        "output_format": "opus"  // optional: wav, flac, opus, mp3 (else from the Accept header, default wav)
     }
     
-    Returns: Audio file or JSON with error
+    Returns: Audio bytes (encoded in memory) or JSON with error (503 + Retry-After when the queue is full)
     """
     try:
-        data = request.json
-        
-        if not data or 'text' not in data:
-            return jsonify({"error": "Missing 'text' field"}), 400
-        
-        text = data['text']
-        reference_files = data.get('reference_files', [])
-        
-        # Generation parameters
-        temperature = data.get('temperature', 0.8)
-        exaggeration = data.get('exaggeration', 0.5)
-        cfg_weight = data.get('cfg_weight', 0.5)
-        repetition_penalty = data.get('repetition_penalty', 1.2)
-        min_p = data.get('min_p', 0.05)
-        top_p = data.get('top_p', 1.0)
-        
-        print(f"\n📝 Request: {text[:50]}{'...' if len(text) > 50 else ''}")
-        
-        start_time = time.time()
-        
-        # Handle reference files
-        if reference_files:
-            print(f"🎤 Loading {len(reference_files)} reference file(s)...")
-            
-            # Load and concatenate references
-            ref_audios = []
-            ref1, sr_target = ta.load(reference_files[0])
-            ref1 = normalize_audio_volume(ref1, filename=os.path.basename(reference_files[0]))
-            ref_audios.append(ref1)
-            
-            for ref_file in reference_files[1:]:
-                ref_audio, sr = ta.load(ref_file)
-                
-                # Resample if needed
-                if sr != sr_target:
-                    resampler = ta.transforms.Resample(sr, sr_target)
-                    ref_audio = resampler(ref_audio)
-                
-                ref_audio = normalize_audio_volume(ref_audio, filename=os.path.basename(ref_file))
-                ref_audios.append(ref_audio)
-            
-            # Combine
-            combined_audio = torch.cat(ref_audios, dim=1)
-            
-            # Save temp file
-            temp_ref_path = OUTPUT_DIR / "temp_reference.wav"
-            ta.save(str(temp_ref_path), combined_audio, sr_target)
-            
-            generation_kwargs = {
-                'audio_prompt_path': str(temp_ref_path),
-                'temperature': temperature,
-                'exaggeration': exaggeration,
-                'cfg_weight': cfg_weight,
-                'repetition_penalty': repetition_penalty,
-                'min_p': min_p,
-                'top_p': top_p
-            }
+        data = await request.json()
+    except Exception:
+        data = None
+
+    if not data or 'text' not in data:
+        return JSONResponse({"error": "Missing 'text' field"}, status_code=400)
+    fmt = tts_encode.negotiate(data.get('output_format'), request.headers.get('accept'))
+    if fmt is None:
+        return JSONResponse({"error": f"output_format must be one of: {', '.join(tts_encode.FORMATS)}"},
+                            status_code=400)
+
+    voice, reference, voice_tag, error = await resolve_voice(data)
+    if error is not None:
+        return error
+
+    cache_key = request_cache_key(data, voice_tag, fmt)
+    if cache_key is not None:
+        cached = await run_in_threadpool(RESULT_CACHE.get, cache_key, tts_encode.extension(fmt))
+        if cached is not None:
+            print(f"\n⚡ Cache hit: {data['text'][:50]}{'...' if len(data['text']) > 50 else ''}")
+            return audio_response(cached, fmt, "hit")
+
+    long_form = len(data['text']) > LONGFORM_CHARS and data.get('split', True) is not False
+    job, is_leader, chunk_count = None, True, 1
+    try:
+        if long_form:
+            wav, generation_time, chunk_count = await generate_long(request, data, reference, voice, voice_tag)
         else:
-            # Default voice
-            generation_kwargs = {
-                'temperature': temperature,
-                'exaggeration': exaggeration,
-                'cfg_weight': cfg_weight,
-                'repetition_penalty': repetition_penalty,
-                'min_p': min_p,
-                'top_p': top_p
-            }
-        
-        # Generate speech
-        captured = StringIO()
-        with redirect_stderr(captured):
-            wav = MODEL.generate(text, **generation_kwargs)
-        
-        # Clean up temp file
-        if reference_files and temp_ref_path.exists():
-            temp_ref_path.unlink()
-        
-        generation_time = time.time() - start_time
-        
-        # Save output
-        output_path = OUTPUT_DIR / f"output_{int(time.time())}.wav"
-        ta.save(str(output_path), wav, MODEL.sr)
-        
-        file_size_kb = output_path.stat().st_size / 1024
-        
-        print(f"✅ Generated in {generation_time:.1f}s ({file_size_kb:.1f} KB)")
-        
-        # Return audio file
-        return send_file(
-            str(output_path),
-            mimetype='audio/wav',
-            as_attachment=True,
-            download_name='output.wav'
+            coalesce_key = result_key(data['text'], voice=voice_tag, seed=data.get('seed'), **generation_kwargs(data))
+            job, is_leader = COALESCER.join(coalesce_key, lambda: WORKER.submit(
+                {'data': data, 'reference': reference, 'voice': voice},
+                timeout=float(data.get('timeout', DEFAULT_TIMEOUT))))
+            wav, generation_time = await wait_for_job(request, job, coalesce_key)
+        audio_bytes = await encode_audio(wav, fmt)
+    except QueueFull as e:
+        print(f"⚠️  Queue full ({e.depth} waiting) - rejecting request")
+        return JSONResponse(
+            {"error": "Server busy, try again later", "queue_depth": e.depth},
+            status_code=503,
+            headers={"Retry-After": str(e.retry_after)},
         )
-        
+    except DeadlineExceeded as e:
+        print(f"⏱️  Request timed out: {e}")
+        return JSONResponse({"error": "Request deadline exceeded"}, status_code=504)
+    except ConnectionAbortedError:
+        print("🔌 Client disconnected - request dropped")
+        return JSONResponse({"error": "Client disconnected"}, status_code=499)
     except Exception as e:
         print(f"❌ Error: {e}")
-        return jsonify({"error": str(e)}), 500
+        return JSONResponse({"error": str(e)}, status_code=500)
 
+    size_kb = len(audio_bytes) / 1024
+    if not is_leader:
+        print(f"🔗 Shared an identical in-flight generation ({size_kb:.1f} KB {fmt})")
+    elif long_form:
+        print(f"✅ Generated {chunk_count} chunks in {generation_time:.1f}s ({size_kb:.1f} KB {fmt})")
+    else:
+        print(f"✅ Generated in {generation_time:.1f}s ({size_kb:.1f} KB {fmt}, waited {job.queue_wait:.1f}s in queue)")
+    ext = tts_encode.extension(fmt)
+    if cache_key is not None and not await run_in_threadpool(RESULT_CACHE.contains, cache_key, ext):
+        await run_in_threadpool(RESULT_CACHE.put, cache_key, audio_bytes, ext)
 
-@app.route('/stats', methods=['GET'])
-def stats():
-    """Get server statistics"""
-    cache_files = list(REFERENCE_CACHE_DIR.glob("*.pt"))
-    cache_size = sum(f.stat().st_size for f in cache_files) / 1024 / 1024  # MB
+    return audio_response(audio_bytes, fmt, "miss" if cache_key is not None else "bypass")
+
+
+async def generate_stream(request):
+    """
+    Stream speech sentence by sentence as each one is synthesized (chunked transfer)
+    
+    POST /generate/stream
+    {
+        "text": "First sentence. Second sentence.",
+        "format": "opus",  // optional: opus (Ogg pages), wav (streaming header) or pcm (raw 16-bit mono, see X-Sample-Rate)
+        "crossfade_ms": 20,  // optional: overlap between sentences
+        ...  // voice_id / reference_files / sampling parameters as for /generate
+    }
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        data = None
+
+    if not data or 'text' not in data:
+        return JSONResponse({"error": "Missing 'text' field"}, status_code=400)
+    audio_format = data.get('format', 'wav')
+    if audio_format not in STREAM_FORMATS:
+        return JSONResponse({"error": f"format must be one of: {', '.join(STREAM_FORMATS)}"}, status_code=400)
+    sentences = split_sentences(data['text'])
+    if not sentences:
+        return JSONResponse({"error": "Nothing to synthesize"}, status_code=400)
+
+    voice, reference, voice_tag, error = await resolve_voice(data)
+    if error is not None:
+        return error
+
+    timeout = float(data.get('timeout', DEFAULT_TIMEOUT))
+
+    def submit(text):
+        """Queue one sentence (or attach to an identical one in flight). Returns (job, coalesce_key)."""
+        key = result_key(text, voice=voice_tag, seed=data.get('seed'), chunk=True, **generation_kwargs(data))
+        job, _ = COALESCER.join(key, lambda: WORKER.submit(
+            {'kind': 'stream_chunk', 'text': text, 'data': data, 'reference': reference, 'voice': voice},
+            timeout=timeout))
+        return job, key
+
+    # Fail fast with 503 before any audio has been sent
+    try:
+        pending = [submit(sentences[0])]
+    except QueueFull as e:
+        return JSONResponse({"error": "Server busy, try again later", "queue_depth": e.depth},
+                            status_code=503, headers={"Retry-After": str(e.retry_after)})
+    print(f"\n🌊 Streaming {len(sentences)} sentence(s): {data['text'][:50]}{'...' if len(data['text']) > 50 else ''}")
+
+    async def body():
+        loop = asyncio.get_running_loop()
+        stitcher = Stitcher(MODEL.sr, float(data.get('crossfade_ms', STREAM_CROSSFADE_MS)))
+        encoder = tts_encode.StreamEncoder(MODEL.sr, audio_format) if audio_format == 'opus' else None
+
+        async def frames(audio):
+            if encoder is None:
+                return to_pcm16(audio)
+            return await loop.run_in_executor(ENCODE_POOL, timed_encode, audio_format, encoder.write, audio)
+
+        next_index = 1
+        try:
+            if audio_format == 'wav':
+                yield wav_stream_header(MODEL.sr)
+            while pending:
+                # Keep the next sentences queued while this one is being sent
+                while next_index < len(sentences) and len(pending) <= STREAM_LOOKAHEAD:
+                    try:
+                        pending.append(submit(sentences[next_index]))
+                    except QueueFull:
+                        break
+                    next_index += 1
+                job, key = pending.pop(0)
+                wav = await wait_for_job(None, job, key)
+                yield await frames(stitcher.push(wav))
+                if not pending and next_index < len(sentences):
+                    pending.append(submit(sentences[next_index]))
+                    next_index += 1
+            yield await frames(stitcher.flush())
+            if encoder is not None:
+                yield await loop.run_in_executor(ENCODE_POOL, timed_encode, audio_format, encoder.close)
+        except Exception as e:
+            # Headers are already sent; end the stream early
+            print(f"❌ Stream ended early: {e}")
+        finally:
+            for job, key in pending:
+                abandon_job(job, key)
+
+    return StreamingResponse(body(), media_type=STREAM_FORMATS[audio_format], headers={
+        "X-Sample-Rate": str(MODEL.sr),
+        "X-Sentences": str(len(sentences)),
+    })
+
+
+async def list_voices(request):
+    """List registered voices"""
+    return JSONResponse({"voices": await run_in_threadpool(VOICES.list)})
+
+
+async def create_voice(request):
+    """
+    Register a voice from reference clips (conditioning is computed once and stored)
     
-    model_size = MODEL_CACHE_PATH.stat().st_size / 1024 / 1024 if MODEL_CACHE_PATH.exists() else 0
+    POST /voices
+    {
+        "reference_files": ["path/to/ref1.wav", "path/to/ref2.wav"],
+        "voice_id": "narrator"  // optional: defaults to a hash of the clip contents
+    }
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        data = None
+    if not data or not data.get('reference_files'):
+        return JSONResponse({"error": "Missing 'reference_files' field"}, status_code=400)
+
+    voice_id = data.get('voice_id')
+    if voice_id is not None and not valid_voice_id(voice_id):
+        return JSONResponse({"error": "voice_id must be 1-64 characters of A-Z, a-z, 0-9, _ or -"}, status_code=400)
+
+    try:
+        reference = await run_in_threadpool(build_reference_prompt, data['reference_files'])
+    except Exception as e:
+        return JSONResponse({"error": f"Could not load reference files: {e}"}, status_code=400)
+
+    existing = await run_in_threadpool(VOICES.find_by_content, reference.key)
+    if existing and (voice_id is None or voice_id == existing):
+        return JSONResponse({**(VOICES.meta(existing) or {}), "voice_id": existing, "created": False})
+
+    try:
+        job = WORKER.submit({
+            'kind': 'embed_voice',
+            'voice_id': voice_id or reference.key[:16],
+            'reference': reference,
+            'reference_files': [str(f) for f in data['reference_files']],
+        }, timeout=DEFAULT_TIMEOUT)
+    except QueueFull as e:
+        return JSONResponse({"error": "Server busy, try again later"}, status_code=503,
+                            headers={"Retry-After": str(e.retry_after)})
+    try:
+        meta = await wait_for_job(request, job)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+    return JSONResponse({**meta, "created": True}, status_code=201)
+
+
+async def delete_voice(request):
+    """Remove a registered voice"""
+    voice_id = request.path_params['voice_id']
+    if not valid_voice_id(voice_id) or not await run_in_threadpool(VOICES.delete, voice_id):
+        return JSONResponse({"error": f"Unknown voice_id '{voice_id}'"}, status_code=404)
+    return JSONResponse({"deleted": voice_id})
+
+
+async def stats(request):
+    """Get server statistics"""
+    reference_cache = REFERENCE_CACHE.snapshot()
+    if MODEL_FORMAT == "pickle":
+        model_cached = MODEL_CACHE_PATH.exists()
+        model_size = MODEL_CACHE_PATH.stat().st_size if model_cached else 0
+    else:
+        model_cached = MODEL_SNAPSHOT_DIR.exists()
+        model_size = sum(f.stat().st_size for f in MODEL_SNAPSHOT_DIR.iterdir()) if model_cached else 0
     
-    return jsonify({
-        "model_cached": MODEL_CACHE_PATH.exists(),
-        "model_cache_size_mb": round(model_size, 2),
-        "reference_cache_count": len(cache_files),
-        "reference_cache_size_mb": round(cache_size, 2),
+    return JSONResponse({
+        "model_cached": model_cached,
+        "model_cache_size_mb": round(model_size / 1024 / 1024, 2),
+        "model_load": MODEL_LOAD_STATS,
+        "reference_cache_count": reference_cache["entries"],
+        "reference_cache_size_mb": reference_cache["size_mb"],
+        "reference_cache": reference_cache,
+        "reference_prompts_in_memory": len(_reference_prompts),
+        "voice_bundles_open": len(_voice_bundles),
+        "default_voice": DEFAULT_VOICE_TAG,
+        "voices": VOICES.snapshot(),
+        "result_cache": RESULT_CACHE.snapshot(),
         "device": DEVICE,
-        "torch_compile_available": hasattr(torch, 'compile')
+        "torch_compile_available": hasattr(torch, 'compile'),
+        "stub": STUB,
+        "queue": WORKER.snapshot(),
+        "coalescing": COALESCER.snapshot(),
+        "process": PROCESS,
     })
 
 
+@METRICS.collector
+def server_samples():
+    """Cache, queue and process figures for /metrics, read from the components that own them"""
+    result = RESULT_CACHE.snapshot()
+    reference = REFERENCE_CACHE.snapshot()
+    voices = VOICES.snapshot()
+    queue = WORKER.snapshot()
+    coalescing = COALESCER.snapshot()
+
+    def ratio(hits, misses):
+        return hits / (hits + misses) if hits + misses else None
+
+    result_hits = result["memory_hits"] + result["disk_hits"]
+    return [
+        ("tts_cache_hits_total", "counter", "Cache lookups that found an entry.", [
+            ({"cache": "result"}, result_hits),
+            ({"cache": "reference"}, reference["hits"]),
+            ({"cache": "voice"}, voices["hits"]),
+        ]),
+        ("tts_cache_misses_total", "counter", "Cache lookups that missed.", [
+            ({"cache": "result"}, result["misses"]),
+            ({"cache": "reference"}, reference["misses"]),
+            ({"cache": "voice"}, voices["loads"]),
+        ]),
+        ("tts_cache_hit_ratio", "gauge", "Cache hits / lookups since start.", [
+            ({"cache": "result"}, ratio(result_hits, result["misses"])),
+            ({"cache": "reference"}, ratio(reference["hits"], reference["misses"])),
+            ({"cache": "voice"}, ratio(voices["hits"], voices["loads"])),
+        ]),
+        ("tts_coalesced_requests_total", "counter", "Requests that shared an identical in-flight generation.",
+         [({}, coalescing["followers"])]),
+        ("tts_queue_depth", "gauge", "Jobs waiting for the inference thread.", [({}, queue["queue_depth"])]),
+        ("tts_queue_capacity", "gauge", "Jobs allowed to wait before 503.", [({}, queue["queue_capacity"])]),
+        ("tts_inference_busy", "gauge", "1 while the inference thread is running a job.",
+         [({}, int(queue["busy"]))]),
+        ("tts_jobs_total", "counter", "Inference jobs by outcome.", [
+            ({"outcome": outcome}, queue[outcome])
+            for outcome in ("completed", "failed", "rejected", "cancelled", "expired")
+        ]),
+        ("tts_worker_info", "gauge", "Serving process (pre-fork worker index, torch threads).", [
+            ({"pid": PROCESS["pid"], "worker": PROCESS["worker_index"] if PROCESS["worker_index"] is not None else "",
+              "threads": PROCESS["threads"] or ""}, 1),
+        ]),
+    ] + process_samples()
+
+
+async def metrics(request):
+    """Prometheus metrics"""
+    body = await run_in_threadpool(METRICS.render)
+    return Response(body, media_type=METRICS.content_type)
+
+
+async def prewarm_results(phrases):
+    """Synthesize fixed phrases (default voice and parameters) into the result cache"""
+    warmed = 0
+    for phrase in phrases:
+        data = {'text': phrase}
+        cache_key = request_cache_key(data, DEFAULT_VOICE_TAG)
+        if await run_in_threadpool(RESULT_CACHE.contains, cache_key):
+            continue
+        try:
+            job = WORKER.submit({'data': data, 'reference': None, 'voice': None}, timeout=DEFAULT_TIMEOUT)
+            wav, _ = await asyncio.wrap_future(job.future)
+            audio_bytes = await encode_audio(wav, tts_encode.DEFAULT_FORMAT)
+        except Exception as e:
+            print(f"⚠️  Pre-warm failed for {phrase!r}: {e}")
+            continue
+        await run_in_threadpool(RESULT_CACHE.put, cache_key, audio_bytes)
+        warmed += 1
+    if warmed:
+        print(f"🔥 Pre-warmed {warmed} phrase(s) into the result cache")
+
+
+def init_worker_process(index, workers, threads):
+    """Runs in each forked worker before it starts serving"""
+    global PREWARM_PHRASES
+    if torch is not None:
+        torch.set_num_threads(threads)
+    PROCESS.update(pid=os.getpid(), worker_index=index, workers=workers, threads=threads)
+    if index:
+        PREWARM_PHRASES = []  # the first worker warms the shared on-disk result cache
+
+
+def serve_prefork(host, port, workers, threads):
+    """Load the model once, then fork workers that serve from one shared socket"""
+    import uvicorn
+
+    threads = threads or default_threads(workers)
+    sock = bind_socket(host, port)
+    if MODEL is None:
+        load_model()
+    if VOICE_BUNDLE_PATH and DEFAULT_VOICE_TAG == "default":
+        set_default_voice(VOICE_BUNDLE_PATH)
+    print(f"🍴 Forking {workers} workers x {threads} torch threads on http://{host}:{port}")
+
+    def serve(index):
+        init_worker_process(index, workers, threads)
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        server.run(sockets=[sock])
+
+    supervisor = PreforkSupervisor(serve, workers=workers)
+    supervisor.run()
+    sock.close()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Load model at startup, then start the inference thread
+    if MODEL is None:
+        load_model()
+    if VOICE_BUNDLE_PATH and DEFAULT_VOICE_TAG == "default":
+        set_default_voice(VOICE_BUNDLE_PATH)
+    WORKER.start()
+    # Warm fixed phrases in the background; requests are served meanwhile
+    prewarm = asyncio.create_task(prewarm_results(PREWARM_PHRASES))
+    yield
+    prewarm.cancel()
+    WORKER.stop()
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/generate', generate, methods=['POST']),
+        Route('/generate/stream', generate_stream, methods=['POST']),
+        Route('/voices', list_voices, methods=['GET']),
+        Route('/voices', create_voice, methods=['POST']),
+        Route('/voices/{voice_id}', delete_voice, methods=['DELETE']),
+        Route('/stats', stats, methods=['GET']),
+        Route('/metrics', metrics, methods=['GET']),
+    ],
+    middleware=[
+        Middleware(RequestMetricsMiddleware, in_flight=IN_FLIGHT, latency=REQUEST_LATENCY,
+                   paths=('/generate', '/generate/stream')),
+    ],
+    lifespan=lifespan,
+)
+
+
 if __name__ == "__main__":
-    # Load model at startup
-    load_model()
-    
-    # Run server
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=False,
-        threaded=True
-    )
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="ChatterboxTTS HTTP server")
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--max-queue", type=int, default=MAX_QUEUE,
+                       help=f"Requests allowed to wait for the model before 503 (default: {MAX_QUEUE})")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                       help=f"Default per-request deadline in seconds (default: {DEFAULT_TIMEOUT:.0f})")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("TTS_WORKERS", "1")),
+                       help="Forked worker processes sharing one copy of the model, CPU only (default: 1)")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("TTS_THREADS", "0")) or None,
+                       help="torch threads per worker (default: cores / workers)")
+    parser.add_argument("--stub", action="store_true", default=os.environ.get("TTS_STUB") == "1",
+                       help="Serve a stub synthesizer (no torch, no model download) for load testing")
+    parser.add_argument("--stub-rtf", type=float, default=0.1,
+                       help="Stub compute time per second of audio (default: 0.1)")
+    parser.add_argument("--voice-bundle", type=str, default=VOICE_BUNDLE_PATH,
+                       help="Voice bundle (*.voice) to use as the default voice")
+    args = parser.parse_args()
+
+    DEFAULT_TIMEOUT = args.timeout
+    VOICE_BUNDLE_PATH = args.voice_bundle
+    WORKER = create_worker(args.max_queue)
+    if args.stub:
+        enable_stub(args.stub_rtf)
+
+    if args.workers > 1 and DEVICE == "cuda":
+        print("⚠️  --workers needs a CPU device (CUDA cannot be forked); running one process")
+        args.workers = 1
+
+    if args.workers > 1:
+        serve_prefork(args.host, args.port, args.workers, args.threads)
+    else:
+        if args.threads and torch is not None:
+            torch.set_num_threads(args.threads)
+            PROCESS["threads"] = args.threads
+        # Run server (model loads in the lifespan handler before requests are accepted)
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Helpers for streaming TTS output chunk by chunk.
+
+Text is split into sentences, each sentence is synthesized on its own, and
+the waveforms are joined with a short equal-power crossfade so sentence
+boundaries don't click (``split_sentences`` and ``Stitcher`` from
+IO/tts_longform.py). Audio leaves as 16-bit PCM, either raw or behind a
+WAV header whose sizes are left open (the length isn't known up front).
+"""
+
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Repository root, for the shared IO modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Sentence splitting and crossfading are shared with long-form synthesis
+from IO.tts_longform import Stitcher, split_sentences  # noqa: F401
+
+DEFAULT_CROSSFADE_MS = 20
+
+
+def to_pcm16(audio):
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype('<i2').tobytes()
+
+
+def wav_stream_header(sample_rate, channels=1):
+    """WAV header for 16-bit PCM of unknown length (sizes set to the maximum, as streaming players expect)"""
+    byte_rate = sample_rate * channels * 2
+    return (b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+            + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, sample_rate, byte_rate, channels * 2, 16)
+            + b"data" + struct.pack("<I", 0xFFFFFFFF))
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Stand-in for ChatterboxTTS, for running tts_server.py without torch or a model download.
+
+``python testing/tts_server.py --stub`` serves StubTTS: it returns a tone
+whose length follows the text (about 15 characters per second of speech)
+after sleeping ``rtf`` times that length, so queueing, batching, caching,
+streaming and encoding all behave as with the real model and the load
+generator (tts_load_test.py) can be exercised on any CPU box. Output is
+deterministic per text and voice.
+"""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def _digest(*parts):
+    return hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class StubConditionals:
+    """Voice conditioning for StubTTS: just a key identifying the reference audio"""
+
+    def __init__(self, key="default"):
+        self.key = key
+
+    def to(self, device):
+        return self
+
+    def save(self, path):
+        Path(path).write_text(json.dumps({"stub_voice": self.key}), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path, map_location=None):
+        return cls(json.loads(Path(path).read_text(encoding="utf-8"))["stub_voice"])
+
+
+class StubTTS:
+    """ChatterboxTTS-compatible generate / prepare_conditionals, without a model"""
+
+    def __init__(self, sr=24000, rtf=0.1, chars_per_second=15.0):
+        self.sr = sr
+        self.rtf = rtf  # seconds of "compute" per second of audio
+        self.chars_per_second = chars_per_second
+        self.conds = StubConditionals()
+
+    def prepare_conditionals(self, wav_fpath, exaggeration=0.5):
+        data = wav_fpath.read() if hasattr(wav_fpath, "read") else Path(wav_fpath).read_bytes()
+        self.conds = StubConditionals(hashlib.sha1(data).hexdigest()[:16])
+
+    def duration(self, text):
+        return max(0.25, len(text) / self.chars_per_second)
+
+    def _render(self, text):
+        n = int(self.duration(text) * self.sr)
+        seed = int(_digest(text, self.conds.key)[:8], 16)
+        t = np.arange(n, dtype=np.float32) / self.sr
+        freq = 140.0 + seed % 120
+        envelope = np.minimum(1.0, np.minimum(t, t[::-1]) / 0.02)  # 20 ms fade in/out
+        return (0.2 * envelope * np.sin(2 * np.pi * freq * t)).astype(np.float32)[None]
+
+    def generate(self, text, **kwargs):
+        time.sleep(self.duration(text) * self.rtf)
+        return self._render(text)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+TTS Throughput Benchmark - throughput (audio seconds per second) at a p95 latency target
+
+Runs closed-loop concurrent clients against a running tts_server.py, e.g. to
+compare one process against forked CPU workers:
+
+    python testing/tts_server.py --workers 1
+    python testing/tts_throughput_benchmark.py --clients 4 --requests 40 --target-p95 8
+
+    python testing/tts_server.py --workers 2
+    python testing/tts_throughput_benchmark.py --clients 4 --requests 40 --target-p95 8
+"""
+
+import sys
+import time
+import json
+import threading
+from io import BytesIO
+
+import numpy as np
+import requests
+import soundfile as sf
+
+SERVER_URL = "http://localhost:5000"
+
+TEXTS = [
+    "Hello! How can I help you today?",
+    "The weather looks clear for the rest of the afternoon.",
+    "I have added that to your list of reminders.",
+    "Sorry, I didn't quite catch that. Could you say it again?",
+]
+
+
+def run_client(session, url, texts, params, results, lock):
+    """One closed-loop client: send the next request as soon as the last one returns"""
+    for text in texts:
+        start = time.perf_counter()
+        try:
+            response = session.post(f"{url}/generate", json={"text": text, **params}, timeout=300)
+        except requests.exceptions.RequestException as e:
+            with lock:
+                results.append({"ok": False, "error": str(e)})
+            continue
+        latency = time.perf_counter() - start
+        row = {"ok": response.status_code == 200, "status": response.status_code, "latency": latency}
+        if row["ok"]:
+            info = sf.info(BytesIO(response.content))
+            row["audio_seconds"] = info.frames / info.samplerate
+        with lock:
+            results.append(row)
+
+
+def run_benchmark(url=SERVER_URL, clients=4, total_requests=40, params=None):
+    """Drive the server and return (rows, summary)"""
+    params = params or {}
+    per_client = [[TEXTS[(c + i) % len(TEXTS)] for i in range(total_requests // clients)] for c in range(clients)]
+    results, lock = [], threading.Lock()
+
+    start = time.perf_counter()
+    threads = []
+    for texts in per_client:
+        session = requests.Session()
+        t = threading.Thread(target=run_client, args=(session, url, texts, params, results, lock), daemon=True)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    latencies = np.array([r["latency"] for r in ok]) if ok else np.zeros(0)
+    audio = sum(r["audio_seconds"] for r in ok)
+    summary = {
+        "requests": len(results),
+        "succeeded": len(ok),
+        "wall_s": wall,
+        "audio_seconds": audio,
+        "throughput_audio_s_per_s": audio / wall if wall else 0.0,
+        "p50_s": float(np.percentile(latencies, 50)) if latencies.size else None,
+        "p95_s": float(np.percentile(latencies, 95)) if latencies.size else None,
+    }
+    return results, summary
+
+
+def fetch_queue_stats(url):
+    try:
+        return requests.get(f"{url}/stats", timeout=5).json().get("queue", {})
+    except requests.exceptions.RequestException:
+        return {}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure tts_server throughput at a p95 latency target")
+    parser.add_argument("--url", type=str, default=SERVER_URL)
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent closed-loop clients")
+    parser.add_argument("--requests", type=int, default=40, help="Total requests across all clients")
+    parser.add_argument("--target-p95", type=float, default=None, help="p95 latency target in seconds")
+    parser.add_argument("--voice-id", type=str, default=None, help="Registered voice to use for every request")
+    parser.add_argument("--json", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    params = {"voice_id": args.voice_id} if args.voice_id else {}
+    rows, summary = run_benchmark(args.url, args.clients, args.requests, params)
+    queue_stats = fetch_queue_stats(args.url)
+
+    print("=" * 60)
+    print("🚀 TTS Throughput Benchmark")
+    print("=" * 60)
+    print(f"📊 {summary['succeeded']}/{summary['requests']} requests in {summary['wall_s']:.1f}s "
+          f"with {args.clients} clients")
+    print(f"🔊 Throughput: {summary['throughput_audio_s_per_s']:.2f} audio-s/s "
+          f"({summary['audio_seconds']:.1f}s of audio)")
+    if summary["p95_s"] is not None:
+        print(f"⏱️  Latency: p50={summary['p50_s']:.2f}s  p95={summary['p95_s']:.2f}s")
+    if queue_stats:
+        print(f"🔧 Server queue: avg_service={queue_stats.get('avg_service_s')}s "
+              f"completed={queue_stats.get('completed')} rejected={queue_stats.get('rejected')}")
+    if args.target_p95 is not None and summary["p95_s"] is not None:
+        met = summary["p95_s"] <= args.target_p95
+        print(f"{'✅' if met else '❌'} p95 target {args.target_p95:.1f}s {'met' if met else 'missed'}")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"requests": rows, "summary": summary, "server": queue_stats}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
+
+    sys.exit(0 if summary["succeeded"] else 1)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Bounded request queue drained by a single inference thread.
+
+The TTS model is not safe to call from several request threads at once, so
+every generation goes through one InferenceWorker: requests are queued in
+arrival order (bounded, so overload turns into fast 503s instead of
+unbounded waiting), jobs carry an optional deadline, and jobs cancelled
+before they start (client gone, deadline passed) are skipped.
+"""
+
+import logging
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class QueueFull(Exception):
+    """Raised by submit() when the queue is at capacity."""
+
+    def __init__(self, depth, retry_after):
+        super().__init__(f"inference queue full ({depth} waiting)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Set on a job whose deadline passed before it could run."""
+
+
+class Job:
+    """One unit of work for the inference thread."""
+
+    def __init__(self, payload, deadline=None):
+        self.payload = payload
+        self.deadline = deadline  # time.monotonic() value, or None for no deadline
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    def expired(self, now=None):
+        return self.deadline is not None and (now or time.monotonic()) >= self.deadline
+
+    def cancel(self):
+        """Cancel if not started yet. Returns False if the job is already running or done."""
+        return self.future.cancel()
+
+    @property
+    def queue_wait(self):
+        if self.started_at is None:
+            return None
+        return self.started_at - self.enqueued_at
+
+
+class InferenceWorker:
+    """Runs ``handler(job)`` for queued jobs on one dedicated thread."""
+
+    def __init__(self, handler, max_queue=16, name="tts-inference"):
+        self.handler = handler
+        self.max_queue = max_queue
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._busy = False
+        self._avg_service = None  # EWMA of handler time, used for Retry-After
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "expired": 0,
+        }
+
+    # ---------------- Lifecycle ----------------
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+
+    # ---------------- Submission ----------------
+    def submit(self, payload, timeout=None):
+        """Queue a job. ``timeout`` (seconds) becomes the job deadline."""
+        deadline = time.monotonic() + timeout if timeout else None
+        job = Job(payload, deadline)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise QueueFull(self.depth(), self.retry_after())
+        with self._lock:
+            self.stats["submitted"] += 1
+        return job
+
+    def depth(self):
+        """Jobs waiting (not counting the one running)."""
+        return self._queue.qsize()
+
+    def busy(self):
+        return self._busy
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, from queue depth and mean service time."""
+        per_job = self._avg_service or 1.0
+        return max(1, math.ceil((self.depth() + 1) * per_job))
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        stats.update({
+            "queue_depth": self.depth(),
+            "queue_capacity": self.max_queue,
+            "busy": self._busy,
+            "avg_service_s": round(self._avg_service, 3) if self._avg_service else None,
+        })
+        return stats
+
+    # ---------------- Worker loop ----------------
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            if not job.future.set_running_or_notify_cancel():
+                with self._lock:
+                    self.stats["cancelled"] += 1
+                continue
+            if job.expired():
+                job.future.set_exception(DeadlineExceeded("deadline passed while queued"))
+                with self._lock:
+                    self.stats["expired"] += 1
+                continue
+
+            job.started_at = time.monotonic()
+            self._busy = True
+            try:
+                result = self.handler(job)
+            except Exception as e:
+                logging.error(f"[{self.name}] job failed: {e}")
+                job.future.set_exception(e)
+                with self._lock:
+                    self.stats["failed"] += 1
+            else:
+                job.future.set_result(result)
+                with self._lock:
+                    self.stats["completed"] += 1
+            finally:
+                self._busy = False
+                job.finished_at = time.monotonic()
+                service = job.finished_at - job.started_at
+                self._avg_service = service if self._avg_service is None else 0.8 * self._avg_service + 0.2 * service
+
+
+class Coalescer:
+    """
+    Single-flight deduplication: identical concurrent requests share one job.
+
+    The first request for a key submits the job (the leader); requests with the
+    same key that arrive before it finishes attach to it (followers). A shared
+    job is only worth cancelling once every request waiting on it has gone.
+    """
+
+    def __init__(self):
+        self._inflight = {}  # key -> [job, waiters]
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def join(self, key, submit):
+        """Return (job, is_leader); ``submit()`` is only called when no identical job is in flight."""
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None and not entry[0].future.done():
+                entry[1] += 1
+                self.stats["followers"] += 1
+                return entry[0], False
+            job = submit()  # may raise QueueFull; nothing is recorded then
+            entry = [job, 1]
+            self._inflight[key] = entry
+            self.stats["leaders"] += 1
+        job.future.add_done_callback(lambda _: self._forget(key, entry))
+        return job, True
+
+    def leave(self, key, job):
+        """A waiter gave up on ``job``. Returns True when nobody else is waiting (safe to cancel)."""
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is None or entry[0] is not job:
+                return True
+            entry[1] -= 1
+            if entry[1] > 0:
+                return False
+            del self._inflight[key]
+            return True
+
+    def _forget(self, key, entry):
+        with self._lock:
+            if self._inflight.get(key) is entry:
+                del self._inflight[key]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, in_flight=len(self._inflight))
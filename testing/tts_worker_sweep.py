@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+TTS Worker Sweep - pick --workers / --threads for a pre-fork tts_server.py
+
+Starts the server once per (workers, threads) combination, drives it with the
+closed-loop clients from tts_batch_benchmark.py and reports throughput and
+latency for each, then recommends the fastest setting that meets the p95
+target:
+
+    python testing/tts_worker_sweep.py --workers 1 2 4 --threads 0 --clients 8 --target-p95 10
+
+A threads value of 0 splits the cores evenly between the workers.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from pathlib import Path
+
+import requests
+
+from tts_batch_benchmark import run_benchmark
+
+SERVER = Path(__file__).resolve().parent / "tts_server.py"
+
+
+def wait_ready(url, process, timeout):
+    """Poll /health until the model is loaded (False if the server exits or times out)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            if requests.get(f"{url}/health", timeout=2).json().get("model_loaded"):
+                return True
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def run_setting(workers, threads, port, clients, total_requests, extra_args, startup_timeout):
+    """Start one server configuration, benchmark it, shut it down"""
+    url = f"http://127.0.0.1:{port}"
+    cmd = [sys.executable, str(SERVER), "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), *extra_args]
+    if threads:
+        cmd += ["--threads", str(threads)]
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(url, process, startup_timeout):
+            return None
+        run_benchmark(url, clients=clients, total_requests=clients)  # warm-up
+        _, summary = run_benchmark(url, clients=clients, total_requests=total_requests)
+        return summary
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark tts_server.py worker / thread settings")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--threads", type=int, nargs="+", default=[0],
+                        help="torch threads per worker to try (0 = cores / workers)")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--target-p95", type=float, default=None, help="p95 latency target in seconds")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--startup-timeout", type=float, default=600)
+    parser.add_argument("--json", type=str, default=None, help="Write results as JSON")
+    args, server_args = parser.parse_known_args()
+
+    print("=" * 60)
+    print(f"🍴 TTS Worker Sweep ({os.cpu_count()} CPUs)")
+    print("=" * 60)
+
+    rows = []
+    for workers in args.workers:
+        for threads in args.threads:
+            label = f"workers={workers} threads={threads or 'auto'}"
+            print(f"⏳ {label} ...")
+            summary = run_setting(workers, threads, args.port, args.clients, args.requests,
+                                  server_args, args.startup_timeout)
+            if summary is None:
+                print(f"❌ {label}: server did not start")
+                continue
+            rows.append({"workers": workers, "threads": threads, **summary})
+            print(f"   {summary['throughput_audio_s_per_s']:.2f} audio-s/s  "
+                  f"p50={summary['p50_s']:.2f}s  p95={summary['p95_s']:.2f}s")
+
+    eligible = [r for r in rows if r["p95_s"] is not None
+                and (args.target_p95 is None or r["p95_s"] <= args.target_p95)]
+    print("=" * 60)
+    if eligible:
+        best = max(eligible, key=lambda r: r["throughput_audio_s_per_s"])
+        print(f"✅ Best: --workers {best['workers']} --threads {best['threads'] or 'auto'} "
+              f"({best['throughput_audio_s_per_s']:.2f} audio-s/s, p95 {best['p95_s']:.2f}s)")
+    else:
+        print("❌ No setting met the p95 target")
+    print("=" * 60)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+        print(f"💾 Results written to {args.json}")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Voice Loop Benchmark - end-of-speech to first-audio-out latency
+Replays recorded utterances through conversation_loop with no microphone or speakers
+"""
+
+import sys
+import time
+import json
+import logging
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from utils import profiler
+
+STAGES = ["endpointing", "stt", "llm", "tts", "playback_start"]
+
+
+class StubBrain:
+    """Stand-in for core.brain.Brain with a fixed thinking delay"""
+
+    def __init__(self, delay=0.5, reply="Sure. Here is a short answer to that."):
+        self.delay = delay
+        self.reply = reply
+        self.calls = 0
+
+    def generate_response(self, messages, initial=False):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.reply
+
+
+class StubTTS:
+    """Stand-in TTS backend: sleeps base + per-character delay, returns a quiet tone"""
+
+    def __init__(self, base_delay=0.2, delay_per_char=0.002, sample_rate=22050, seconds_per_char=0.06):
+        self.base_delay = base_delay
+        self.delay_per_char = delay_per_char
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+
+    def synthesize(self, text):
+        time.sleep(self.base_delay + self.delay_per_char * len(text))
+        n = int(len(text) * self.seconds_per_char * self.sample_rate)
+        t = np.arange(n, dtype=np.float32) / self.sample_rate
+        return (0.05 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32), self.sample_rate
+
+
+class EventRecorder:
+    """Trace hook collecting (event, wall time, CPU time, info)"""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, timestamp, info):
+        self.events.append((event, timestamp, time.process_time(), info))
+
+
+def split_turns(events, clip_end_times):
+    """Group trace events into user turns, each anchored on the true end of speech"""
+    turns = []
+    current = None
+    for event, t, cpu, info in events:
+        if event == "utterance_end":
+            current = {"utterance_end": (t, cpu)}
+            turns.append(current)
+        elif current is not None and event not in current:
+            current[event] = (t, cpu)
+
+    rows = []
+    for turn in turns:
+        if "audio_out" not in turn or "stt_done" not in turn:
+            continue
+        t_end = turn["utterance_end"][0]
+        ends = [c for c in clip_end_times if c <= t_end]
+        if not ends:
+            continue
+        marks = [("clip_end", ends[-1], None), ("utterance_end",) + turn["utterance_end"],
+                 ("stt_done",) + turn["stt_done"], ("llm_done",) + turn.get("llm_done", turn["stt_done"]),
+                 ("tts_synth_done",) + turn.get("tts_synth_done", turn["audio_out"]),
+                 ("audio_out",) + turn["audio_out"]]
+        row = {"total": marks[-1][1] - marks[0][1]}
+        cpu = 0.0
+        for stage, (a, b) in zip(STAGES, zip(marks, marks[1:])):
+            row[stage] = b[1] - a[1]
+            if a[2] is not None:
+                cpu += b[2] - a[2]
+        row["cpu_s"] = cpu
+        rows.append(row)
+    return rows
+
+
+def summarize(rows):
+    """p50 / p95 / mean for every stage"""
+    summary = {}
+    for key in ["total"] + STAGES + ["cpu_s"]:
+        values = np.array([r[key] for r in rows]) if rows else np.zeros(0)
+        if values.size:
+            summary[key] = {
+                "p50": float(np.percentile(values, 50)),
+                "p95": float(np.percentile(values, 95)),
+                "mean": float(values.mean()),
+            }
+    return summary
+
+
+def collect_clips(paths):
+    clips = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            clips.extend(sorted(f for f in p.iterdir() if f.suffix.lower() in (".wav", ".flac")))
+        else:
+            clips.append(p)
+    return clips
+
+
+def run_benchmark(clips, llm_delay=0.5, tts_base_delay=0.2, tts_char_delay=0.002,
+                  stt_model=None, stt_compute_type=None, realtime=True, gap_seconds=2.5, output_dir=None):
+    """Run conversation_loop over the corpus and return (per-turn rows, summary, run info)"""
+    from IO import stt, tts
+    from IO.audio_io import WavFileSource, RecordingSink, NullSink
+    from core.controller import conversation_loop
+
+    source = WavFileSource(clips, samplerate=16000, gap_seconds=gap_seconds, realtime=realtime)
+    sink = RecordingSink(output_dir) if output_dir else NullSink()
+    recorder = EventRecorder()
+
+    stt.set_audio_source(source)
+    tts.set_audio_sink(sink)
+    tts.set_backend(StubTTS(tts_base_delay, tts_char_delay))
+    tts.set_result_cache(None)  # the stub brain repeats itself; measure synthesis every turn
+    stt.initialize_stt(model_size=stt_model, compute_type=stt_compute_type)
+    profiler.set_trace_hook(recorder)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        conversation_loop(brain=StubBrain(llm_delay))
+    finally:
+        profiler.set_trace_hook(None)
+        stt.set_audio_source(None)
+        tts.set_audio_sink(None)
+        tts.set_backend(None)
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    rows = split_turns(recorder.events, source.clip_end_times)
+    info = {
+        "clips": len(clips),
+        "audio_seconds": source.duration,
+        "turns_measured": len(rows),
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_percent": 100.0 * cpu / wall if wall else 0.0,
+        "stt": stt.get_stats(),
+    }
+    try:
+        import resource
+        info["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except ImportError:
+        pass
+    return rows, summarize(rows), info
+
+
+def print_report(rows, summary, info):
+    print("=" * 60)
+    print("⏱️  Voice Loop Benchmark")
+    print("=" * 60)
+    print(f"📁 Clips: {info['clips']} ({info['audio_seconds']:.1f}s of audio), turns measured: {info['turns_measured']}")
+    for i, row in enumerate(rows, 1):
+        stages = "  ".join(f"{s}={row[s] * 1000:.0f}ms" for s in STAGES)
+        print(f"   • Turn {i}: total={row['total'] * 1000:.0f}ms  {stages}")
+    print(f"\n📊 End-of-speech → first audio out:")
+    for key, stats in summary.items():
+        unit = "s CPU" if key == "cpu_s" else "ms"
+        scale = 1 if key == "cpu_s" else 1000
+        print(f"   {key:15s} p50={stats['p50'] * scale:8.1f}{unit}  p95={stats['p95'] * scale:8.1f}{unit}  mean={stats['mean'] * scale:8.1f}{unit}")
+    print(f"\n🔧 Process CPU: {info['cpu_s']:.1f}s over {info['wall_s']:.1f}s wall ({info['cpu_percent']:.0f}%)")
+    if "max_rss_mb" in info:
+        print(f"🔧 Peak RSS: {info['max_rss_mb']:.0f} MB")
+    print(f"🔧 STT: {info['stt']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark conversation_loop latency from recorded utterances")
+    parser.add_argument("corpus", nargs="+", help="WAV/FLAC utterances or directories containing them")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="Stub LLM response delay in seconds")
+    parser.add_argument("--tts-delay", type=float, default=0.2, help="Stub TTS fixed delay in seconds")
+    parser.add_argument("--tts-char-delay", type=float, default=0.002, help="Stub TTS delay per character")
+    parser.add_argument("--stt-model", type=str, default=None, help="Whisper size override (e.g. tiny.en on CPU)")
+    parser.add_argument("--stt-compute-type", type=str, default=None, help="Whisper compute type override")
+    parser.add_argument("--gap", type=float, default=2.5, help="Silence after each utterance in seconds")
+    parser.add_argument("--fast", action="store_true", help="Replay faster than real time (endpointing delay not realistic)")
+    parser.add_argument("--record-dir", type=str, default=None, help="Write every played response here")
+    parser.add_argument("--json", type=str, default=None, help="Write per-turn results and summary as JSON")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    clips = collect_clips(args.corpus)
+    if not clips:
+        print("❌ No audio clips found")
+        sys.exit(1)
+
+    rows, summary, info = run_benchmark(
+        clips, args.llm_delay, args.tts_delay, args.tts_char_delay,
+        args.stt_model, args.stt_compute_type, realtime=not args.fast,
+        gap_seconds=args.gap, output_dir=args.record_dir,
+    )
+    print_report(rows, summary, info)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"turns": rows, "summary": summary, "info": info}, f, indent=2)
+        print(f"💾 Results written to {args.json}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Registered voices with precomputed speaker conditioning.
+
+A voice is ingested once: its reference clips are turned into ChatterboxTTS
+``Conditionals`` (speaker embedding, prompt speech tokens, decoder reference
+features) and stored on disk as ``<root>/<voice_id>/conds.pt`` next to a
+``meta.json``. Recently used voices stay in an in-memory LRU, so generation
+with a ``voice_id`` does no reference audio work at all.
+"""
+
+import json
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+VOICE_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def valid_voice_id(voice_id):
+    return isinstance(voice_id, str) and bool(VOICE_ID_RE.match(voice_id))
+
+
+class VoiceRegistry:
+    """On-disk voice store with a hot in-memory LRU of loaded conditionals"""
+
+    def __init__(self, root, max_hot=8, device="cpu", loader=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_hot = max_hot
+        self.device = device
+        self.loader = loader  # loader(path, map_location) -> conditionals; default Conditionals.load
+        self._hot = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def _dir(self, voice_id):
+        if not valid_voice_id(voice_id):
+            raise ValueError(f"Invalid voice id: {voice_id!r}")
+        return self.root / voice_id
+
+    def exists(self, voice_id):
+        return valid_voice_id(voice_id) and (self._dir(voice_id) / "conds.pt").exists()
+
+    def meta(self, voice_id):
+        try:
+            return json.loads((self._dir(voice_id) / "meta.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def list(self):
+        voices = []
+        for d in sorted(self.root.iterdir()):
+            if d.is_dir() and (d / "conds.pt").exists():
+                meta = self.meta(d.name) or {"voice_id": d.name}
+                meta["hot"] = d.name in self._hot
+                voices.append(meta)
+        return voices
+
+    def find_by_content(self, content_key):
+        """Voice id already registered for these exact reference clips, if any"""
+        for d in self.root.iterdir():
+            if d.is_dir():
+                meta = self.meta(d.name)
+                if meta and meta.get("content_key") == content_key and (d / "conds.pt").exists():
+                    return d.name
+        return None
+
+    def get(self, voice_id):
+        """Loaded conditionals for a voice (from the LRU, else from disk). KeyError if unknown."""
+        with self._lock:
+            conds = self._hot.get(voice_id)
+            if conds is not None:
+                self._hot.move_to_end(voice_id)
+                self.stats["hits"] += 1
+                return conds
+
+        path = self._dir(voice_id) / "conds.pt"
+        if not path.exists():
+            raise KeyError(voice_id)
+        loader = self.loader
+        if loader is None:
+            from chatterbox.tts import Conditionals
+            loader = Conditionals.load
+        conds = loader(path, map_location=self.device)
+        with self._lock:
+            self.stats["loads"] += 1
+            self._remember(voice_id, conds)
+        return conds
+
+    def add(self, voice_id, conds, meta):
+        """Persist conditionals + metadata and keep the voice hot"""
+        target = self._dir(voice_id)
+        tmp = self.root / f".{voice_id}.{int(time.time() * 1000)}.tmp"
+        tmp.mkdir(parents=True)
+        try:
+            conds.save(tmp / "conds.pt")
+            meta = dict(meta, voice_id=voice_id, created_at=time.strftime("%Y-%m-%dT%H:%M:%S"))
+            (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+            if target.exists():
+                shutil.rmtree(target)
+            tmp.rename(target)
+        finally:
+            if tmp.exists():
+                shutil.rmtree(tmp, ignore_errors=True)
+        with self._lock:
+            self._remember(voice_id, conds)
+        return meta
+
+    def delete(self, voice_id):
+        target = self._dir(voice_id)
+        with self._lock:
+            self._hot.pop(voice_id, None)
+        if not target.exists():
+            return False
+        shutil.rmtree(target)
+        return True
+
+    def _remember(self, voice_id, conds):
+        self._hot[voice_id] = conds
+        self._hot.move_to_end(voice_id)
+        while len(self._hot) > self.max_hot:
+            self._hot.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, hot=list(self._hot), hot_capacity=self.max_hot)
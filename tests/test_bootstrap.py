@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent model start-up (core/bootstrap.py)
+"""
+import os
+import sys
+import threading
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from core.bootstrap import ModelBootstrap
+from utils import profiler
+
+
+def _loader(seconds, value, log=None):
+    def load():
+        time.sleep(seconds)
+        if log is not None:
+            log.append(value)
+        return value
+    return load
+
+
+def test_components_load_concurrently():
+    """Total start-up is the slowest load, not the sum, and each is awaited on its own"""
+    start = time.perf_counter()
+    boot = ModelBootstrap({"llm": _loader(0.2, "brain"), "tts": _loader(0.1, "voice"),
+                           "stt": _loader(0.3, "whisper")}).start()
+    assert boot.wait("llm") == "brain"
+    llm_at = time.perf_counter() - start
+    assert not boot.ready("stt") and boot.status()["stt"]["state"] == "loading"
+    assert boot.wait_all() == {"llm": "brain", "tts": "voice", "stt": "whisper"}
+    total = time.perf_counter() - start
+    assert llm_at < 0.28, "the LLM is usable before STT has loaded"
+    assert total < 0.5, f"loads overlapped (took {total:.2f}s, sequential is 0.6s)"
+    status = boot.status()
+    assert all(s["state"] == "ready" for s in status.values())
+    assert 0.3 <= status["stt"]["seconds"] < 0.45
+    assert profiler.startup_report()["models"]["stt"] >= 0.3, "loads appear in the startup report"
+    print(f"✓ Three 0.1-0.3s loads finished in {total:.2f}s")
+
+
+def test_sequential_mode_keeps_order():
+    """parallel=False loads one component at a time, in the given order"""
+    order = []
+    boot = ModelBootstrap({"llm": _loader(0.02, "llm", order), "tts": _loader(0.01, "tts", order),
+                           "stt": _loader(0.0, "stt", order)}, parallel=False).start()
+    boot.wait_all()
+    assert order == ["llm", "tts", "stt"]
+    print("✓ Sequential mode loads in order")
+
+
+def test_failure_is_reported_and_raised():
+    """A failing loader marks only that component failed and re-raises when awaited"""
+    events = []
+    lock = threading.Lock()
+
+    def hook(event, ts, info):
+        with lock:
+            events.append((event, info["model"]))
+
+    def broken():
+        raise FileNotFoundError("piper.exe not found")
+
+    profiler.set_trace_hook(hook)
+    try:
+        boot = ModelBootstrap({"tts": broken, "llm": _loader(0.01, "brain")}).start()
+        assert boot.wait("llm") == "brain"
+        try:
+            boot.wait("tts")
+            assert False, "the load error reaches the caller"
+        except FileNotFoundError:
+            pass
+    finally:
+        profiler.set_trace_hook(None)
+    assert boot.status()["tts"]["state"] == "failed" and boot.ready("llm") and not boot.ready("tts")
+    assert ("model_failed", "tts") in events and ("model_ready", "llm") in events
+    print("✓ Load failures are reported per component")
+
+
+if __name__ == "__main__":
+    test_components_load_concurrently()
+    test_sequential_mode_keeps_order()
+    test_failure_is_reported_and_raised()
+    print("\nAll bootstrap tests passed.")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the process-wide model registry (utils/model_registry.py)
+"""
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.model_registry import ModelRegistry
+
+MB = 2 ** 20
+
+
+class FakeModel:
+    """Holds `mb` megabytes of touched memory, like a loaded checkpoint"""
+
+    def __init__(self, name, mb=40):
+        self.name = name
+        self.weights = np.ones(mb * MB // 8)
+
+
+def _loader(name, log, mb=40, delay=0.0):
+    def load():
+        time.sleep(delay)
+        log.append(name)
+        return FakeModel(name, mb)
+    return load
+
+
+def test_loads_are_shared_by_key():
+    """One load per (model id, device, dtype), even when threads ask at once"""
+    registry, loads = ModelRegistry(), []
+    first = registry.acquire("stt", "whisper-base", _loader("base", loads, mb=1, delay=0.05), device="cpu", dtype="int8")
+    again = registry.acquire("wakeword", "whisper-base", _loader("dup", loads, mb=1), device="cpu", dtype="int8")
+    other = registry.acquire("stt", "whisper-base", _loader("fp16", loads, mb=1), device="cpu", dtype="float16")
+
+    results = []
+    threads = [threading.Thread(target=lambda h=h: results.append(h.get())) for h in (first, again, first, again)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == ["base"] and all(model is results[0] for model in results)
+    assert other.get().name == "fp16" and loads == ["base", "fp16"]
+    stats = {s["dtype"]: s for s in registry.stats()}
+    assert stats["int8"]["loads"] == 1 and stats["int8"]["load_seconds"] >= 0.05
+    print("✓ Same key loads once, other dtypes load separately")
+
+
+def test_budget_unloads_least_recently_used():
+    """Over the RAM budget, the least recently used idle model is unloaded and reloaded on demand"""
+    registry, loads, unloaded = ModelRegistry(budget_bytes=100 * MB), [], []
+    handles = {name: registry.acquire("test", name, _loader(name, loads), unloader=lambda m: unloaded.append(m.name))
+               for name in ("a", "b", "c")}
+    handles["a"].get()
+    handles["b"].get()
+    sizes = {s["model_id"]: s["ram_mb"] for s in registry.stats()}
+    assert 35 <= sizes["a"] <= 60, f"resident size measured ({sizes['a']}MB)"
+
+    handles["a"].get()  # a is now more recently used than b
+    handles["c"].get()
+    assert unloaded == ["b"] and handles["a"].loaded and not handles["b"].loaded and handles["c"].loaded
+
+    with handles["a"].use():
+        handles["b"].get()  # c is the LRU idle model; a is in use
+    assert unloaded == ["b", "c"] and handles["a"].loaded
+    assert loads == ["a", "b", "c", "b"]
+    assert {s["model_id"]: s["loads"] for s in registry.stats()}["b"] == 2
+    assert registry.resident_bytes <= 100 * MB
+    print("✓ RAM budget unloads least recently used models")
+
+
+def test_idle_and_pinned_models():
+    """Idle models are unloaded after the timeout; pinned ones stay"""
+    registry, loads = ModelRegistry(idle_seconds=0.05), []
+    idle = registry.acquire("test", "idle", _loader("idle", loads, mb=1))
+    pinned = registry.acquire("test", "pinned", _loader("pinned", loads, mb=1), pinned=True)
+    idle.get()
+    pinned.get()
+    assert registry.unload_idle() == []
+    with idle.use():
+        time.sleep(0.1)
+        assert registry.unload_idle() == [], "a model in use is never idle"
+    time.sleep(0.1)
+    assert registry.unload_idle() == [("idle", "default", "default")]
+    assert not idle.loaded and pinned.loaded
+    assert idle.get().name == "idle" and loads == ["idle", "pinned", "idle"]
+
+    registry.start_idle_monitor(interval=0.02)
+    try:
+        time.sleep(0.2)
+        assert not idle.loaded, "the monitor unloads idle models"
+    finally:
+        registry.stop_idle_monitor()
+    print("✓ Idle models are unloaded, pinned models kept")
+
+
+if __name__ == "__main__":
+    test_loads_are_shared_by_key()
+    test_budget_unloads_least_recently_used()
+    test_idle_and_pinned_models()
+    print("\nAll model registry tests passed.")
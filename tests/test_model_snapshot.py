@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for model snapshot manifests (testing/model_snapshot.py)
+"""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from model_snapshot import SNAPSHOT_FORMAT, StaleSnapshot, library_versions, read_manifest
+
+
+def write_snapshot(root, **overrides):
+    """Fake snapshot directory with a manifest describing its files"""
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "t3.safetensors").write_bytes(b"weights")
+    (root / "tokenizer.json").write_text("{}")
+    manifest = {"format": SNAPSHOT_FORMAT, "versions": library_versions(),
+                "files": {"t3.safetensors": 7, "tokenizer.json": 2}, "aliases": {}}
+    manifest.update(overrides)
+    (root / "manifest.json").write_text(json.dumps(manifest))
+    return root
+
+
+def assert_stale(root, reason):
+    try:
+        read_manifest(root)
+    except StaleSnapshot as e:
+        assert reason in str(e), e
+    else:
+        raise AssertionError(f"expected a stale snapshot ({reason})")
+
+
+def test_valid_snapshot_is_accepted():
+    """A manifest matching the installed libraries and files is returned"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = write_snapshot(Path(tmp) / "snap")
+        assert read_manifest(root)["format"] == SNAPSHOT_FORMAT
+    print("✓ Valid snapshot accepted")
+
+
+def test_stale_snapshots_are_rejected():
+    """Missing manifest, other format, other library versions or changed files are stale"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assert_stale(tmp / "missing", "manifest")
+        assert_stale(write_snapshot(tmp / "format", format=SNAPSHOT_FORMAT + 1), "format")
+
+        versions = dict(library_versions(), torch="0.0.1")
+        assert_stale(write_snapshot(tmp / "versions", versions=versions), "built with")
+
+        root = write_snapshot(tmp / "truncated")
+        (root / "t3.safetensors").write_bytes(b"w")
+        assert_stale(root, "t3.safetensors")
+
+        root = write_snapshot(tmp / "deleted")
+        (root / "tokenizer.json").unlink()
+        assert_stale(root, "tokenizer.json")
+    print("✓ Stale snapshots rejected")
+
+
+if __name__ == "__main__":
+    print("Testing model snapshots...")
+    print()
+
+    test_valid_snapshot_is_accepted()
+    test_stale_snapshots_are_rejected()
+
+    print()
+    print("All tests passed! ✓")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for shared reference-audio preprocessing (IO/reference_audio.py)
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from IO.reference_audio import (LOUD_CLIP_GAIN, normalize_batch, prepare_references, resample_batch,
+                                resample_kernel)
+
+
+def _level_db(audio):
+    return 20 * np.log10(np.sqrt(np.mean(audio.astype(np.float64) ** 2)))
+
+
+def test_normalize_batch_matches_per_clip_rules():
+    """Each clip reaches the target RMS, loud clips get less, peaks are limited"""
+    rng = np.random.default_rng(0)
+    quiet = (0.01 * rng.standard_normal(8000)).astype(np.float32)
+    loud = (0.3 * rng.standard_normal(12000)).astype(np.float32)
+    spiky = np.zeros(4000, dtype=np.float32)
+    spiky[::400] = 1.0  # very low RMS, so the level gain would clip
+
+    clips, levels = normalize_batch([quiet, loud, spiky], target_db=-20.0, loud=[False, True, False])
+    assert [len(c) for c in clips] == [8000, 12000, 4000], "padding is trimmed again"
+    assert abs(_level_db(clips[0]) + 20.0) < 0.01
+    assert abs(_level_db(clips[1]) - (-20.0 + 20 * np.log10(LOUD_CLIP_GAIN))) < 0.01
+    assert abs(np.abs(clips[2]).max() - 0.95) < 1e-5 and levels["peak"][2] <= 0.95 + 1e-6
+    assert abs(levels["rms_db"][0] - _level_db(quiet)) < 0.01
+    print("✓ Batch normalization levels, attenuates and limits per clip")
+
+
+def test_resample_batch_matches_single_clips():
+    """Resampling a padded batch gives each clip the same result as resampling it alone"""
+    from scipy.signal import resample_poly
+
+    rng = np.random.default_rng(1)
+    clips = [rng.standard_normal(n).astype(np.float32) * 0.1 for n in (22050, 5000, 13001)]
+    out = resample_batch(clips, 22050, 24000)
+    for clip, got in zip(clips, out):
+        expected = resample_poly(clip, 160, 147)
+        assert len(got) == len(expected)
+        assert np.abs(got - expected).max() < 1e-4
+    resample_batch(clips[:1], 22050, 24000)
+    assert resample_kernel.cache_info().hits >= 1, "kernel designed once per rate pair"
+    assert resample_batch(clips, 24000, 24000)[0] is clips[0]
+    print("✓ Batched resampling matches per-clip resampling")
+
+
+def test_prepare_references_combines_with_metadata():
+    """Clips are downmixed, resampled to the first clip's rate and joined in order"""
+    with tempfile.TemporaryDirectory() as tmp:
+        t = np.arange(24000) / 24000
+        sf.write(os.path.join(tmp, "a.wav"), 0.2 * np.sin(2 * np.pi * 220 * t), 24000)
+        stereo = 0.1 * np.stack([np.sin(2 * np.pi * 330 * t[:16000]), np.cos(2 * np.pi * 330 * t[:16000])], 1)
+        sf.write(os.path.join(tmp, "b_angry.wav"), stereo, 16000)
+        open(os.path.join(tmp, "broken.wav"), "wb").write(b"not audio")
+        paths = [os.path.join(tmp, name) for name in ("a.wav", "b_angry.wav")]
+
+        prepared = prepare_references(paths)
+        assert prepared.sample_rate == 24000 and prepared.audio.dtype == np.float32
+        a, b = prepared.clips
+        assert (a.source_rate, a.channels, b.source_rate, b.channels) == (24000, 1, 16000, 2)
+        assert a.offset == 0 and b.offset == 24000 and abs(b.duration - 1.0) < 1e-3
+        assert len(prepared.audio) == 48000 and abs(prepared.duration - 2.0) < 1e-3
+        assert b.gain_db < a.gain_db + (a.rms_db - b.rms_db), "the angry clip is attenuated"
+
+        try:
+            prepare_references(paths + [os.path.join(tmp, "broken.wav")])
+            assert False, "an unreadable clip raises by default"
+        except Exception:
+            pass
+        tolerant = prepare_references(paths + [os.path.join(tmp, "broken.wav")], skip_unreadable=True)
+        assert len(tolerant.clips) == 2 and tolerant.skipped[0][0].endswith("broken.wav")
+        assert np.array_equal(tolerant.audio, prepared.audio)
+    print("✓ References are combined with per-clip metadata")
+
+
+if __name__ == "__main__":
+    test_normalize_batch_matches_per_clip_rules()
+    test_resample_batch_matches_single_clips()
+    test_prepare_references_combines_with_metadata()
+    print("\nAll reference audio tests passed.")
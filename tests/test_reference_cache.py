@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash reference cache (testing/reference_cache.py)
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from reference_cache import ReferenceCache
+
+
+def test_key_follows_content_not_path():
+    """Same clips at another path share a key; editing a clip changes it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = ReferenceCache(tmp / "cache")
+        a, b = tmp / "a.wav", tmp / "b.wav"
+        a.write_bytes(b"clip-one")
+        b.write_bytes(b"clip-two")
+        key = cache.key([a, b])
+
+        moved = tmp / "moved"
+        moved.mkdir()
+        shutil.copy(a, moved / "a.wav")
+        shutil.copy(b, moved / "b.wav")
+        assert cache.key([moved / "a.wav", moved / "b.wav"]) == key
+        assert cache.key([b, a]) != key, "clip order matters (first clip sets the sample rate)"
+
+        a.write_bytes(b"clip-one, re-recorded")
+        assert cache.key([a, b]) != key
+    print("✓ Keys follow clip content")
+
+
+def test_unchanged_files_use_stat_fast_path():
+    """Unchanged files are not re-read, and the hash index survives restarts"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        clip = tmp / "clip.wav"
+        clip.write_bytes(b"audio")
+        cache = ReferenceCache(tmp / "cache")
+        cache.key([clip])
+        cache.key([clip])
+        assert cache.stats["files_hashed"] == 1
+        assert cache.stats["hash_fast_path"] == 1
+
+        reopened = ReferenceCache(tmp / "cache")
+        reopened.key([clip])
+        assert reopened.stats["files_hashed"] == 0
+    print("✓ Stat fast path skips re-hashing")
+
+
+def test_eviction_keeps_cache_under_budget():
+    """Least recently used entries are evicted past the byte budget"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "legacy.pt").write_bytes(b"old")
+        cache = ReferenceCache(root, max_bytes=250)
+        assert not (root / "legacy.pt").exists(), "path-keyed legacy entries are dropped"
+
+        now = time.time()
+        for i, name in enumerate(["old", "mid", "new"]):
+            path = root / f"{name}.safetensors"
+            path.write_bytes(bytes(100))
+            os.utime(path, (now + i, now + i))
+        assert cache.evict() == 200
+        assert sorted(p.stem for p in root.glob("*.safetensors")) == ["mid", "new"]
+        assert cache.snapshot()["evictions"] == 1
+    print("✓ Cache evicted to its size budget")
+
+
+if __name__ == "__main__":
+    test_key_follows_content_not_path()
+    test_unchanged_files_use_stat_fast_path()
+    test_eviction_keeps_cache_under_budget()
+    print("\nAll reference cache tests passed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the reference-clip metadata index (IO/reference_library.py)
+"""
+import os
+import sys
+import tempfile
+from unittest import mock
+
+import numpy as np
+import soundfile as sf
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import IO.reference_library as reference_library
+from IO.reference_library import INDEX_NAME, ReferenceLibrary, pick_primary
+
+
+def _write_tone(path, sr, seconds, amplitude=0.5, channels=1):
+    t = np.arange(int(sr * seconds)) / sr
+    tone = amplitude * np.sin(2 * np.pi * 220 * t)
+    sf.write(path, np.stack([tone] * channels, axis=1) if channels > 1 else tone, sr)
+
+
+def _library_folder(root):
+    _write_tone(os.path.join(root, "angry_5s.wav"), 24000, 0.5, amplitude=0.5)
+    _write_tone(os.path.join(root, "happy-excited_3s.flac"), 48000, 0.3, amplitude=0.1, channels=2)
+    _write_tone(os.path.join(root, "serious_9s.wav"), 24000, 0.4)
+    _write_tone(os.path.join(root, "neutral_4s.wav"), 24000, 0.2)
+    _write_tone(os.path.join(root, "long_story_12s.wav"), 16000, 12.5, amplitude=0.05)
+    open(os.path.join(root, "notes.txt"), "w").write("not audio")
+
+
+def test_index_records_clip_facts():
+    """Header facts, loudness and tags are recorded per clip"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _library_folder(tmp)
+        library = ReferenceLibrary(tmp)
+        stats = library.refresh()
+        assert stats["added"] == 5 and stats["failed"] == 0
+        assert os.path.exists(os.path.join(tmp, INDEX_NAME))
+
+        happy = library.clips["happy-excited_3s.flac"]
+        assert (happy.sample_rate, happy.channels, happy.format) == (48000, 2, "FLAC")
+        assert abs(happy.duration - 0.3) < 1e-3 and happy.tags == ["happy", "excited"]
+        angry = library.clips["angry_5s.wav"]
+        # A sine at amplitude 0.5 peaks at -6 dBFS with an RMS 3 dB lower
+        assert abs(angry.peak_db + 6.02) < 0.05 and abs(angry.rms_db + 9.03) < 0.05
+        assert library.tags == ["angry", "excited", "happy", "long", "neutral", "serious", "story"]
+    print("✓ Index records duration, format, loudness and tags")
+
+
+def test_refresh_is_incremental():
+    """Only new or changed clips are read again; deleted clips are dropped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _library_folder(tmp)
+        ReferenceLibrary(tmp).refresh()
+
+        with mock.patch.object(reference_library, "measure_loudness",
+                               side_effect=AssertionError("audio read for an unchanged clip")):
+            library = ReferenceLibrary(tmp)
+            assert library.refresh() == {"added": 0, "updated": 0, "removed": 0, "unchanged": 5, "failed": 0}
+
+        _write_tone(os.path.join(tmp, "serious_9s.wav"), 24000, 0.8)
+        os.remove(os.path.join(tmp, "neutral_4s.wav"))
+        open(os.path.join(tmp, "broken.wav"), "wb").write(b"not a wav file")
+        stats = ReferenceLibrary(tmp).refresh()
+        assert (stats["updated"], stats["removed"], stats["unchanged"], stats["failed"]) == (1, 1, 3, 1)
+
+        library = ReferenceLibrary(tmp)
+        assert abs(library.clips["serious_9s.wav"].duration - 0.8) < 1e-3, "changed clip re-read and saved"
+        assert "neutral_4s.wav" not in library.clips and "broken.wav" not in library.clips
+    print("✓ Refresh only rescans what changed")
+
+
+def test_query_runs_on_the_index():
+    """Duration, tag and level filters work without reading audio"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _library_folder(tmp)
+        ReferenceLibrary(tmp).refresh()
+        library = ReferenceLibrary(tmp)
+        with mock.patch("soundfile.info", side_effect=AssertionError("header read during query")):
+            names = lambda entries: [e.name for e in entries]
+            usable = library.query(max_duration=11, exclude=["neutral"])
+            assert names(usable) == ["angry_5s.wav", "happy-excited_3s.flac", "serious_9s.wav"]
+            assert names(library.query(max_duration=11, exclude=["neutral"], any_tags=["angry", "happy"])) == \
+                ["angry_5s.wav", "happy-excited_3s.flac"]
+            assert names(library.query(all_tags=["happy", "excited"])) == ["happy-excited_3s.flac"]
+            assert names(library.query(min_duration=10)) == ["long_story_12s.wav"]
+            assert names(library.query(sample_rate=48000)) == ["happy-excited_3s.flac"]
+            assert "long_story_12s.wav" not in names(library.query(min_rms_db=-20))
+            assert pick_primary(usable).name == "serious_9s.wav"
+            assert pick_primary(usable, prefer=("calm",)).name == "angry_5s.wav"
+            assert pick_primary([]) is None
+    print("✓ Queries run on the index alone")
+
+
+if __name__ == "__main__":
+    test_index_records_clip_facts()
+    test_refresh_is_incremental()
+    test_query_runs_on_the_index()
+    print("\nAll reference library tests passed.")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel, incremental reference resampling (utils/resample_references.py)
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+# Add utils directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'utils'))
+
+from resample_references import MANIFEST_NAME, load_manifest, resample_to_48k
+
+
+def _write_tone(path, sr, seconds, channels=1, amplitude=0.5):
+    t = np.arange(int(sr * seconds)) / sr
+    tone = amplitude * np.sin(2 * np.pi * 220 * t)
+    sf.write(path, np.stack([tone] * channels, axis=1) if channels > 1 else tone, sr, subtype="PCM_16")
+
+
+def test_parallel_resample_and_skip_unchanged():
+    """Files are resampled in a pool, measured, and skipped on the next run until they change"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src, out = os.path.join(tmp, "refs"), os.path.join(tmp, "refs_48k")
+        os.makedirs(src)
+        _write_tone(os.path.join(src, "a.wav"), 22050, 1.0)
+        _write_tone(os.path.join(src, "b.wav"), 24000, 0.5, channels=2, amplitude=0.25)
+        _write_tone(os.path.join(src, "c.flac"), 48000, 0.25)
+        open(os.path.join(src, "notes.txt"), "w").write("not audio")
+
+        results = resample_to_48k(src, out, jobs=2)
+        assert sorted(results) == ["a.wav", "b.wav", "c.flac"]
+        assert results["a.wav"]["status"] == "resampled" and results["c.flac"]["status"] == "already"
+        assert abs(results["a.wav"]["duration"] - 1.0) < 1e-3 and abs(results["a.wav"]["peak"] - 0.5) < 0.02
+        info = sf.info(os.path.join(out, "b.wav"))
+        assert (info.samplerate, info.channels, info.subtype) == (48000, 2, "PCM_16")
+        assert abs(info.frames / info.samplerate - 0.5) < 1e-3
+        assert not os.path.exists(os.path.join(out, "c.flac")), "files already at the target rate are left alone"
+        assert set(load_manifest(os.path.join(out, MANIFEST_NAME))) == set(results)
+
+        mtime = os.stat(os.path.join(out, "a.wav")).st_mtime_ns
+        _write_tone(os.path.join(src, "b.wav"), 24000, 0.75, channels=2)
+        again = resample_to_48k(src, out, jobs=2)
+        assert os.stat(os.path.join(out, "a.wav")).st_mtime_ns == mtime, "unchanged input is skipped"
+        assert abs(again["b.wav"]["duration"] - 0.75) < 1e-3, "edited input is redone"
+    print("✓ Parallel resampling skips unchanged files")
+
+
+def test_in_place_resample_is_idempotent():
+    """Overwriting originals records the new content, so a rerun does nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        _write_tone(os.path.join(tmp, "a.wav"), 16000, 0.5)
+        first = resample_to_48k(tmp, jobs=1)
+        assert first["a.wav"]["status"] == "resampled" and sf.info(os.path.join(tmp, "a.wav")).samplerate == 48000
+        mtime = os.stat(os.path.join(tmp, "a.wav")).st_mtime_ns
+        second = resample_to_48k(tmp, jobs=1)
+        assert second["a.wav"] == first["a.wav"]
+        assert os.stat(os.path.join(tmp, "a.wav")).st_mtime_ns == mtime
+    print("✓ In-place resampling is idempotent")
+
+
+if __name__ == "__main__":
+    test_parallel_resample_and_skip_unchanged()
+    test_in_place_resample_is_idempotent()
+    print("\nAll resample tests passed.")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Startup budget: importing the entry modules must not pull in the model
+libraries, and startup instrumentation (utils/profiler.py) must record
+import and model load times.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from utils import profiler
+
+# Seconds allowed for importing the entry modules in a fresh interpreter
+IMPORT_BUDGET = 1.0
+# Loaded only when a model is initialized (or the UI is built)
+HEAVY_MODULES = ["torch", "torchaudio", "transformers", "gradio", "faster_whisper", "chatterbox",
+                 "TTS", "numpy", "scipy", "soundfile"]
+ENTRY_MODULES = ["core.controller", "core.brain", "IO.tts", "IO.stt", "app"]
+
+_PROBE = """
+import json, sys, time
+from utils.profiler import enable_startup_profile, startup_report
+enable_startup_profile()
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": sorted(m for m in {heavy!r} if m in sys.modules),
+                  "imports": startup_report(5)["imports"]}}))
+"""
+
+
+def test_entry_modules_import_within_budget():
+    """main.py/app.py modules import without the model libraries, inside the budget"""
+    with tempfile.TemporaryDirectory() as tmp:
+        # A config.py as a user would create it from the template
+        shutil.copy(os.path.join(ROOT, "config.example.py"), os.path.join(tmp, "config.py"))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([tmp, ROOT]))
+        result = subprocess.run([sys.executable, "-c", _PROBE.format(modules=ENTRY_MODULES, heavy=HEAVY_MODULES)],
+                                cwd=tmp, env=env, capture_output=True, text=True, timeout=60)
+        assert result.returncode == 0, result.stderr
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        assert probe["loaded"] == [], f"imported at startup: {probe['loaded']}"
+        slowest = ", ".join(f"{name} {own * 1000:.0f}ms" for name, _, own in probe["imports"])
+        assert probe["elapsed"] < IMPORT_BUDGET, f"imports took {probe['elapsed']:.2f}s (slowest: {slowest})"
+        assert not os.path.exists(os.path.join(tmp, "outputs")), "importing app creates nothing"
+    print(f"✓ Entry modules import in {probe['elapsed'] * 1000:.0f}ms without model libraries")
+
+
+def test_import_timer_records_self_and_cumulative_time():
+    """Nested imports are charged to the importer's cumulative time only"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "startup_outer.py"), "w") as f:
+            f.write("import time\nimport startup_inner\ntime.sleep(0.02)\n")
+        with open(os.path.join(tmp, "startup_inner.py"), "w") as f:
+            f.write("import time\ntime.sleep(0.05)\n")
+        sys.path.insert(0, tmp)
+        was_enabled = profiler._original_import is not None
+        try:
+            profiler.enable_startup_profile()
+            import startup_outer  # noqa: F401
+        finally:
+            if not was_enabled:
+                profiler.disable_startup_profile()
+            sys.path.remove(tmp)
+            sys.modules.pop("startup_outer", None)
+            sys.modules.pop("startup_inner", None)
+        times = {name: (cum, own) for name, cum, own in profiler.startup_report()["imports"]}
+        outer_cum, outer_self = times["startup_outer"]
+        inner_cum, inner_self = times["startup_inner"]
+        assert inner_self >= 0.05 and inner_cum == inner_self
+        assert outer_cum >= 0.07 and 0.02 <= outer_self < 0.05
+    print("✓ Import timer separates self and cumulative time")
+
+
+def test_model_load_is_timed_and_traced():
+    """model_load() records the load time and emits a pipeline trace event"""
+    events = []
+    profiler.set_trace_hook(lambda event, ts, info: events.append((event, info)))
+    try:
+        with profiler.model_load("test-model"):
+            time.sleep(0.01)
+    finally:
+        profiler.set_trace_hook(None)
+    assert profiler.startup_report()["models"]["test-model"] >= 0.01
+    assert events[0][0] == "model_loaded" and events[0][1]["model"] == "test-model"
+    assert profiler.startup_profile_requested(["main.py", "--profile-startup"])
+    print("✓ Model loads are timed")
+
+
+if __name__ == "__main__":
+    test_entry_modules_import_within_budget()
+    test_import_timer_records_self_and_cumulative_time()
+    test_model_load_is_timed_and_traced()
+    print("\nAll startup tests passed.")
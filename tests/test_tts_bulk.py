@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Tests for bulk offline synthesis (testing/tts_bulk.py)
+"""
+import json
+import os
+import sys
+import tempfile
+
+import soundfile as sf
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_bulk import (MANIFEST_NAME, Manifest, assign_ids, item_digest, item_id, output_path, read_items,
+                      run_bulk)
+
+
+def test_read_items_jsonl_and_csv():
+    """Both input formats give the same items; CSV values get /generate types"""
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = os.path.join(tmp, "items.jsonl")
+        with open(jsonl, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "a", "text": "Hello.", "seed": 3}) + "\n\n")
+            f.write(json.dumps({"text": "Bye.", "reference_files": ["x.wav", "y.wav"]}) + "\n")
+        csv_path = os.path.join(tmp, "items.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("id,text,seed,reference_files\na,Hello.,3,\n,Bye.,,x.wav|y.wav\n")
+
+        assert read_items(jsonl) == read_items(csv_path)
+        assert read_items(csv_path)[0]["seed"] == 3
+
+        with open(jsonl, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "empty", "text": "  "}) + "\n")
+        try:
+            read_items(jsonl)
+            assert False, "an item without text is rejected"
+        except ValueError:
+            pass
+    print("✓ JSONL and CSV inputs parse to the same items")
+
+
+def test_manifest_resume_rules():
+    """Only ok entries with a matching digest and an existing output count as done"""
+    item = {"id": "a", "text": "Hello."}
+    assert item_id(item) == "a"
+    assert item_id({"text": "Hello."}) == item_id({"text": "Hello.", "output": "x.wav"})
+    assert item_digest(item) != item_digest(dict(item, temperature=0.5))
+    assert item_digest(item, "voice-a") != item_digest(item, "voice-b"), "the voice counts by content"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = Manifest(os.path.join(tmp, MANIFEST_NAME))
+        manifest.record({"id": "a", "digest": item_digest(item), "status": "ok", "output": "a.wav"})
+        assert not manifest.done("a", item_digest(item), tmp), "output file is missing"
+        open(os.path.join(tmp, "a.wav"), "wb").close()
+        assert manifest.done("a", item_digest(item), tmp)
+        assert not manifest.done("a", item_digest(dict(item, seed=1)), tmp), "item changed"
+
+        # Reloaded from disk (a torn last line is ignored); the latest entry wins
+        with open(manifest.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "a", "digest": item_digest(item), "status": "error"}) + "\n{\"id\": ")
+        assert not Manifest(manifest.path).done("a", item_digest(item), tmp)
+    print("✓ Manifest decides which items to resume")
+
+
+def test_bulk_run_with_stub_resumes():
+    """Items are synthesized once; a rerun skips them and redoes only changed ones"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            import tts_server
+            tts_server.enable_stub(rtf=0.0)
+            server_worker, tts_server.WORKER = tts_server.WORKER, tts_server.create_worker(max_queue=32)
+            tts_server.WORKER.start()
+            try:
+                long_text = " ".join(["This sentence is part of a long paragraph."] * 12)
+                items = [{"id": "one", "text": "Hello there."},
+                         {"id": "two", "text": "Goodbye.", "output_format": "flac"},
+                         {"id": "long", "text": long_text}]
+                _, summary = run_bulk(tts_server, items, "out", workers=3)
+                assert summary["synthesized"] == 3 and summary["failed"] == 0 and summary["skipped"] == 0
+                manifest = Manifest(os.path.join("out", MANIFEST_NAME))
+                assert manifest.entries["two"]["output"] == "two.flac"
+                assert manifest.entries["long"]["chunks"] > 1
+                info = sf.info(os.path.join("out", "long.wav"))
+                assert abs(info.frames / info.samplerate - manifest.entries["long"]["audio_seconds"]) < 0.01
+
+                items[0]["temperature"] = 0.5
+                items.append({"id": "bad", "text": "Hi.", "voice_id": "missing"})
+                items.append({"id": "badfmt", "text": "Hi.", "output_format": "aiff"})
+                _, summary = run_bulk(tts_server, items, "out", workers=3)
+                assert summary["skipped"] == 2 and summary["synthesized"] == 1 and summary["failed"] == 2
+                manifest = Manifest(os.path.join("out", MANIFEST_NAME))
+                assert manifest.entries["bad"]["status"] == "error"
+                assert manifest.entries["badfmt"]["status"] == "error" and "aiff" in manifest.entries["badfmt"]["error"]
+                assert not any(name.startswith("badfmt") for name in os.listdir("out"))
+            finally:
+                tts_server.WORKER.stop()
+                tts_server.WORKER = server_worker
+        finally:
+            os.chdir(cwd)
+    print("✓ Bulk run synthesizes, records and resumes")
+
+
+def test_ids_and_outputs_are_checked():
+    """Repeated items get distinct ids, repeated explicit ids and escaping outputs are rejected"""
+    items = [{"text": "Same."}, {"text": "Same."}, {"id": "x", "text": "Other."}, {"text": "Same."}]
+    ids = assign_ids(items)
+    assert len(set(ids)) == 4 and ids[1] == f"{ids[0]}-2" and ids[3] == f"{ids[0]}-3" and ids[2] == "x"
+    assert assign_ids(items) == ids, "ids are stable across reruns"
+    try:
+        assign_ids([{"id": "x", "text": "A."}, {"id": "x", "text": "B."}])
+        assert False, "duplicate explicit ids are rejected"
+    except ValueError:
+        pass
+
+    assert output_path("out", "sub/a.wav").as_posix() == "out/sub/a.wav"
+    for bad in ("../a.wav", "sub/../../a.wav", os.path.abspath("a.wav"), ""):
+        try:
+            output_path("out", bad)
+            assert False, f"{bad!r} leaves the output directory"
+        except ValueError:
+            pass
+    print("✓ Item ids are unique and outputs stay inside --out-dir")
+
+
+def test_edited_reference_is_redone():
+    """Editing a reference clip in place changes the item digest, so a rerun synthesizes it again"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            import tts_server
+            tts_server.enable_stub(rtf=0.0)
+            server_worker, tts_server.WORKER = tts_server.WORKER, tts_server.create_worker(max_queue=32)
+            tts_server.WORKER.start()
+            try:
+                with open("ref.wav", "wb") as f:
+                    f.write(b"first take")
+                items = [{"id": "voiced", "text": "Hello there.", "reference_files": ["ref.wav"]}]
+                assert run_bulk(tts_server, items, "out")[1]["synthesized"] == 1
+                assert run_bulk(tts_server, items, "out")[1]["skipped"] == 1
+
+                with open("ref.wav", "wb") as f:
+                    f.write(b"second, longer take")
+                _, summary = run_bulk(tts_server, items, "out")
+                assert summary["synthesized"] == 1 and summary["skipped"] == 0
+
+                try:
+                    run_bulk(tts_server, [{"text": "Hi.", "output": "../escape.wav"}], "out")
+                    assert False, "an output outside --out-dir is rejected before synthesis"
+                except ValueError:
+                    pass
+                assert not os.path.exists("escape.wav")
+            finally:
+                tts_server.WORKER.stop()
+                tts_server.WORKER = server_worker
+        finally:
+            os.chdir(cwd)
+    print("✓ Edited reference clips are synthesized again")
+
+
+if __name__ == "__main__":
+    test_read_items_jsonl_and_csv()
+    test_manifest_resume_rules()
+    test_bulk_run_with_stub_resumes()
+    test_ids_and_outputs_are_checked()
+    test_edited_reference_is_redone()
+    print("\nAll bulk synthesis tests passed.")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthesized speech cache in IO/tts_cache.py
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from IO.tts_cache import TTSResultCache, result_key
+
+
+def test_key_normalizes_text_and_covers_parameters():
+    """Whitespace variants share a key; voice, parameters and seed do not"""
+    base = result_key("Goodbye!  Have a great day!", voice="default", temperature=0.8, seed=None)
+    assert result_key(" Goodbye! Have a great\nday! ", voice="default", temperature=0.8, seed=None) == base
+    assert result_key("goodbye! have a great day!", voice="default", temperature=0.8, seed=None) != base
+    assert result_key("Goodbye!  Have a great day!", voice="narrator", temperature=0.8, seed=None) != base
+    assert result_key("Goodbye!  Have a great day!", voice="default", temperature=0.7, seed=None) != base
+    assert result_key("Goodbye!  Have a great day!", voice="default", temperature=0.8, seed=1) != base
+    print("✓ Keys normalize text and cover all parameters")
+
+
+def test_memory_and_disk_tiers():
+    """Entries survive in the disk tier and are promoted back to memory"""
+    with tempfile.TemporaryDirectory() as root:
+        cache = TTSResultCache(root)
+        cache.put("k", b"RIFF-audio")
+        assert cache.get("k") == b"RIFF-audio"
+        assert cache.get("missing") is None
+
+        reopened = TTSResultCache(root)
+        assert reopened.contains("k")
+        assert reopened.get("k") == b"RIFF-audio"
+        assert reopened.get("k") == b"RIFF-audio"
+        stats = reopened.snapshot()
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1 and stats["hit_rate"] == 1.0
+    print("✓ Memory and disk tiers")
+
+
+def test_byte_budgets_evict_least_recently_used():
+    """Both tiers stay within their byte budgets"""
+    with tempfile.TemporaryDirectory() as root:
+        cache = TTSResultCache(root, memory_bytes=250, disk_bytes=250)
+        cache.put("a", bytes(100))
+        cache.put("b", bytes(100))
+        os.utime(Path(root) / "a.wav", (1, 1))
+        os.utime(Path(root) / "b.wav", (2, 2))
+        cache.put("c", bytes(100))
+
+        stats = cache.snapshot()
+        assert stats["memory_entries"] == 2 and stats["memory_evictions"] == 1
+        assert stats["disk_evictions"] == 1
+        assert sorted(p.stem for p in Path(root).glob("*.wav")) == ["b", "c"]
+    print("✓ Byte budgets enforced")
+
+
+def test_entries_keep_their_format():
+    """Entries are stored under their format's extension and all formats count towards the disk budget"""
+    with tempfile.TemporaryDirectory() as root:
+        cache = TTSResultCache(root, memory_bytes=0, disk_bytes=250)
+        cache.put("k", b"OggS-audio", "ogg")
+        assert (Path(root) / "k.ogg").exists() and not (Path(root) / "k.wav").exists()
+        assert cache.contains("k", "ogg") and not cache.contains("k")
+        assert cache.get("k", "ogg") == b"OggS-audio" and cache.get("k") is None
+
+        os.utime(Path(root) / "k.ogg", (1, 1))
+        cache.put("a", bytes(100), "flac")
+        cache.put("b", bytes(100), "mp3")
+        cache.put("c", bytes(100))
+        assert sorted(p.name for p in Path(root).iterdir()) == ["b.mp3", "c.wav"]
+    print("✓ Entries keep their format")
+
+
+def test_disk_total_is_tracked_and_failed_writes_are_not_stored():
+    """Puts under budget do not walk the directory; overwrites are counted once; failed writes count as errors"""
+    with tempfile.TemporaryDirectory() as root:
+        (Path(root) / "old.wav").write_bytes(bytes(50))
+        cache = TTSResultCache(root, memory_bytes=1000, disk_bytes=250)
+        assert cache._disk_used == 50
+
+        walks = []
+        entries = cache._disk_entries
+        cache._disk_entries = lambda: walks.append(1) or entries()
+        cache.put("a", bytes(100))
+        cache.put("a", bytes(100))
+        assert cache._disk_used == 150 and not walks
+        cache.put("b", bytes(150))
+        assert walks and cache._disk_used == 250
+        assert sorted(p.name for p in Path(root).iterdir()) == ["a.wav", "b.wav"]
+
+        cache.root = Path(root) / "missing"
+        cache.put("c", b"audio")
+        assert cache.stats["store_errors"] == 1 and cache.stats["stores"] == 3
+        assert not cache.contains("c") and cache.get("c") is None
+    print("✓ Disk total is tracked and failed writes are not stored")
+
+
+if __name__ == "__main__":
+    test_key_normalizes_text_and_covers_parameters()
+    test_memory_and_disk_tiers()
+    test_byte_budgets_evict_least_recently_used()
+    test_entries_keep_their_format()
+    test_disk_total_is_tracked_and_failed_writes_are_not_stored()
+    print("\nAll TTS result cache tests passed!")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for in-memory response encoding (testing/tts_encode.py)
+"""
+import io
+import os
+import sys
+
+import numpy as np
+import soundfile as sf
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_encode import StreamEncoder, encode, negotiate
+
+
+def _tone(seconds=1.0, sr=24000):
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    return (0.3 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+
+
+def test_negotiate_format():
+    """Explicit format wins, then the Accept header, then WAV"""
+    assert negotiate("FLAC", "audio/ogg") == "flac"
+    assert negotiate("ogg") == "opus"
+    assert negotiate("aiff") is None
+    assert negotiate(None, "application/json, audio/ogg;q=0.9") == "opus"
+    assert negotiate(None, "*/*") == "wav"
+    assert negotiate() == "wav"
+    print("✓ Output format negotiated")
+
+
+def test_encode_round_trip_and_sizes():
+    """Every format decodes back to the same duration; compressed ones are smaller"""
+    audio = _tone()
+    sizes = {}
+    for fmt in ["wav", "flac", "opus"]:
+        data = encode(audio, 24000, fmt)
+        decoded, sr = sf.read(io.BytesIO(data), dtype="float32")
+        assert abs(len(decoded) / sr - 1.0) < 0.05, fmt
+        sizes[fmt] = len(data)
+    assert sizes["flac"] < sizes["wav"]
+    assert sizes["opus"] * 4 < sizes["wav"]
+    print(f"✓ Encoded in memory: {sizes}")
+
+
+def test_stream_encoder_emits_final_bytes():
+    """Incremental Opus output concatenates into one valid Ogg stream"""
+    encoder = StreamEncoder(24000, "opus")
+    parts = [encoder.write(_tone(0.5)) for _ in range(3)]
+    parts.append(encoder.close())
+    assert parts[0], "header and first pages are available before the end"
+    decoded, sr = sf.read(io.BytesIO(b"".join(parts)), dtype="float32")
+    assert abs(len(decoded) / sr - 1.5) < 0.05
+    print("✓ Opus stream encoded incrementally")
+
+
+if __name__ == "__main__":
+    test_negotiate_format()
+    test_encode_round_trip_and_sizes()
+    test_stream_encoder_emits_final_bytes()
+    print("\nAll encoding tests passed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the stub synthesizer (testing/tts_stub.py) and load generator (testing/tts_load_test.py)
+"""
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_load_test import LENGTHS, build_requests, parse_mix, summarize
+from tts_stub import StubConditionals, StubTTS
+
+
+def test_stub_output_follows_text_and_voice():
+    """Audio length tracks the text; output is deterministic per text and voice"""
+    model = StubTTS(rtf=0.0)
+    short, long = model.generate("Hi there."), model.generate("A much longer sentence than the first. " * 3)
+    assert short.dtype == np.float32 and short.shape[0] == 1
+    assert long.shape[1] > 3 * short.shape[1]
+    assert np.array_equal(model.generate("Hi there."), short)
+
+    model.prepare_conditionals(io.BytesIO(b"reference clip"))
+    assert not np.array_equal(model.generate("Hi there."), short), "another voice sounds different"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "conds.pt")
+        model.conds.save(path)
+        assert StubConditionals.load(path, map_location="cpu").key == model.conds.key
+    print("✓ Stub output follows text and voice")
+
+
+def test_workload_mixes():
+    """Length and voice mixes are honoured and reproducible"""
+    assert parse_mix("a=3,b") == (["a", "b"], [3.0, 1.0])
+    for bad in ("", "a=-1", "a=0"):
+        try:
+            parse_mix(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"mix {bad!r} should be rejected")
+
+    bodies = build_requests(400, "short=0.5,long=0.5", "default=0.75,narrator=0.25", seed=7)
+    assert bodies == build_requests(400, "short=0.5,long=0.5", "default=0.75,narrator=0.25", seed=7)
+    voices = [voice for _, voice, _ in bodies]
+    assert 0.15 < voices.count("narrator") / len(voices) < 0.35
+    for length, voice, body in bodies:
+        assert len(body["text"]) >= LENGTHS[length]
+        assert body["cache"] is False
+        assert ("voice_id" in body) == (voice != "default")
+    print("✓ Workload mixes honoured")
+
+
+def test_summary_percentiles():
+    """Throughput and percentiles only count successful requests"""
+    rows = [{"ok": True, "status": 200, "latency": float(i), "chars": 10, "length": "short", "audio_seconds": 1.0}
+            for i in range(1, 101)]
+    rows.append({"ok": False, "status": 503, "latency": 0.1, "chars": 10, "length": "short"})
+    summary = summarize(rows, wall=10.0)
+    assert summary["succeeded"] == 100 and summary["statuses"] == {"200": 100, "503": 1}
+    assert summary["throughput_rps"] == 10.0 and summary["throughput_audio_s_per_s"] == 10.0
+    assert summary["p50_s"] == 50.5 and summary["p99_s"] == 99.01
+    print("✓ Summary percentiles computed")
+
+
+def test_server_runs_with_stub():
+    """tts_server.py serves requests from the stub, caching under cache/stub"""
+    from starlette.testclient import TestClient
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            import tts_server
+            tts_server.enable_stub(rtf=0.0)
+            tts_server.PREWARM_PHRASES = []
+            with TestClient(tts_server.app) as client:
+                response = client.post("/generate", json={"text": "Hello from the stub."})
+                assert response.status_code == 200 and response.headers["x-cache"] == "miss"
+                assert client.post("/generate", json={"text": "Hello from the stub."}).headers["x-cache"] == "hit"
+                stats = client.get("/stats").json()
+                assert stats["stub"] and stats["model_load"]["source"] == "stub"
+            assert any(os.scandir(os.path.join("cache", "stub", "results")))
+        finally:
+            os.chdir(cwd)
+    print("✓ Server runs with the stub synthesizer")
+
+
+if __name__ == "__main__":
+    print("Testing stub synthesizer and load generator...")
+    print()
+
+    test_stub_output_follows_text_and_voice()
+    test_workload_mixes()
+    test_summary_percentiles()
+    test_server_runs_with_stub()
+
+    print()
+    print("All tests passed! ✓")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the Prometheus metrics helpers (testing/tts_metrics.py)
+"""
+import os
+import sys
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_metrics import Registry, RequestMetricsMiddleware
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Buckets are cumulative, +Inf equals the count, labels are kept apart"""
+    registry = Registry()
+    hist = registry.histogram("tts_test_seconds", "Test latency.", buckets=(0.1, 1.0), labelnames=("kind",))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        hist.observe(value, kind="a")
+    hist.observe(0.2, kind="b")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE tts_test_seconds histogram" in lines
+    assert 'tts_test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+    assert 'tts_test_seconds_bucket{kind="a",le="1.0"} 3' in lines
+    assert 'tts_test_seconds_bucket{kind="a",le="+Inf"} 4' in lines
+    assert 'tts_test_seconds_count{kind="a"} 4' in lines
+    assert 'tts_test_seconds_sum{kind="a"} 6.05' in lines
+    assert 'tts_test_seconds_count{kind="b"} 1' in lines
+    assert hist.count(kind="a") == 4
+    print("✓ Histogram buckets rendered cumulatively")
+
+
+def test_counters_gauges_and_collectors():
+    """Counters add up, gauges go both ways, collectors are read at render time"""
+    registry = Registry()
+    counter = registry.counter("tts_chars_total", "Characters.")
+    gauge = registry.gauge("tts_in_flight", "In flight.", ("path",))
+    counter.inc(5)
+    counter.inc(7)
+    gauge.inc(path="/generate")
+    gauge.inc(path="/generate")
+    gauge.dec(path="/generate")
+    depth = {"value": 3}
+    registry.collector(lambda: [("tts_depth", "gauge", "Depth.", [({"queue": 'a"b'}, depth["value"]),
+                                                                    ({"queue": "skipped"}, None)])])
+
+    text = registry.render()
+    assert "tts_chars_total 12" in text
+    assert 'tts_in_flight{path="/generate"} 1' in text
+    assert 'tts_depth{queue="a\\"b"} 3' in text
+    assert "skipped" not in text, "samples without a value are left out"
+    depth["value"] = 9
+    assert 'tts_depth{queue="a\\"b"} 9' in registry.render()
+    print("✓ Counters, gauges and collectors rendered")
+
+
+def test_middleware_tracks_in_flight_and_latency():
+    """Watched paths are counted while running and timed with their status"""
+    from starlette.applications import Starlette
+    from starlette.middleware import Middleware
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    registry = Registry()
+    in_flight = registry.gauge("in_flight", "In flight.", ("path",))
+    latency = registry.histogram("latency", "Latency.", labelnames=("path", "status"))
+    seen = {}
+
+    async def generate(request):
+        seen["in_flight"] = in_flight.value(path="/generate")
+        return PlainTextResponse("busy", status_code=503)
+
+    async def other(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/generate", generate), Route("/other", other)],
+                    middleware=[Middleware(RequestMetricsMiddleware, in_flight=in_flight, latency=latency,
+                                           paths=("/generate",))])
+    client = TestClient(app)
+    client.get("/generate")
+    client.get("/other")
+
+    assert seen["in_flight"] == 1
+    assert in_flight.value(path="/generate") == 0
+    assert latency.count(path="/generate", status=503) == 1
+    assert latency.count(path="/other", status=200) == 0, "unwatched paths are not timed"
+    print("✓ Middleware tracked in-flight requests and latency")
+
+
+if __name__ == "__main__":
+    print("Testing TTS metrics...")
+    print()
+
+    test_histogram_renders_cumulative_buckets()
+    test_counters_gauges_and_collectors()
+    test_middleware_tracks_in_flight_and_latency()
+
+    print()
+    print("All tests passed! ✓")
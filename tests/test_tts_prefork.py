@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-fork worker supervisor (testing/tts_prefork.py)
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_prefork import PreforkSupervisor, bind_socket, default_threads
+
+
+def test_workers_run_in_forked_processes():
+    """Every worker index runs once, each in its own child process"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        def serve(index):
+            (tmp / f"worker-{index}").write_text(str(os.getpid()))
+
+        supervisor = PreforkSupervisor(serve, workers=3)
+        supervisor.run()
+        pids = {p.name: int(p.read_text()) for p in tmp.iterdir()}
+        assert sorted(pids) == ["worker-0", "worker-1", "worker-2"]
+        assert len(set(pids.values())) == 3 and os.getpid() not in pids.values()
+        assert supervisor.restarts == 0
+    print("✓ Workers run in separate forked processes")
+
+
+def test_crashed_worker_is_respawned():
+    """A worker that fails is restarted; one that crashes immediately is not"""
+    with tempfile.TemporaryDirectory() as tmp:
+        marker = Path(tmp) / "crashed"
+
+        def serve(index):
+            if not marker.exists():
+                marker.write_text("1")
+                raise RuntimeError("boom")
+
+        supervisor = PreforkSupervisor(serve, workers=1, min_uptime=0)
+        supervisor.run()
+        assert supervisor.restarts == 1
+
+        def crash(index):
+            raise RuntimeError("bad config")
+
+        supervisor = PreforkSupervisor(crash, workers=2, min_uptime=60)
+        supervisor.run()
+        assert supervisor.restarts == 0, "crash loops are not respawned"
+    print("✓ Crashed workers respawned, crash loops left down")
+
+
+def test_shared_socket_and_thread_split():
+    """The listening socket survives fork and cores are split between workers"""
+    sock = bind_socket("127.0.0.1", 0)
+    try:
+        assert sock.get_inheritable()
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
+    assert default_threads(4, cpus=16) == 4
+    assert default_threads(8, cpus=4) == 1
+    print("✓ Shared socket bound and threads split")
+
+
+if __name__ == "__main__":
+    print("Testing pre-fork supervisor...")
+    print()
+
+    test_workers_run_in_forked_processes()
+    test_crashed_worker_is_respawned()
+    test_shared_socket_and_thread_split()
+
+    print()
+    print("All tests passed! ✓")
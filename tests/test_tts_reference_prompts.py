@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request reference prompts in testing/tts_server.py (stub model)
+"""
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+
+def _generate(client, text, **fields):
+    # "cache": false, so every response is a fresh generation rather than a result cache hit
+    response = client.post("/generate", json={"text": text, "cache": False, **fields})
+    assert response.status_code == 200, response.text
+    return response.content
+
+
+def test_reference_prompts_per_request():
+    """Concurrent clones keep their own voice, prompts are reused by content, no references means the default voice"""
+    from starlette.testclient import TestClient
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            import tts_server
+            tts_server.enable_stub(rtf=0.0)
+            tts_server.PREWARM_PHRASES = []
+            with open("alice.wav", "wb") as f:
+                f.write(b"alice reference clip 1")
+            with open("bob.wav", "wb") as f:
+                f.write(b"bob reference clip")
+            alice, bob = {"reference_files": ["alice.wav"]}, {"reference_files": ["bob.wav"]}
+
+            prepared = tts_server.REFERENCE_PREP.count(source="stub")
+
+            with TestClient(tts_server.app) as client:
+                default = _generate(client, "Hello there.")
+                alone = {"alice": _generate(client, "Hello there.", **alice),
+                         "bob": _generate(client, "Hello there.", **bob)}
+                assert alone["alice"] != alone["bob"] != default
+
+                # Interleaved requests for two voices: each response has its own request's voice
+                names = ["alice", "bob"] * 4
+                with ThreadPoolExecutor(max_workers=len(names)) as pool:
+                    results = list(pool.map(
+                        lambda name: _generate(client, "Hello there.", **(alice if name == "alice" else bob)), names))
+                assert all(audio == alone[name] for name, audio in zip(names, results))
+
+                # The same clips again (even copied elsewhere) come from the content-hash prompt cache
+                hits = tts_server.REFERENCE_PREP.count(source="memory")
+                os.makedirs("copy")
+                with open(os.path.join("copy", "alice.wav"), "wb") as f:
+                    f.write(b"alice reference clip 1")
+                assert _generate(client, "Hello there.", reference_files=["copy/alice.wav"]) == alone["alice"]
+                assert tts_server.REFERENCE_PREP.count(source="memory") == hits + 1
+                assert tts_server.REFERENCE_PREP.count(source="stub") == prepared + 2, "each voice was prepared once"
+
+                # After a cloned request, a request without references speaks in the default voice again
+                _generate(client, "Hello there.", **bob)
+                assert _generate(client, "Hello there.") == default
+        finally:
+            os.chdir(cwd)
+    print("✓ Reference prompts are per request, cached by content, and reset to the default voice")
+
+
+if __name__ == "__main__":
+    test_reference_prompts_per_request()
+    print("\nAll reference prompt tests passed!")
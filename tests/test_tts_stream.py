@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS streaming helpers (testing/tts_stream.py)
+"""
+import os
+import sys
+import struct
+
+import numpy as np
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_stream import Stitcher, split_sentences, to_pcm16, wav_stream_header
+
+
+def test_split_sentences():
+    """Text is split at sentence ends, long sentences at commas or spaces"""
+    assert split_sentences("Hi there. How are you? Great!") == ["Hi there.", "How are you?", "Great!"]
+    assert split_sentences('He said "stop." Then left.') == ['He said "stop."', "Then left."]
+    assert split_sentences("   ") == []
+    long = "word, " * 100
+    parts = split_sentences(long, max_chars=50)
+    assert all(len(p) <= 50 for p in parts)
+    assert " ".join(parts).split() == long.split()
+    print("✓ Sentences split")
+
+
+def test_crossfade_preserves_length_minus_overlaps():
+    """Streaming output equals the chunks joined with one overlap per boundary"""
+    sr = 1000
+    fader = Stitcher(sr, crossfade_ms=10, max_gain_db=None)
+    chunks = [np.ones(100, dtype=np.float32), np.ones(50, dtype=np.float32), np.ones(80, dtype=np.float32)]
+    out = np.concatenate([fader.push(c) for c in chunks] + [fader.flush()])
+    assert len(out) == 230 - 2 * 10
+    # Equal-power fade of two equal signals never drops below the original level
+    assert out.min() >= 0.99 and out.max() <= 1.42
+    print("✓ Crossfade joins chunks without gaps")
+
+
+def test_pcm_and_stream_header():
+    """PCM is clipped 16-bit little-endian, header describes 16-bit mono"""
+    pcm = to_pcm16(np.array([0.0, 1.0, -2.0], dtype=np.float32))
+    assert struct.unpack("<3h", pcm) == (0, 32767, -32767)
+    header = wav_stream_header(24000)
+    assert len(header) == 44 and header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+    assert struct.unpack("<HHI", header[20:28]) == (1, 1, 24000)
+    print("✓ PCM frames and WAV stream header")
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_crossfade_preserves_length_minus_overlaps()
+    test_pcm_and_stream_header()
+    print("\nAll streaming helper tests passed!")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS server's bounded inference queue (testing/tts_worker.py)
+"""
+import os
+import sys
+import threading
+import time
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from tts_worker import Coalescer, DeadlineExceeded, InferenceWorker, QueueFull
+
+
+def _blocking_handler(gate, order):
+    def handler(job):
+        gate.wait(5)
+        order.append(job.payload)
+        return job.payload * 2
+    return handler
+
+
+def test_jobs_run_in_order_on_one_thread():
+    """Jobs complete in submission order with their results"""
+    threads = set()
+
+    def handler(job):
+        threads.add(threading.current_thread().name)
+        return job.payload + 1
+
+    worker = InferenceWorker(handler, max_queue=8).start()
+    try:
+        jobs = [worker.submit(i) for i in range(5)]
+        assert [j.future.result(timeout=5) for j in jobs] == [1, 2, 3, 4, 5]
+        assert threads == {"tts-inference"}
+        assert worker.snapshot()["completed"] == 5
+    finally:
+        worker.stop()
+    print("✓ Jobs run in order on the inference thread")
+
+
+def test_queue_full_rejects_with_retry_after():
+    """Submitting past capacity raises QueueFull with a Retry-After hint"""
+    gate = threading.Event()
+    order = []
+    worker = InferenceWorker(_blocking_handler(gate, order), max_queue=2).start()
+    try:
+        first = worker.submit(1)
+        while not worker.busy():
+            time.sleep(0.01)
+        worker.submit(2)
+        worker.submit(3)
+        try:
+            worker.submit(4)
+        except QueueFull as e:
+            assert e.depth == 2
+            assert e.retry_after >= 1
+        else:
+            raise AssertionError("expected QueueFull")
+        assert worker.snapshot()["rejected"] == 1
+        gate.set()
+        assert first.future.result(timeout=5) == 2
+    finally:
+        gate.set()
+        worker.stop()
+    print("✓ Full queue rejects with Retry-After")
+
+
+def test_cancelled_and_expired_jobs_are_skipped():
+    """Cancelled or expired jobs never reach the handler"""
+    gate = threading.Event()
+    order = []
+    worker = InferenceWorker(_blocking_handler(gate, order), max_queue=8).start()
+    try:
+        running = worker.submit("a")
+        while not worker.busy():
+            time.sleep(0.01)
+        cancelled = worker.submit("b")
+        expired = worker.submit("c", timeout=0.01)
+        kept = worker.submit("d")
+        assert cancelled.cancel()
+        assert not running.cancel(), "running job cannot be cancelled"
+        time.sleep(0.05)
+        gate.set()
+
+        assert kept.future.result(timeout=5) == "dd"
+        try:
+            expired.future.result(timeout=5)
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("expected DeadlineExceeded")
+        assert order == ["a", "d"]
+        stats = worker.snapshot()
+        assert stats["cancelled"] == 1 and stats["expired"] == 1
+    finally:
+        gate.set()
+        worker.stop()
+    print("✓ Cancelled and expired jobs skipped")
+
+
+def test_coalescer_shares_in_flight_jobs():
+    """Identical requests attach to the running job; cancelling waits for the last waiter"""
+    gate = threading.Event()
+    order = []
+    worker = InferenceWorker(_blocking_handler(gate, order), max_queue=8).start()
+    coalescer = Coalescer()
+    try:
+        leader, is_leader = coalescer.join("k", lambda: worker.submit(1))
+        follower, is_follower_leader = coalescer.join("k", lambda: worker.submit(99))
+        assert is_leader and not is_follower_leader and follower is leader
+
+        queued, _ = coalescer.join("q", lambda: worker.submit(2))
+        other, _ = coalescer.join("q", lambda: worker.submit(98))
+        assert not coalescer.leave("q", queued), "another request still waits"
+        assert coalescer.leave("q", other), "last waiter may cancel"
+        assert queued.cancel()
+
+        gate.set()
+        assert leader.future.result(timeout=5) == 2
+        assert order == [1]
+        worker.stop()
+        stats = coalescer.snapshot()
+        assert stats == {"leaders": 2, "followers": 2, "in_flight": 0}
+        again, is_leader = coalescer.join("k", lambda: worker.submit(3))
+        assert is_leader, "finished jobs are not shared"
+    finally:
+        gate.set()
+        worker.stop()
+    print("✓ Identical in-flight jobs shared")
+
+
+if __name__ == "__main__":
+    test_jobs_run_in_order_on_one_thread()
+    test_queue_full_rejects_with_retry_after()
+    test_cancelled_and_expired_jobs_are_skipped()
+    test_coalescer_shares_in_flight_jobs()
+    print("\nAll inference queue tests passed!")
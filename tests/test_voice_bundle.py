@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for single-file voice bundles (IO/voice_bundle.py)
+"""
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+
+# Add parent and testing directories to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from IO.voice_bundle import BundleError, build_bundle, clip_tags, load_bundle
+
+
+def _write_clips(root):
+    t = np.arange(24000) / 24000
+    sf.write(os.path.join(root, "angry_5s.wav"), 0.4 * np.sin(2 * np.pi * 200 * t), 24000)
+    sf.write(os.path.join(root, "serious-calm_48k.wav"), 0.1 * np.sin(2 * np.pi * 150 * t[:12000]), 48000)
+    return [os.path.join(root, "angry_5s.wav"), os.path.join(root, "serious-calm_48k.wav")]
+
+
+def _fake_conditionals():
+    """Same shape as ChatterboxTTS Conditionals: an object of T3 fields plus a gen dict"""
+    t3 = SimpleNamespace(speaker_emb=np.linspace(0, 1, 256, dtype=np.float32).reshape(1, 256),
+                         cond_prompt_speech_tokens=np.arange(150, dtype=np.int64).reshape(1, 150),
+                         cond_prompt_speech_emb=None)
+    gen = {"prompt_feat": np.ones((1, 40, 80), dtype=np.float32), "prompt_feat_len": None, "scale": 0.5}
+    return SimpleNamespace(t3=t3, gen=gen)
+
+
+def test_clip_tags():
+    assert clip_tags("IO/AudioRef/angry_5s.wav") == ["angry"]
+    assert clip_tags("serious-calm_48k.flac") == ["serious", "calm"]
+    assert clip_tags("rejection_6s_24kHz.wav") == ["rejection"]
+    print("✓ Emotion tags come from clip names")
+
+
+def test_bundle_round_trip_is_memory_mapped():
+    """Audio, metadata and conditioning survive the round trip as views into the file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        clips = _write_clips(tmp)
+        conds = _fake_conditionals()
+        path = build_bundle(clips, os.path.join(tmp, "zeyta.voice"), conds=conds)
+
+        bundle = load_bundle(path)
+        assert bundle.name == "zeyta" and bundle.sample_rate == 24000 and bundle.verify()
+        assert bundle.tags == ["angry", "calm", "serious"]
+        assert [c["name"] for c in bundle.clips] == ["angry_5s.wav", "serious-calm_48k.wav"]
+        assert bundle.clips[1]["offset"] == 24000 and bundle.clips[1]["source_rate"] == 48000
+        assert len(bundle.audio) == 24000 + 6000 and abs(bundle.duration - 1.25) < 1e-3
+        assert isinstance(bundle.audio.base, np.memmap), "audio is a view of the mapped file"
+
+        parts = bundle.conditioning_arrays()
+        assert np.array_equal(parts["t3"]["speaker_emb"], conds.t3.speaker_emb)
+        assert parts["t3"]["cond_prompt_speech_tokens"].dtype == np.int64
+        assert parts["t3"]["cond_prompt_speech_emb"] is None and parts["gen"]["scale"] == 0.5
+        for array in (bundle.audio, parts["gen"]["prompt_feat"], parts["t3"]["cond_prompt_speech_tokens"]):
+            assert array.ctypes.data % array.dtype.itemsize == 0, "every tensor is aligned"
+
+        # Copy-on-write: changing a loaded array never touches the file
+        bundle.audio[:10] = 0.0
+        assert load_bundle(path).verify()
+
+        same = build_bundle(clips, os.path.join(tmp, "copy.voice"))
+        assert load_bundle(same).content_hash == bundle.content_hash, "hash identifies the voice content"
+        assert not load_bundle(same).has_conditionals
+    print("✓ Voice bundles round-trip through a memory map")
+
+
+def test_bundle_is_a_safetensors_file():
+    """The container is standard safetensors; other files are rejected clearly"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_bundle(_write_clips(tmp), os.path.join(tmp, "v.voice"), conds=_fake_conditionals())
+        try:
+            from safetensors.numpy import load_file
+        except ImportError:
+            print("⚠️  safetensors not installed - skipping the compatibility check")
+        else:
+            tensors = load_file(str(path))
+            assert np.array_equal(tensors["audio"], load_bundle(path).audio)
+            assert "conds.gen.prompt_feat" in tensors
+
+        junk = os.path.join(tmp, "junk.voice")
+        for content in (b"", b"\x10\x00\x00\x00\x00\x00\x00\x00{not json}      ",
+                        b"\xff" * 8 + b"abc", b"\x02\x00\x00\x00\x00\x00\x00\x00{}"):
+            with open(junk, "wb") as f:
+                f.write(content)
+            try:
+                load_bundle(junk)
+                assert False, f"{content!r} is not a bundle"
+            except BundleError:
+                pass
+    print("✓ Bundles are safetensors files and junk is rejected")
+
+
+def test_server_accepts_voice_bundle():
+    """tts_server.py speaks with a bundle given per request"""
+    from starlette.testclient import TestClient
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = str(build_bundle(_write_clips(tmp), os.path.join(tmp, "v.voice")))
+        os.chdir(tmp)
+        try:
+            import tts_server
+            tts_server.enable_stub(rtf=0.0)
+            tts_server.PREWARM_PHRASES = []
+            with TestClient(tts_server.app) as client:
+                plain = client.post("/generate", json={"text": "Bundled voice test."})
+                voiced = client.post("/generate", json={"text": "Bundled voice test.", "voice_bundle": bundle})
+                assert voiced.status_code == 200 and voiced.headers["x-cache"] == "miss"
+                assert voiced.content != plain.content, "the bundle is a different voice"
+                again = client.post("/generate", json={"text": "Bundled voice test.", "voice_bundle": bundle})
+                assert again.headers["x-cache"] == "hit"
+                missing = client.post("/generate", json={"text": "Hi.", "voice_bundle": "nope.voice"})
+                assert missing.status_code == 404
+                assert client.get("/stats").json()["voice_bundles_open"] == 1
+        finally:
+            os.chdir(cwd)
+    print("✓ Server accepts voice bundles")
+
+
+if __name__ == "__main__":
+    test_clip_tags()
+    test_bundle_round_trip_is_memory_mapped()
+    test_bundle_is_a_safetensors_file()
+    test_server_accepts_voice_bundle()
+    print("\nAll voice bundle tests passed.")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS server's voice registry (testing/voice_registry.py)
+"""
+import os
+import sys
+import tempfile
+
+# Add testing directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'testing'))
+
+from voice_registry import VoiceRegistry, valid_voice_id
+
+
+class _FakeConds:
+    """Stands in for chatterbox Conditionals: only save() is needed to register"""
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(b"conds")
+
+
+def test_voice_ids_are_validated():
+    """Voice ids are restricted to safe directory names"""
+    assert valid_voice_id("narrator_01")
+    assert valid_voice_id("a-b")
+    for bad in ["", "../etc", "a/b", "x" * 65, None, 3]:
+        assert not valid_voice_id(bad)
+    print("✓ Voice ids validated")
+
+
+def test_add_list_find_and_delete():
+    """Registered voices are persisted with metadata and found by content"""
+    with tempfile.TemporaryDirectory() as root:
+        registry = VoiceRegistry(root, max_hot=2)
+        registry.add("narrator", _FakeConds(), {"content_key": "abc", "clip_count": 3})
+
+        assert registry.exists("narrator")
+        assert registry.find_by_content("abc") == "narrator"
+        assert registry.find_by_content("other") is None
+        voices = registry.list()
+        assert [v["voice_id"] for v in voices] == ["narrator"]
+        assert voices[0]["hot"] and voices[0]["clip_count"] == 3
+
+        # Hot voices are served from memory without touching the model package
+        assert isinstance(registry.get("narrator"), _FakeConds)
+        assert registry.snapshot()["hits"] == 1
+
+        assert registry.delete("narrator")
+        assert not registry.delete("narrator")
+        assert registry.list() == []
+    print("✓ Voices added, listed, found and deleted")
+
+
+def test_hot_voices_are_lru_bounded():
+    """Only max_hot voices stay in memory; the least recently used is evicted"""
+    with tempfile.TemporaryDirectory() as root:
+        registry = VoiceRegistry(root, max_hot=2)
+        for name in ["a", "b"]:
+            registry.add(name, _FakeConds(), {})
+        registry.get("a")
+        registry.add("c", _FakeConds(), {})
+        snap = registry.snapshot()
+        assert snap["hot"] == ["a", "c"]
+        assert snap["evictions"] == 1
+        assert registry.exists("b"), "evicted voices stay on disk"
+    print("✓ Hot voice cache is LRU bounded")
+
+
+if __name__ == "__main__":
+    test_voice_ids_are_validated()
+    test_add_list_find_and_delete()
+    test_hot_voices_are_lru_bounded()
+    print("\nAll voice registry tests passed!")
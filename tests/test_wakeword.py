@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the wake-word gate in IO/wakeword.py
+"""
+import os
+import sys
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from IO.wakeword import WakeWordGate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSpotter:
+    """Returns canned transcripts and records the audio length it saw"""
+    def __init__(self, *texts):
+        self.texts = list(texts)
+        self.seen = []
+
+    def __call__(self, audio, sample_rate):
+        self.seen.append(len(audio))
+        return self.texts.pop(0)
+
+
+AUDIO = np.zeros(16000 * 5, dtype=np.float32)
+
+
+def test_rejects_ambient_speech():
+    """Utterances without the wake phrase are gated out"""
+    gate = WakeWordGate(["hey zeyta"], spotter=FakeSpotter("and now the weather"), clock=FakeClock())
+    assert not gate.check(AUDIO, 16000)
+    assert gate.stats["rejected"] == 1
+    print("✓ Ambient speech rejected")
+
+
+def test_wake_phrase_opens_follow_up_window():
+    """A (slightly misheard) wake phrase passes and opens the follow-up window"""
+    clock = FakeClock()
+    spotter = FakeSpotter("Hey Zeta, what time is it?")
+    gate = WakeWordGate(["hey zeyta"], follow_up_seconds=8.0, spotter=spotter, head_seconds=2.0, clock=clock)
+
+    assert gate.check(AUDIO, 16000)
+    assert gate.last_match == "hey zeyta"
+    assert spotter.seen == [32000], "spotter should only see the utterance head"
+
+    # Follow-up inside the window skips the spotter entirely
+    clock.now += 5.0
+    assert gate.check(AUDIO, 16000)
+    assert gate.stats["follow_up"] == 1
+    assert gate.stats["spotter_calls"] == 1
+
+    clock.now += 10.0
+    assert not gate.window_open()
+    print("✓ Wake phrase opens a follow-up window that expires")
+
+
+def test_strip_wake_phrase():
+    """Leading wake phrase is removed from the transcript"""
+    gate = WakeWordGate(["hey zeyta"], spotter=FakeSpotter(), clock=FakeClock())
+    assert gate.strip_wake_phrase("Hey Zeyta, turn on the lights") == "turn on the lights"
+    assert gate.strip_wake_phrase("turn on the lights") == "turn on the lights"
+    print("✓ Wake phrase stripped from transcript")
+
+
+def test_spotter_failure_rejects():
+    """A crashing spotter fails closed instead of raising"""
+    def broken(audio, sample_rate):
+        raise RuntimeError("boom")
+
+    gate = WakeWordGate(["computer"], spotter=broken, clock=FakeClock())
+    assert not gate.check(AUDIO, 16000)
+    print("✓ Spotter failure handled")
+
+
+if __name__ == "__main__":
+    test_rejects_ambient_speech()
+    test_wake_phrase_opens_follow_up_window()
+    test_strip_wake_phrase()
+    test_spotter_failure_rejects()
+    print("\nAll wake-word tests passed!")
@@ -0,0 +1,326 @@
+# utils/model_registry.py
+"""Process-wide model registry.
+
+Every model the assistant loads (LLM pipeline, Whisper, keyword spotter,
+TTS) is requested through :func:`acquire`, keyed by
+``(model_id, device, dtype)``:
+
+* the same key is loaded once and shared, also when two threads ask for it
+  at the same time (e.g. ``core/bootstrap.py`` start-up);
+* callers keep a :class:`ModelHandle` rather than the model and run every
+  call on it inside ``with handle.use() as model:``, so an unloaded model is
+  transparently loaded again and cannot be unloaded mid-call
+  (``handle.get()`` only loads it, e.g. at start-up);
+* with a RAM budget, loading a model that does not fit unloads other
+  models, least recently used first; with an idle timeout, models unused
+  for that long are unloaded (by :meth:`ModelRegistry.unload_idle` or the
+  background monitor started by :func:`configure`);
+* models in use or registered with ``pinned=True`` are never unloaded.
+
+Sizes come from the model's torch tensors where they can be found (host
+memory and device memory counted separately) and otherwise from the
+process RSS growth during the load, which is approximate when loads
+overlap. :meth:`ModelRegistry.stats` reports sizes, load times and use.
+"""
+from __future__ import annotations
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from utils.profiler import trace
+
+Key = Tuple[str, str, str]
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _torch_modules(obj, depth: int = 2):
+    """torch.nn.Modules reachable from ``obj`` (itself, ``.model``, or attributes, ``depth`` levels deep)."""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return []
+    seen, found, frontier = set(), [], [obj]
+    for _ in range(depth + 1):
+        following = []
+        for item in frontier:
+            if id(item) in seen or item is None:
+                continue
+            seen.add(id(item))
+            if isinstance(item, torch.nn.Module):
+                found.append(item)
+                continue
+            attrs = getattr(item, "__dict__", None)
+            if isinstance(attrs, dict):
+                following.extend(v for v in attrs.values() if not isinstance(v, (str, bytes, int, float)))
+        frontier = following
+    return found
+
+
+def tensor_bytes(model) -> Tuple[int, int]:
+    """``(host_bytes, device_bytes)`` of the parameters and buffers found in ``model``."""
+    host = device = 0
+    seen = set()
+    for module in _torch_modules(model):
+        for tensor in list(module.parameters()) + list(module.buffers()):
+            if tensor.data_ptr() in seen:
+                continue
+            seen.add(tensor.data_ptr())
+            size = tensor.numel() * tensor.element_size()
+            if tensor.device.type == "cpu":
+                host += size
+            else:
+                device += size
+    return host, device
+
+
+class _Entry:
+    def __init__(self, kind: str, key: Key, loader: Callable[[], Any],
+                 unloader: Optional[Callable[[Any], None]], pinned: bool) -> None:
+        self.kind = kind
+        self.key = key
+        self.loader = loader
+        self.unloader = unloader
+        self.pinned = pinned
+        self.model = None
+        self.lock = threading.Lock()  # serializes loading this entry only
+        self.users = 0
+        self.loads = 0
+        self.load_seconds: Optional[float] = None
+        self.host_bytes = 0
+        self.device_bytes = 0
+        self.last_used = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+
+class ModelHandle:
+    """What a caller keeps instead of the model itself."""
+
+    def __init__(self, registry: "ModelRegistry", key: Key) -> None:
+        self.registry = registry
+        self.key = key
+
+    def get(self):
+        """
+        The model, loading it first if it is not resident. Nothing keeps it
+        loaded once this returns: use it to preload, and ``use()`` to call it.
+        """
+        return self.registry._get(self.key)
+
+    @contextmanager
+    def use(self):
+        """The model, protected from unloading until the block ends."""
+        entry = self.registry._entries[self.key]
+        with self.registry._lock:
+            entry.users += 1
+        try:
+            yield self.get()
+        finally:
+            with self.registry._lock:
+                entry.users -= 1
+                entry.last_used = time.monotonic()
+
+    @property
+    def loaded(self) -> bool:
+        return self.registry._entries[self.key].loaded
+
+    def unload(self) -> bool:
+        return self.registry.unload(self.key)
+
+
+class ModelRegistry:
+    """Loads, shares, measures and unloads models (see the module docstring)."""
+
+    def __init__(self, budget_bytes: Optional[int] = None, idle_seconds: Optional[float] = None) -> None:
+        self.budget_bytes = budget_bytes
+        self.idle_seconds = idle_seconds
+        self._entries: Dict[Key, _Entry] = {}
+        self._lock = threading.RLock()
+        self._monitor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def make_key(model_id: str, device: Optional[str] = None, dtype: Optional[str] = None) -> Key:
+        return (str(model_id), str(device or "default"), str(dtype or "default"))
+
+    def acquire(self, kind: str, model_id: str, loader: Callable[[], Any], device: Optional[str] = None,
+                dtype: Optional[str] = None, unloader: Optional[Callable[[Any], None]] = None,
+                pinned: bool = False) -> ModelHandle:
+        """
+        Register (or find) the model for ``(model_id, device, dtype)`` and
+        return its handle. Nothing is loaded until ``get()``. The first
+        registration's loader is used for that key; ``pinned`` is sticky.
+        """
+        key = self.make_key(model_id, device, dtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(kind, key, loader, unloader, pinned)
+            else:
+                entry.pinned = entry.pinned or pinned
+        return ModelHandle(self, key)
+
+    def _get(self, key: Key):
+        entry = self._entries[key]
+        model = entry.model
+        if model is None:
+            if entry.host_bytes:
+                # Reload of a known size: make room before paying for it
+                self._fit(entry.host_bytes, keep=entry)
+            with entry.lock:
+                if entry.model is None:
+                    self._load(entry)
+                model = entry.model
+            # Outside the entry lock: unloading takes other entries' locks
+            self._fit(0, keep=entry)
+        entry.last_used = time.monotonic()
+        return model
+
+    def _load(self, entry: _Entry) -> None:
+        label = f"{entry.kind} {entry.key[0]} ({entry.key[1]}/{entry.key[2]})"
+        logging.info(f"[models] Loading {label}")
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        model = entry.loader()
+        seconds = time.perf_counter() - start
+        host, device = tensor_bytes(model)
+        if not host and not device:
+            rss_after = _rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                host = max(0, rss_after - rss_before)
+        with self._lock:
+            entry.model = model
+            entry.loads += 1
+            entry.load_seconds = seconds
+            entry.host_bytes, entry.device_bytes = host, device
+            entry.last_used = time.monotonic()
+        logging.info(f"[models] Loaded {label} in {seconds:.1f}s ({host / 2**20:.0f}MB RAM, "
+                     f"{device / 2**20:.0f}MB device)")
+        trace("model_registry_load", model=entry.key[0], seconds=seconds)
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(e.host_bytes for e in self._entries.values() if e.loaded)
+
+    def _fit(self, incoming: int, keep: Optional[_Entry] = None) -> None:
+        """Unload least recently used models until ``incoming`` more bytes fit the budget."""
+        if self.budget_bytes is None:
+            return
+        tried = set()
+        while self.resident_bytes + incoming > self.budget_bytes:
+            with self._lock:
+                candidates = [e for e in self._entries.values() if e.loaded and e is not keep
+                              and not e.pinned and e.users == 0 and e.key not in tried]
+            if not candidates:
+                logging.warning(f"[models] Over the RAM budget ({(self.resident_bytes + incoming) / 2**20:.0f}MB "
+                                f"> {self.budget_bytes / 2**20:.0f}MB) and nothing can be unloaded")
+                return
+            oldest = min(candidates, key=lambda e: e.last_used)
+            tried.add(oldest.key)
+            self.unload(oldest.key, reason="budget")
+
+    def unload(self, key: Key, reason: str = "request") -> bool:
+        """Drop the registry's reference to a model (it is reloaded on the next ``get()``)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        with entry.lock:
+            with self._lock:
+                if entry.model is None or entry.users:
+                    return False
+                model, entry.model = entry.model, None
+            if entry.unloader is not None:
+                try:
+                    entry.unloader(model)
+                except Exception as e:
+                    logging.warning(f"[models] Unloader for {key[0]} failed: {e}")
+            del model
+        gc.collect()
+        torch = sys.modules.get("torch")
+        if torch is not None and entry.device_bytes and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logging.info(f"[models] Unloaded {entry.kind} {key[0]} ({reason})")
+        trace("model_registry_unload", model=key[0], reason=reason)
+        return True
+
+    def unload_idle(self, idle_seconds: Optional[float] = None) -> List[Key]:
+        """Unload models unused for ``idle_seconds`` (default: the registry's setting)."""
+        limit = self.idle_seconds if idle_seconds is None else idle_seconds
+        if limit is None:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            idle = sorted((e for e in self._entries.values()
+                           if e.loaded and not e.pinned and e.users == 0 and now - e.last_used >= limit),
+                          key=lambda e: e.last_used)
+        return [e.key for e in idle if self.unload(e.key, reason="idle")]
+
+    def start_idle_monitor(self, interval: Optional[float] = None) -> None:
+        """Check for idle models every ``interval`` seconds on a daemon thread."""
+        if self.idle_seconds is None or (self._monitor is not None and self._monitor.is_alive()):
+            return
+        interval = interval or max(1.0, self.idle_seconds / 4)
+        self._stop.clear()
+
+        def monitor():
+            while not self._stop.wait(interval):
+                self.unload_idle()
+
+        self._monitor = threading.Thread(target=monitor, name="model-idle-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop_idle_monitor(self) -> None:
+        self._stop.set()
+
+    def stats(self) -> List[dict]:
+        """One dict per registered model: residency, sizes (MB), load time, loads, idle time, users."""
+        now = time.monotonic()
+        with self._lock:
+            return [{
+                "kind": e.kind, "model_id": e.key[0], "device": e.key[1], "dtype": e.key[2],
+                "loaded": e.loaded, "pinned": e.pinned, "users": e.users, "loads": e.loads,
+                "ram_mb": round(e.host_bytes / 2**20, 1), "device_mb": round(e.device_bytes / 2**20, 1),
+                "load_seconds": None if e.load_seconds is None else round(e.load_seconds, 3),
+                "idle_seconds": round(now - e.last_used, 1) if e.loaded else None,
+            } for e in self._entries.values()]
+
+
+registry = ModelRegistry()
+
+
+def acquire(kind: str, model_id: str, loader: Callable[[], Any], device: Optional[str] = None,
+            dtype: Optional[str] = None, unloader: Optional[Callable[[Any], None]] = None,
+            pinned: bool = False) -> ModelHandle:
+    """:meth:`ModelRegistry.acquire` on the process-wide registry."""
+    return registry.acquire(kind, model_id, loader, device, dtype, unloader, pinned)
+
+
+def configure(budget_mb: Optional[float] = None, idle_seconds: Optional[float] = None) -> ModelRegistry:
+    """Set the process-wide RAM budget and idle timeout (None = no limit) and start idle monitoring."""
+    registry.budget_bytes = None if budget_mb is None else int(budget_mb * 2**20)
+    registry.idle_seconds = idle_seconds
+    registry.start_idle_monitor()
+    return registry
+
+
+__all__ = ["ModelHandle", "ModelRegistry", "acquire", "configure", "registry", "tensor_bytes"]
@@ -1,7 +1,12 @@
 # utils/profiler.py
 # Placeholder for optional latency and performance measurement tools.
 
+import importlib.util
+import logging
+import os
+import sys
 import time
+from contextlib import contextmanager
 from functools import wraps
 
 def measure_latency(func):
@@ -13,4 +18,122 @@ def measure_latency(func):
         end_time = time.time()
         print(f"[Profiler] {func.__name__} took {end_time - start_time:.4f} seconds.")
         return result
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+# ---------------- Pipeline event tracing ----------------
+# The voice loop calls trace() at stage boundaries. With no hook installed
+# this is a single global lookup, so it is safe to leave in the hot path.
+_trace_hook = None
+
+
+def set_trace_hook(hook):
+    """Install ``hook(event, timestamp, info)`` (or None to disable tracing)."""
+    global _trace_hook
+    _trace_hook = hook
+
+
+def trace(event, **info):
+    """Report a pipeline event (timestamp from time.perf_counter())."""
+    if _trace_hook is not None:
+        _trace_hook(event, time.perf_counter(), info)
+
+
+# ---------------- Startup instrumentation ----------------
+# Time-to-ready is imports plus model loads. enable_startup_profile() times
+# every first-time import from then on (cumulative and self seconds per
+# module); model_load() times each model load and is always on. Turned on by
+# `python main.py --profile-startup` or ZEYTA_STARTUP_PROFILE=1.
+STARTUP_PROFILE_ENV = "ZEYTA_STARTUP_PROFILE"
+
+_startup_start = None
+_import_times = {}  # module -> [cumulative, self] seconds
+_import_stack = []  # [child seconds] of the imports in progress
+_original_import = None
+_model_times = {}  # model name -> load seconds
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level:
+        package = (globals or {}).get("__package__") or ""
+        try:
+            name_key = importlib.util.resolve_name("." * level + name, package)
+        except (ImportError, ValueError):
+            name_key = name
+    else:
+        name_key = name
+    if name_key in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    _import_stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _import_stack.pop()
+        if _import_stack:
+            _import_stack[-1] += elapsed
+        entry = _import_times.setdefault(name_key, [0.0, 0.0])
+        entry[0] += elapsed
+        entry[1] += elapsed - children
+
+
+def enable_startup_profile():
+    """Start recording per-module import times (idempotent)."""
+    global _startup_start, _original_import
+    import builtins
+    if _original_import is None:
+        _startup_start = time.perf_counter()
+        _original_import = builtins.__import__
+        builtins.__import__ = _timed_import
+
+
+def disable_startup_profile():
+    """Stop recording imports (what was recorded is kept)."""
+    global _original_import
+    import builtins
+    if _original_import is not None:
+        builtins.__import__ = _original_import
+        _original_import = None
+
+
+def startup_profile_requested(argv=None):
+    """True when --profile-startup is in argv or ZEYTA_STARTUP_PROFILE is set."""
+    argv = sys.argv if argv is None else argv
+    return "--profile-startup" in argv or os.environ.get(STARTUP_PROFILE_ENV, "") not in ("", "0")
+
+
+@contextmanager
+def model_load(name):
+    """Time a model load: ``with model_load("llm"): brain = Brain()``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        _model_times[name] = seconds
+        trace("model_loaded", model=name, seconds=seconds)
+
+
+def startup_report(top=None):
+    """
+    ``{"elapsed", "imports": [(module, cumulative, self), ...], "models": {name: seconds}}``.
+    Imports are sorted by self time, slowest first.
+    """
+    imports = sorted(((name, cum, own) for name, (cum, own) in _import_times.items()),
+                     key=lambda item: item[2], reverse=True)
+    elapsed = time.perf_counter() - _startup_start if _startup_start is not None else None
+    return {"elapsed": elapsed, "imports": imports[:top] if top else imports, "models": dict(_model_times)}
+
+
+def log_startup_report(top=15, log=logging.info):
+    """Report the slowest imports and the model load times (no-op unless profiling)."""
+    if _startup_start is None:
+        return
+    report = startup_report(top)
+    log(f"[startup] Ready after {report['elapsed']:.2f}s")
+    for name, seconds in report["models"].items():
+        log(f"[startup]   model {name}: {seconds:.2f}s")
+    for name, cumulative, own in report["imports"]:
+        log(f"[startup]   import {name}: {own * 1000:.0f}ms self, {cumulative * 1000:.0f}ms total")
@@ -2,25 +2,108 @@
 """
 Resample all reference audio files to 48kHz (studio standard)
 for optimal ChatterboxTTS quality
+
+Files are processed in parallel (one process per CPU by default, --jobs to
+change). Each worker reuses the resampling kernel for a source rate
+(IO/reference_audio.py) across files. A manifest in the output directory
+maps each input's content hash to its output, so unchanged files are skipped
+on the next run. Duration and peak level of every file are reported from the
+same pass.
 """
 import os
-import torchaudio
-from torchaudio.transforms import Resample
+import sys
+import json
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from IO.reference_audio import resample_batch
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac')
+MANIFEST_NAME = ".resample_manifest.json"
+
+
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def resample_file(input_path, output_path, target_sr):
+    """
+    Resample one file (all channels) and write it with the input's format and
+    subtype. Files already at target_sr are only measured. Returns a result dict.
+    """
+    info = sf.info(input_path)
+    audio, sr = sf.read(input_path, dtype="float32", always_2d=True)
+    result = {"source_rate": sr, "channels": audio.shape[1], "input_size": os.path.getsize(input_path),
+              "status": "already" if sr == target_sr else "resampled"}
+    if sr != target_sr:
+        # Channels resampled together as one batch with the cached kernel
+        audio = np.stack(resample_batch([audio[:, c] for c in range(audio.shape[1])], sr, target_sr), axis=1)
+    result["duration"] = audio.shape[0] / target_sr
+    result["peak"] = round(float(np.abs(audio).max()) if audio.size else 0.0, 4)
+
+    if sr != target_sr:
+        subtype = info.subtype if sf.check_format(info.format, info.subtype) else None
+        if subtype is None or subtype.startswith("PCM"):
+            audio = np.clip(audio, -1.0, 1.0)
+        tmp = f"{output_path}.{os.getpid()}.tmp"
+        sf.write(tmp, audio, target_sr, format=info.format, subtype=subtype)
+        os.replace(tmp, output_path)
+        result["output_size"] = os.path.getsize(output_path)
+    return result
+
+
+def _attempt(func, *args):
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, e
+
 
-def resample_to_48k(input_dir, output_dir=None, target_sr=48000):
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def resample_to_48k(input_dir, output_dir=None, target_sr=48000, jobs=None):
     """
     Resample all audio files in a directory to target sample rate.
-    
+
     Args:
         input_dir: Directory containing reference audio files
         output_dir: Output directory (if None, overwrites originals)
         target_sr: Target sample rate (default 48000Hz)
+        jobs: Worker processes (default: one per CPU, 1 = no pool)
+
+    Returns:
+        {filename: manifest entry} for every audio file in input_dir
     """
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    files = [f for f in os.listdir(input_dir) if f.endswith(('.wav', '.mp3', '.flac'))]
-    
+    out_dir = output_dir or input_dir
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+
+    files = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(AUDIO_EXTENSIONS))
+
     print(f"🎵 Resampling {len(files)} files to {target_sr}Hz...")
     print(f"📁 Input: {input_dir}")
     if output_dir:
@@ -28,42 +111,77 @@ def resample_to_48k(input_dir, output_dir=None, target_sr=48000):
     else:
         print(f"⚠️  WARNING: Will overwrite original files!")
     print()
-    
+
+    # Unchanged inputs whose output is still there are skipped
+    todo, results = [], {}
     for filename in files:
         input_path = os.path.join(input_dir, filename)
-        output_path = os.path.join(output_dir or input_dir, filename)
-        
-        # Load audio
-        waveform, sr = torchaudio.load(input_path)
-        
-        if sr == target_sr:
-            print(f"✅ {filename}: Already {target_sr}Hz - skipping")
+        digest = file_digest(input_path)
+        entry = manifest.get(filename)
+        if (entry and entry.get("sha256") == digest and entry.get("target_sr") == target_sr
+                and (entry["status"] == "already" or os.path.exists(os.path.join(out_dir, filename)))):
+            results[filename] = entry
+            print(f"⏭️  {filename}: unchanged since last run - skipping")
             continue
-        
-        # Resample
-        print(f"🔄 {filename}: {sr}Hz → {target_sr}Hz")
-        resampler = Resample(sr, target_sr)
-        resampled = resampler(waveform)
-        
-        # Save
-        torchaudio.save(output_path, resampled, target_sr)
-        
-        # Show file size change
-        old_size = os.path.getsize(input_path) / 1024
-        new_size = os.path.getsize(output_path) / 1024
-        print(f"   Size: {old_size:.1f}KB → {new_size:.1f}KB")
-    
-    print(f"\n✅ Done! All files resampled to {target_sr}Hz")
+        todo.append((filename, digest))
+
+    def report(filename, digest, result, error):
+        if error is not None:
+            print(f"❌ {filename}: {error}")
+            return
+        output_path = os.path.join(out_dir, filename)
+        if result["status"] == "resampled" and not output_dir:
+            digest = file_digest(output_path)  # the original was replaced by the output
+        entry = dict(result, sha256=digest, target_sr=target_sr)
+        manifest[filename] = results[filename] = entry
+        if result["status"] == "already":
+            print(f"✅ {filename}: Already {target_sr}Hz - skipping ({result['duration']:.1f}s, peak {result['peak']:.2f})")
+        else:
+            clip_note = " ⚠️  clipped" if result["peak"] > 1.0 else ""
+            print(f"🔄 {filename}: {result['source_rate']}Hz → {target_sr}Hz "
+                  f"({result['duration']:.1f}s, peak {result['peak']:.2f}{clip_note})")
+            print(f"   Size: {result['input_size'] / 1024:.1f}KB → {result['output_size'] / 1024:.1f}KB")
+
+    start = time.perf_counter()
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(os.path.join(input_dir, filename), os.path.join(out_dir, filename), target_sr)
+             for filename, _ in todo]
+    try:
+        if jobs <= 1 or len(todo) <= 1:
+            outcomes = ((item, _attempt(resample_file, *task)) for item, task in zip(todo, tasks))
+            for (filename, digest), (result, error) in outcomes:
+                report(filename, digest, result, error)
+        else:
+            # Files are sorted by name, so same-rate recordings tend to land on a warm worker
+            with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+                futures = {pool.submit(resample_file, *task): item for item, task in zip(todo, tasks)}
+                for future in as_completed(futures):
+                    error = future.exception()
+                    report(*futures[future], None if error else future.result(), error)
+    finally:
+        # Keep whatever finished, so an interrupted run resumes where it stopped
+        for filename in [f for f in manifest if f not in files]:
+            del manifest[filename]
+        save_manifest(manifest_path, manifest)
+
+    total = sum(entry["duration"] for entry in results.values())
+    resampled = sum(1 for filename, _ in todo if results.get(filename, {}).get("status") == "resampled")
+    print(f"\n✅ Done! All files resampled to {target_sr}Hz "
+          f"({resampled} resampled, {len(files) - len(todo)} unchanged, "
+          f"{total:.1f}s of audio, {time.perf_counter() - start:.1f}s)")
+    return results
 
 if __name__ == "__main__":
     import argparse
-    
+
     parser = argparse.ArgumentParser(description="Resample audio files to 48kHz")
     parser.add_argument("input_dir", help="Directory containing audio files")
     parser.add_argument("--output-dir", help="Output directory (overwrites if not specified)")
-    parser.add_argument("--sample-rate", type=int, default=48000, 
+    parser.add_argument("--sample-rate", type=int, default=48000,
                        help="Target sample rate (default: 48000)")
-    
+    parser.add_argument("--jobs", type=int, default=None,
+                       help="Worker processes (default: one per CPU, 1 = sequential)")
+
     args = parser.parse_args()
-    
-    resample_to_48k(args.input_dir, args.output_dir, args.sample_rate)
+
+    resample_to_48k(args.input_dir, args.output_dir, args.sample_rate, args.jobs)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Compare VAD backends on recorded clips.
+
+Reports, per backend, how many Python-level classifier calls it needs per
+second of audio, its wall time, and frame-level agreement with webrtcvad
+(the reference detector used by IO/stt.py until now).
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from IO.vad import VAD_BACKENDS, create_vad
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+BLOCK_MS = 100  # same block size listen_and_transcribe reads from the microphone
+
+
+def load_clip(path, sample_rate=SAMPLE_RATE):
+    """Load a clip as mono float32 at the VAD sample rate."""
+    import soundfile as sf
+
+    audio, sr = sf.read(path, dtype="float32", always_2d=True)
+    audio = audio.mean(axis=1)
+    if sr != sample_rate:
+        from math import gcd
+        from scipy.signal import resample_poly
+
+        g = gcd(sr, sample_rate)
+        audio = resample_poly(audio, sample_rate // g, sr // g).astype(np.float32)
+    return audio
+
+
+def run_backend(backend, audio, noise_snr_db=None, seed=0):
+    """Classify a clip block by block. Returns (flags, stats dict)."""
+    if noise_snr_db is not None:
+        rng = np.random.default_rng(seed)
+        power = float(np.mean(audio ** 2)) or 1e-10
+        noise = rng.normal(0.0, np.sqrt(power / 10 ** (noise_snr_db / 10)), audio.size)
+        audio = (audio + noise).astype(np.float32)
+
+    vad = create_vad(backend, sample_rate=SAMPLE_RATE, frame_ms=FRAME_MS)
+    frame_size = SAMPLE_RATE * FRAME_MS // 1000
+    frames_per_block = BLOCK_MS // FRAME_MS
+    n_frames = audio.size // frame_size
+    frames = audio[:n_frames * frame_size].reshape(n_frames, frame_size)
+
+    start = time.perf_counter()
+    flags = [vad.classify(frames[i:i + frames_per_block]) for i in range(0, n_frames, frames_per_block)]
+    elapsed = time.perf_counter() - start
+
+    flags = np.concatenate(flags) if flags else np.zeros(0, dtype=bool)
+    seconds = audio.size / SAMPLE_RATE
+    return flags, {
+        "backend": vad.name,
+        "seconds": seconds,
+        "calls": vad.calls,
+        "calls_per_audio_second": vad.calls / seconds if seconds else 0.0,
+        "wall_ms": elapsed * 1000,
+        "speech_ratio": float(flags.mean()) if flags.size else 0.0,
+    }
+
+
+def benchmark(paths, backends=VAD_BACKENDS, noise_snr_db=None):
+    """Run every backend over every clip and print a summary table."""
+    totals = {b: {"seconds": 0.0, "calls": 0, "wall_ms": 0.0, "agree": 0, "frames": 0} for b in backends}
+
+    for path in paths:
+        audio = load_clip(path)
+        reference, _ = run_backend("webrtc", audio, noise_snr_db)
+        print(f"\n🎵 {os.path.basename(path)} ({audio.size / SAMPLE_RATE:.1f}s)")
+        for backend in backends:
+            flags, stats = run_backend(backend, audio, noise_snr_db)
+            n = min(flags.size, reference.size)
+            agreement = float(np.mean(flags[:n] == reference[:n])) if n else 1.0
+            print(f"   • {stats['backend']:7s} calls/s={stats['calls_per_audio_second']:6.1f} "
+                  f"wall={stats['wall_ms']:7.2f}ms speech={stats['speech_ratio']:.0%} "
+                  f"agreement={agreement:.1%}")
+            t = totals[backend]
+            t["seconds"] += stats["seconds"]
+            t["calls"] += stats["calls"]
+            t["wall_ms"] += stats["wall_ms"]
+            t["agree"] += int(np.sum(flags[:n] == reference[:n]))
+            t["frames"] += n
+
+    print("\n📊 Totals:")
+    for backend, t in totals.items():
+        if not t["seconds"]:
+            continue
+        print(f"   • {backend:7s} {t['calls'] / t['seconds']:6.1f} calls per audio second, "
+              f"{t['wall_ms'] / t['seconds']:.2f}ms CPU per audio second, "
+              f"agreement with webrtc {t['agree'] / max(t['frames'], 1):.1%}")
+    return totals
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark VAD backends on recorded clips")
+    parser.add_argument("clips", nargs="+", help="WAV/FLAC clips to classify")
+    parser.add_argument("--backend", action="append", choices=VAD_BACKENDS,
+                       help="Backend(s) to run (default: all)")
+    parser.add_argument("--noise-snr", type=float, default=None,
+                       help="Mix white noise at this SNR (dB) to test robustness")
+
+    args = parser.parse_args()
+
+    benchmark(args.clips, tuple(args.backend or VAD_BACKENDS), args.noise_snr)